@@ -12,6 +12,7 @@ Usage:
     python run_workers.py --worker change_processor
     python run_workers.py --worker notification
     python run_workers.py --worker task_monitor
+    python run_workers.py --worker activity_writer
     
     # Run with custom worker count
     python run_workers.py --workers 3
@@ -27,6 +28,7 @@ from src.workers.base import BaseWorker
 from src.workers.change_processor import ChangeProcessorWorker
 from src.workers.notification_worker import NotificationWorker
 from src.workers.task_monitor import TaskMonitorWorker
+from src.workers.activity_writer import ActivityWriterWorker
 from src.cache.redis_client import cache
 from src.config.logging import get_logger
 
@@ -37,6 +39,7 @@ WORKER_CLASSES = {
     "change_processor": ChangeProcessorWorker,
     "notification": NotificationWorker,
     "task_monitor": TaskMonitorWorker,
+    "activity_writer": ActivityWriterWorker,
 }
 
 
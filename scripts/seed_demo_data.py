@@ -13,7 +13,6 @@ import asyncio
 import uuid
 from datetime import datetime, timedelta
 
-from passlib.context import CryptContext
 from sqlalchemy import select, text
 
 from src.database.session import get_session, engine
@@ -21,12 +20,7 @@ from src.database.models import (
     User, Organization, OrganizationMember, Team, TeamMember,
     Task, Decision, KnowledgeEntry, AutomationRule, UserActivity
 )
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+from src.services.auth.service import _hash_password as hash_password
 
 
 # Demo password for all users
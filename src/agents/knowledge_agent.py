@@ -153,7 +153,8 @@ Answer the user's question ONLY using the above context. If the context doesn't
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": last_message}
-        ]
+        ],
+        urgent=True
     )
 
     return {
@@ -6,9 +6,12 @@ Endpoints for productivity analytics and activity tracking.
 
 from typing import Optional, List
 from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import Response
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.database.session import get_db
 from src.services.analytics import activity_tracker, productivity_analytics
 from src.config.logging import get_logger
 
@@ -92,7 +95,10 @@ async def get_user_activities(
     team_id: str = "default",
     activity_type: Optional[str] = None,
     since: Optional[datetime] = None,
-    limit: int = 50
+    limit: int = 50,
+    before: Optional[datetime] = None,
+    before_id: Optional[str] = None,
+    session: AsyncSession = Depends(get_db)
 ):
     """
     Get activities for a user.
@@ -100,6 +106,8 @@ async def get_user_activities(
     Filter by:
     - activity_type: commit, pr_opened, pr_merged, pr_review, task_completed, etc.
     - since: Only activities after this timestamp
+    
+    Paging: pass the timestamp and id of the last item as before / before_id.
     """
     try:
         activity_types = [activity_type] if activity_type else None
@@ -109,7 +117,9 @@ async def get_user_activities(
             team_id=team_id,
             activity_types=activity_types,
             since=since,
-            limit=limit
+            limit=limit,
+            cursor=(before, before_id) if before and before_id else None,
+            session=session
         )
         
         return [ActivityItem(**a) for a in activities]
@@ -123,7 +133,8 @@ async def get_user_activities(
 async def get_activity_summary(
     user: str,
     team_id: str = "default",
-    days: int = 7
+    days: int = 7,
+    session: AsyncSession = Depends(get_db)
 ):
     """
     Get activity summary for a user.
@@ -132,7 +143,8 @@ async def get_activity_summary(
         summary = await activity_tracker.get_activity_summary(
             user_identifier=user,
             team_id=team_id,
-            days=days
+            days=days,
+            session=session
         )
         
         return ActivitySummary(**summary)
@@ -146,16 +158,23 @@ async def get_activity_summary(
 async def get_team_activities(
     team_id: str = "default",
     since: Optional[datetime] = None,
-    limit: int = 100
+    limit: int = 100,
+    before: Optional[datetime] = None,
+    before_id: Optional[str] = None,
+    session: AsyncSession = Depends(get_db)
 ):
     """
     Get recent activities for a team.
+    
+    Paging: pass the timestamp and id of the last item as before / before_id.
     """
     try:
         activities = await activity_tracker.get_team_activities(
             team_id=team_id,
             since=since,
-            limit=limit
+            limit=limit,
+            cursor=(before, before_id) if before and before_id else None,
+            session=session
         )
         
         return activities
@@ -185,31 +204,14 @@ async def get_user_productivity(
     - Activity trend
     """
     try:
-        summary = await productivity_analytics.get_user_productivity(
+        # Pre-encoded body of the cached summary; skips response_model validation
+        body = await productivity_analytics.get_user_productivity_json(
             user_identifier=user,
             team_id=team_id,
             days=days
         )
         
-        return UserProductivity(
-            user_identifier=summary.user_identifier,
-            period_start=str(summary.period_start),
-            period_end=str(summary.period_end),
-            commits=summary.commits,
-            prs_opened=summary.prs_opened,
-            prs_merged=summary.prs_merged,
-            prs_reviewed=summary.prs_reviewed,
-            tasks_completed=summary.tasks_completed,
-            tasks_created=summary.tasks_created,
-            lines_added=summary.lines_added,
-            lines_removed=summary.lines_removed,
-            files_changed=summary.files_changed,
-            knowledge_entries=summary.knowledge_entries,
-            decisions_made=summary.decisions_made,
-            productivity_score=summary.productivity_score,
-            activity_trend=summary.activity_trend,
-            most_active_day=summary.most_active_day
-        )
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
         logger.error("Get user productivity error", error=str(e))
@@ -230,12 +232,12 @@ async def get_team_productivity(
     - Active user count
     """
     try:
-        result = await productivity_analytics.get_team_productivity(
+        body = await productivity_analytics.get_team_productivity_json(
             team_id=team_id,
             days=days
         )
         
-        return TeamProductivity(**result)
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
         logger.error("Get team productivity error", error=str(e))
@@ -287,3 +289,24 @@ async def generate_snapshot(
         logger.error("Generate snapshot error", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.post("/productivity/snapshot/team")
+async def generate_team_snapshots(
+    team_id: str = "default"
+):
+    """
+    Generate the latest settled day's productivity snapshots for every active team member.
+    
+    Typically called by a background job daily, instead of one snapshot call per user.
+    """
+    try:
+        count = await productivity_analytics.generate_daily_snapshots_for_team(
+            team_id=team_id
+        )
+        
+        return {"success": True, "snapshots_created": count}
+        
+    except Exception as e:
+        logger.error("Generate team snapshots error", error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
@@ -179,25 +179,7 @@ async def list_my_organizations(
 ):
     """List all organizations the current user belongs to."""
     orgs = await auth_service.get_user_organizations(session, current_user.id)
-    
-    result = []
-    for org, role in orgs:
-        org_dict = {
-            "id": org.id,
-            "name": org.name,
-            "slug": org.slug,
-            "description": org.description,
-            "logo_url": org.logo_url,
-            "plan": org.plan,
-            "max_users": org.max_users,
-            "max_teams": org.max_teams,
-            "is_active": org.is_active,
-            "created_at": org.created_at,
-            "role": role,
-        }
-        result.append(OrganizationWithRole(**org_dict))
-    
-    return result
+    return [OrganizationWithRole.model_validate(row) for row in orgs]
 
 
 @router.get("/organizations/{org_id}", response_model=OrganizationWithRole)
@@ -243,27 +225,7 @@ async def list_organization_members(
         raise HTTPException(status_code=403, detail="Not a member of this organization")
     
     members = await auth_service.get_organization_members(session, org_id)
-    
-    result = []
-    for user, member_role, joined_at in members:
-        user_dict = {
-            "id": user.id,
-            "email": user.email,
-            "name": user.name,
-            "avatar_url": user.avatar_url,
-            "is_email_verified": user.is_email_verified,
-            "github_username": user.github_username,
-            "slack_username": user.slack_username,
-            "current_org_id": user.current_org_id,
-            "current_team_id": user.current_team_id,
-            "is_active": user.is_active,
-            "created_at": user.created_at,
-            "role": member_role,
-            "joined_at": joined_at,
-        }
-        result.append(UserWithRole(**user_dict))
-    
-    return result
+    return [UserWithRole.model_validate(row) for row in members]
 
 
 @router.patch("/organizations/{org_id}/members/{user_id}/role")
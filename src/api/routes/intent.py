@@ -9,6 +9,7 @@ from typing import Optional, List
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from datetime import datetime
+import json
 import uuid
 
 from src.services.debate import challenge_service
@@ -612,7 +613,6 @@ Respond with JSON:
             max_tokens=300
         )
         
-        import json
         try:
             result = json.loads(response.strip())
             conflicts = []
@@ -20,11 +20,13 @@ settings = get_settings()
 STREAM_GIT_EVENTS = "supymem:stream:git_events"
 STREAM_NOTIFICATIONS = "supymem:stream:notifications"
 STREAM_TASK_EVENTS = "supymem:stream:task_events"
+STREAM_ACTIVITY_EVENTS = "supymem:stream:activity_events"
 
 # Consumer groups
 GROUP_CHANGE_PROCESSOR = "change_processor"
 GROUP_NOTIFICATION_WORKER = "notification_worker"
 GROUP_TASK_MONITOR = "task_monitor"
+GROUP_ACTIVITY_WRITER = "activity_writer"
 
 
 @dataclass
@@ -349,6 +351,28 @@ class RedisClient:
         result = await self.client.xack(stream, group, message_id)
         return result > 0
 
+    async def stream_ack_many(
+        self,
+        stream: str,
+        group: str,
+        message_ids: List[str]
+    ) -> int:
+        """
+        Acknowledge several messages with a single XACK.
+        
+        Args:
+            stream: Stream name
+            group: Consumer group name
+            message_ids: Message IDs to acknowledge
+            
+        Returns:
+            Number of messages acknowledged
+        """
+        if not self.client or not message_ids:
+            return 0
+        
+        return await self.client.xack(stream, group, *message_ids)
+
     async def stream_claim_pending(
         self,
         stream: str,
@@ -5,6 +5,11 @@ from functools import lru_cache
 class Settings(BaseSettings):
     # Database - MUST be set via environment variable
     database_url: str = ""
+    # Connection pool size; 0 opens a fresh connection per session (NullPool)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    # Prepared statements kept per connection; set 0 behind PgBouncer transaction pooling
+    db_statement_cache_size: int = 1024
 
     # Redis - MUST be set via environment variable
     redis_url: str = ""
@@ -25,6 +30,11 @@ class Settings(BaseSettings):
     google_api_key: str = ""
     openrouter_api_key: str = ""
 
+    # LLM routing: priority, round_robin or latency
+    llm_routing_strategy: str = "priority"
+    # Prompts larger than this (serialized bytes) are answered but not cached
+    llm_cache_max_bytes: int = 8192
+
     # Slack
     slack_bot_token: str = ""
     slack_app_token: str = ""
@@ -39,6 +49,8 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     debug: bool = False
     secret_key: str = ""  # MUST be set via environment variable
+    # bcrypt cost factor for new password hashes; each step doubles hashing time
+    bcrypt_rounds: int = 12
 
     class Config:
         env_file = ".env"
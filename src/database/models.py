@@ -1,11 +1,14 @@
 from datetime import datetime
 from sqlalchemy import (
     Column, String, Text, DateTime, Boolean, ForeignKey, 
-    Index, Float, Integer, Date, JSON
+    Index, Float, Integer, SmallInteger, Date, JSON, Computed
 )
+from sqlalchemy import DDL, event, cast
 from sqlalchemy.orm import DeclarativeBase, relationship
 from pgvector.sqlalchemy import Vector
 import enum
+import os
+import time
 import uuid
 
 
@@ -13,6 +16,25 @@ class Base(DeclarativeBase):
     pass
 
 
+# Version (7) and RFC 4122 variant bits of a UUIDv7
+_UUID7_CLEAR = ~(0xF << 76 | 0x3 << 62)
+_UUID7_SET = 0x7 << 76 | 0x2 << 62
+
+
+def uuid7() -> str:
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48-bit Unix ms timestamp then
+    random bits.
+    
+    Keys generated close together sort together, so inserts land on the
+    right edge of the primary-key B-tree instead of random pages.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    # Formatted directly; building a uuid.UUID just to str() it costs more than the rest
+    h = f"{value & _UUID7_CLEAR | _UUID7_SET:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
 # ============================================================================
 # ENUMS
 # ============================================================================
@@ -187,6 +209,13 @@ class Invite(Base):
         Index("idx_invite_email", "email"),
         Index("idx_invite_token", "token"),
         Index("idx_invite_org", "organization_id"),
+        # At most one pending invite per address and organization
+        Index(
+            "idx_invite_pending_org_email",
+            organization_id, email,
+            unique=True,
+            postgresql_where=status == "pending",
+        ),
     )
 
 
@@ -288,6 +317,7 @@ class TeamMember(Base):
     __table_args__ = (
         Index("idx_team_member_user", "user_id"),
         Index("idx_team_member_team", "team_id"),
+        Index("idx_team_member_team_user", team_id, user_id, unique=True),
     )
 
 
@@ -336,6 +366,7 @@ class KnowledgeEntry(Base):
         Index("idx_knowledge_category", "category"),
         Index("idx_knowledge_created_at", "created_at"),
         Index("idx_knowledge_actionable", "is_actionable"),
+        Index("idx_knowledge_user_team_created", "user_id", "team_id", "created_at"),
     )
 
 
@@ -394,6 +425,7 @@ class Decision(Base):
         Index("idx_decision_source", "source_type", "source_id"),
         Index("idx_decision_status", "status"),
         Index("idx_decision_created", "created_at"),
+        Index("idx_decision_decider_team_created", "decided_by", "team_id", "created_at"),
     )
 
 
@@ -437,7 +469,7 @@ class UserActivity(Base):
     """Tracks all user activities for productivity analysis."""
     __tablename__ = "user_activities"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=uuid7)  # Time-sortable
     user_id = Column(String(36), ForeignKey("users.id"), nullable=True)
     user_identifier = Column(String(100), nullable=False)  # Fallback: github username, slack id
     team_id = Column(String(100), nullable=False)
@@ -465,21 +497,37 @@ class UserActivity(Base):
     # Extra data (renamed from 'metadata' to avoid SQLAlchemy reserved word)
     extra_data = Column(JSON, default=dict)
     
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    # Partition key (monthly RANGE partitions), so it is part of the primary key
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)
 
     # Relationships
     user = relationship("User", back_populates="activities")
 
     __table_args__ = (
         Index("idx_activity_user", "user_id"),
-        Index("idx_activity_user_identifier", "user_identifier"),
-        Index("idx_activity_team", "team_id"),
+        # Covers the productivity aggregates, which read only these columns
+        Index(
+            "idx_activity_user_team_ts", user_identifier, team_id, timestamp.desc(),
+            postgresql_include=["activity_type", "lines_added", "lines_removed", "files_changed"]
+        ),
+        Index("idx_activity_team_ts", team_id, timestamp.desc()),
+        # Per-day breakdowns filter and group on the date, not the raw timestamp
+        Index("idx_activity_user_team_day", user_identifier, team_id, cast(timestamp, Date)),
         Index("idx_activity_type", "activity_type"),
         Index("idx_activity_timestamp", "timestamp"),
         Index("idx_activity_source", "source", "source_id"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
     )
 
 
+# Rows outside the monthly partitions land here (see ensure_activity_partitions)
+event.listen(
+    UserActivity.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS user_activities_default PARTITION OF user_activities DEFAULT"),
+)
+
+
 class FileOwnership(Base):
     """Tracks file ownership based on commit history."""
     __tablename__ = "file_ownership"
@@ -591,6 +639,15 @@ class Task(Base):
     # Status & Priority
     status = Column(String(20), default="pending")  # Uses TaskStatus enum
     priority = Column(String(10), default="medium")  # Uses TaskPriority enum
+    # Numeric sort key for priority (urgent=0 ... low=3), maintained by the database
+    priority_rank = Column(
+        SmallInteger,
+        Computed(
+            "CASE priority WHEN 'urgent' THEN 0 WHEN 'high' THEN 1 "
+            "WHEN 'medium' THEN 2 WHEN 'low' THEN 3 ELSE 4 END",
+            persisted=True,
+        ),
+    )
     
     # Assignment
     team_id = Column(String(100), nullable=False)
@@ -635,6 +692,11 @@ class Task(Base):
         Index("idx_task_assigned", "assigned_to"),
         Index("idx_task_priority", "priority"),
         Index("idx_task_due_date", "due_date"),
+        Index(
+            "idx_task_assignee_rank",
+            assigned_to, priority_rank, created_at.desc(),
+            postgresql_where=status.in_(["pending", "in_progress"]),
+        ),
     )
 
 
@@ -687,9 +749,16 @@ class AutomationRule(Base):
     executions = relationship("AutomationExecution", back_populates="rule")
 
     __table_args__ = (
-        Index("idx_automation_team", "team_id"),
+        # Rule listings filter by team and sort newest first
+        Index("idx_automation_team_created", team_id, created_at),
         Index("idx_automation_status", "status"),
         Index("idx_automation_trigger", "trigger_type"),
+        # Trigger events only ever look up a team's active rules
+        Index(
+            "idx_automation_active",
+            team_id, trigger_type,
+            postgresql_where=status == "active",
+        ),
     )
 
 
@@ -717,7 +786,7 @@ class AutomationExecution(Base):
     rule = relationship("AutomationRule", back_populates="executions")
 
     __table_args__ = (
-        Index("idx_execution_rule", "rule_id"),
+        Index("idx_execution_rule_time", "rule_id", "executed_at"),
         Index("idx_execution_status", "status"),
         Index("idx_execution_time", "executed_at"),
     )
@@ -727,6 +796,32 @@ class AutomationExecution(Base):
 # PRODUCTIVITY & ANALYTICS
 # ============================================================================
 
+# Productivity score weight per activity type, with the snapshot column
+# counting it; types without a column count as other_activities
+PRODUCTIVITY_WEIGHTS = {
+    "commit": ("commits_count", 1.0),
+    "pr_opened": ("prs_opened", 3.0),
+    "pr_merged": ("prs_merged", 5.0),
+    "pr_review": ("prs_reviewed", 2.0),
+    "task_completed": ("tasks_completed", 4.0),
+    "task_created": ("tasks_created", 1.5),
+    "knowledge_entry": ("knowledge_entries_created", 1.0),
+    "decision": ("decisions_made", 2.0),
+}
+OTHER_ACTIVITY_WEIGHT = 1.0
+
+
+def productivity_score_sql() -> str:
+    """SQL of the generated productivity_score column, built from PRODUCTIVITY_WEIGHTS."""
+    terms = [
+        f"COALESCE({column}, 0) * {weight}"
+        for column, weight in PRODUCTIVITY_WEIGHTS.values()
+    ]
+    terms.append(f"COALESCE(other_activities, 0) * {OTHER_ACTIVITY_WEIGHT}")
+    terms.append("(COALESCE(lines_added, 0) + COALESCE(lines_removed, 0)) / 100.0 * 0.5")
+    return f"ROUND(CAST({' + '.join(terms)} AS NUMERIC), 2)"
+
+
 class ProductivitySnapshot(Base):
     """Daily productivity snapshots per user."""
     __tablename__ = "productivity_snapshots"
@@ -761,8 +856,15 @@ class ProductivitySnapshot(Base):
     knowledge_entries_created = Column(Integer, default=0)
     decisions_made = Column(Integer, default=0)
     
+    # Activities of types without a column above (weighted 1.0)
+    other_activities = Column(Integer, default=0)
+    
     # Derived metrics
-    productivity_score = Column(Float, default=0.0)  # Calculated composite score
+    # Composite score, maintained by the database; see productivity_score_sql()
+    productivity_score = Column(
+        Float,
+        Computed(productivity_score_sql(), persisted=True),
+    )
     
     # Raw data for detailed analysis
     metrics_detail = Column(JSON, default=dict)
@@ -774,6 +876,8 @@ class ProductivitySnapshot(Base):
         Index("idx_snapshot_team", "team_id"),
         Index("idx_snapshot_date", "snapshot_date"),
         Index("idx_snapshot_user_date", "user_identifier", "snapshot_date"),
+        # Team leaderboards read the top scores of a day straight off the index
+        Index("idx_snapshot_team_date_score", team_id, snapshot_date, productivity_score.desc()),
     )
 
 
@@ -10,11 +10,27 @@ from src.config.logging import get_logger
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Prepared statements (and their plans) live on a connection, so they are only
+# reused across sessions when connections are pooled
+if settings.db_pool_size > 0:
+    pool_options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": True,
+    }
+else:
+    pool_options = {"poolclass": NullPool}
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
-    poolclass=NullPool,
     echo=settings.debug,
+    connect_args={
+        # SQLAlchemy's asyncpg adapter cache and asyncpg's own statement cache
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "statement_cache_size": settings.db_statement_cache_size,
+    },
+    **pool_options,
 )
 
 # Session factory
@@ -0,0 +1,70 @@
+"""Generate productivity_snapshots.productivity_score in the database
+
+Revision ID: a3d8f5b1c7e2
+Revises: f7b3d9e1a5c8
+Create Date: 2026-10-16 19:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d8f5b1c7e2'
+down_revision: Union[str, Sequence[str], None] = 'f7b3d9e1a5c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Activity types with their own snapshot column; the rest count as other_activities
+WEIGHTED_TYPES = (
+    'commit', 'pr_opened', 'pr_merged', 'pr_review',
+    'task_completed', 'task_created', 'knowledge_entry', 'decision',
+)
+
+SCORE_EXPRESSION = (
+    "ROUND(CAST("
+    "COALESCE(commits_count, 0) * 1.0 + COALESCE(prs_opened, 0) * 3.0 "
+    "+ COALESCE(prs_merged, 0) * 5.0 + COALESCE(prs_reviewed, 0) * 2.0 "
+    "+ COALESCE(tasks_completed, 0) * 4.0 + COALESCE(tasks_created, 0) * 1.5 "
+    "+ COALESCE(knowledge_entries_created, 0) * 1.0 + COALESCE(decisions_made, 0) * 2.0 "
+    "+ COALESCE(other_activities, 0) * 1.0 "
+    "+ (COALESCE(lines_added, 0) + COALESCE(lines_removed, 0)) / 100.0 * 0.5 "
+    "AS NUMERIC), 2)"
+)
+
+
+def upgrade() -> None:
+    """Replace the stored score with a generated column and index it per team and day."""
+    op.add_column('productivity_snapshots', sa.Column('other_activities', sa.Integer(), nullable=True))
+    types = ", ".join(f"'{t}'" for t in WEIGHTED_TYPES)
+    op.execute(
+        "UPDATE productivity_snapshots SET other_activities = COALESCE(("
+        "SELECT sum(value::int) FROM json_each_text(metrics_detail->'activity_counts') "
+        f"WHERE key NOT IN ({types})), 0)"
+    )
+
+    op.drop_column('productivity_snapshots', 'productivity_score')
+    op.add_column('productivity_snapshots', sa.Column(
+        'productivity_score',
+        sa.Float(),
+        sa.Computed(SCORE_EXPRESSION, persisted=True),
+        nullable=True,
+    ))
+    op.create_index(
+        'idx_snapshot_team_date_score',
+        'productivity_snapshots',
+        ['team_id', 'snapshot_date', sa.text('productivity_score DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Turn the generated score back into a plain column, keeping its values."""
+    op.drop_index('idx_snapshot_team_date_score', table_name='productivity_snapshots')
+    op.add_column('productivity_snapshots', sa.Column('productivity_score_plain', sa.Float(), nullable=True))
+    op.execute('UPDATE productivity_snapshots SET productivity_score_plain = productivity_score')
+    op.drop_column('productivity_snapshots', 'productivity_score')
+    op.alter_column('productivity_snapshots', 'productivity_score_plain', new_column_name='productivity_score')
+    op.drop_column('productivity_snapshots', 'other_activities')
@@ -0,0 +1,45 @@
+"""Add numeric priority rank to tasks
+
+Revision ID: b7c1e9d2f4a3
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c1e9d2f4a3'
+down_revision: Union[str, Sequence[str], None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add generated priority_rank column and the /my-tasks index."""
+    op.add_column('tasks', sa.Column(
+        'priority_rank',
+        sa.SmallInteger(),
+        sa.Computed(
+            "CASE priority WHEN 'urgent' THEN 0 WHEN 'high' THEN 1 "
+            "WHEN 'medium' THEN 2 WHEN 'low' THEN 3 ELSE 4 END",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index(
+        'idx_task_assignee_rank',
+        'tasks',
+        ['assigned_to', 'priority_rank', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text("status IN ('pending', 'in_progress')"),
+    )
+
+
+def downgrade() -> None:
+    """Drop priority_rank column and its index."""
+    op.drop_index('idx_task_assignee_rank', table_name='tasks')
+    op.drop_column('tasks', 'priority_rank')
@@ -0,0 +1,55 @@
+"""Add unique indexes for team memberships and pending invites
+
+Revision ID: b9e4c2a7d3f6
+Revises: a3d8f5b1c7e2
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e4c2a7d3f6'
+down_revision: Union[str, Sequence[str], None] = 'a3d8f5b1c7e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Drop duplicates, then let ON CONFLICT target (team, user) and pending (org, email)."""
+    # Keep the earliest membership of each user in a team
+    op.execute(
+        'DELETE FROM team_members a USING team_members b '
+        'WHERE a.team_id = b.team_id AND a.user_id = b.user_id '
+        "AND (COALESCE(a.joined_at, '-infinity'), a.id) > (COALESCE(b.joined_at, '-infinity'), b.id)"
+    )
+    op.create_index(
+        'idx_team_member_team_user',
+        'team_members',
+        ['team_id', 'user_id'],
+        unique=True,
+    )
+
+    # Keep the newest pending invite per address; older ones are revoked
+    op.execute(
+        "UPDATE invites a SET status = 'revoked' FROM invites b "
+        "WHERE a.status = 'pending' AND b.status = 'pending' "
+        "AND a.organization_id = b.organization_id AND a.email = b.email "
+        "AND (COALESCE(a.created_at, '-infinity'), a.id) < (COALESCE(b.created_at, '-infinity'), b.id)"
+    )
+    op.create_index(
+        'idx_invite_pending_org_email',
+        'invites',
+        ['organization_id', 'email'],
+        unique=True,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the unique indexes."""
+    op.drop_index('idx_invite_pending_org_email', table_name='invites')
+    op.drop_index('idx_team_member_team_user', table_name='team_members')
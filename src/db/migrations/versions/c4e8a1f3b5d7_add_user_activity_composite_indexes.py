@@ -0,0 +1,45 @@
+"""Add composite (user, team, timestamp) indexes to user_activities
+
+Revision ID: c4e8a1f3b5d7
+Revises: b7c1e9d2f4a3
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f3b5d7'
+down_revision: Union[str, Sequence[str], None] = 'b7c1e9d2f4a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Replace single-column user/team indexes with feed-ordered composites."""
+    op.create_index(
+        'idx_activity_user_team_ts',
+        'user_activities',
+        ['user_identifier', 'team_id', sa.text('timestamp DESC')],
+        unique=False,
+    )
+    op.create_index(
+        'idx_activity_team_ts',
+        'user_activities',
+        ['team_id', sa.text('timestamp DESC')],
+        unique=False,
+    )
+    # Both are leading-column prefixes of the composites above
+    op.drop_index('idx_activity_user_identifier', table_name='user_activities')
+    op.drop_index('idx_activity_team', table_name='user_activities')
+
+
+def downgrade() -> None:
+    """Restore single-column indexes and drop the composites."""
+    op.create_index('idx_activity_team', 'user_activities', ['team_id'], unique=False)
+    op.create_index('idx_activity_user_identifier', 'user_activities', ['user_identifier'], unique=False)
+    op.drop_index('idx_activity_team_ts', table_name='user_activities')
+    op.drop_index('idx_activity_user_team_ts', table_name='user_activities')
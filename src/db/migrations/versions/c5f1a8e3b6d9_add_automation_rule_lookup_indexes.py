@@ -0,0 +1,45 @@
+"""Add automation rule and execution lookup indexes
+
+Revision ID: c5f1a8e3b6d9
+Revises: b9e4c2a7d3f6
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f1a8e3b6d9'
+down_revision: Union[str, Sequence[str], None] = 'b9e4c2a7d3f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index active rules per team and trigger; widen the team and rule indexes."""
+    op.create_index(
+        'idx_automation_active',
+        'automation_rules',
+        ['team_id', 'trigger_type'],
+        unique=False,
+        postgresql_where=sa.text("status = 'active'"),
+    )
+    # (team_id, created_at) also serves plain team_id lookups
+    op.create_index('idx_automation_team_created', 'automation_rules', ['team_id', 'created_at'], unique=False)
+    op.drop_index('idx_automation_team', table_name='automation_rules')
+
+    op.create_index('idx_execution_rule_time', 'automation_executions', ['rule_id', 'executed_at'], unique=False)
+    op.drop_index('idx_execution_rule', table_name='automation_executions')
+
+
+def downgrade() -> None:
+    """Restore the single-column indexes."""
+    op.create_index('idx_execution_rule', 'automation_executions', ['rule_id'], unique=False)
+    op.drop_index('idx_execution_rule_time', table_name='automation_executions')
+
+    op.create_index('idx_automation_team', 'automation_rules', ['team_id'], unique=False)
+    op.drop_index('idx_automation_team_created', table_name='automation_rules')
+    op.drop_index('idx_automation_active', table_name='automation_rules')
@@ -0,0 +1,118 @@
+"""Partition user_activities by month on timestamp
+
+Revision ID: d2f6b8a4c1e9
+Revises: c4e8a1f3b5d7
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6b8a4c1e9'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f3b5d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created past the current month
+MONTHS_AHEAD = 3
+
+INDEXES = [
+    ('idx_activity_user', ['user_id']),
+    ('idx_activity_user_team_ts', ['user_identifier', 'team_id', sa.text('timestamp DESC')]),
+    ('idx_activity_team_ts', ['team_id', sa.text('timestamp DESC')]),
+    ('idx_activity_type', ['activity_type']),
+    ('idx_activity_timestamp', ['timestamp']),
+    ('idx_activity_source', ['source', 'source_id']),
+]
+
+
+def _columns(partitioned: bool):
+    return [
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=True),
+        sa.Column('user_identifier', sa.String(length=100), nullable=False),
+        sa.Column('team_id', sa.String(length=100), nullable=False),
+        sa.Column('activity_type', sa.String(length=50), nullable=False),
+        sa.Column('title', sa.String(length=500), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('source', sa.String(length=50), nullable=True),
+        sa.Column('source_id', sa.String(length=255), nullable=True),
+        sa.Column('source_url', sa.String(length=500), nullable=True),
+        sa.Column('related_files', sa.JSON(), nullable=True),
+        sa.Column('related_task_id', sa.String(length=36), nullable=True),
+        sa.Column('related_pr_number', sa.Integer(), nullable=True),
+        sa.Column('related_repo', sa.String(length=255), nullable=True),
+        sa.Column('lines_added', sa.Integer(), nullable=True),
+        sa.Column('lines_removed', sa.Integer(), nullable=True),
+        sa.Column('files_changed', sa.Integer(), nullable=True),
+        sa.Column('extra_data', sa.JSON(), nullable=True),
+        # The partition key must be part of the primary key, hence NOT NULL
+        sa.Column('timestamp', sa.DateTime(), nullable=not partitioned),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id', 'timestamp') if partitioned else sa.PrimaryKeyConstraint('id'),
+    ]
+
+
+def _next_month(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+def _swap_out_old_table() -> None:
+    """Rename the current table and free its index/constraint names."""
+    op.rename_table('user_activities', 'user_activities_old')
+    op.execute('ALTER TABLE user_activities_old RENAME CONSTRAINT user_activities_pkey TO user_activities_old_pkey')
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name='user_activities_old')
+
+
+def upgrade() -> None:
+    """Rebuild user_activities as a RANGE (timestamp) partitioned table."""
+    _swap_out_old_table()
+
+    op.create_table('user_activities', *_columns(partitioned=True),
+                    postgresql_partition_by='RANGE (timestamp)')
+    op.execute('CREATE TABLE user_activities_default PARTITION OF user_activities DEFAULT')
+
+    # One partition per month from the oldest row until MONTHS_AHEAD from now
+    oldest = op.get_bind().execute(sa.text('SELECT min(timestamp) FROM user_activities_old')).scalar()
+    month = (oldest or datetime.utcnow()).date().replace(day=1)
+    last = datetime.utcnow().date().replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        end = _next_month(month)
+        op.execute(
+            f"CREATE TABLE user_activities_p{month:%Y_%m} PARTITION OF user_activities "
+            f"FOR VALUES FROM ('{month}') TO ('{end}')"
+        )
+        month = end
+
+    # Indexes on the parent are created on every partition
+    for name, columns in INDEXES:
+        op.create_index(name, 'user_activities', columns, unique=False)
+
+    op.execute(
+        'INSERT INTO user_activities SELECT id, user_id, user_identifier, team_id, activity_type, '
+        'title, description, source, source_id, source_url, related_files, related_task_id, '
+        'related_pr_number, related_repo, lines_added, lines_removed, files_changed, extra_data, '
+        "COALESCE(timestamp, now() AT TIME ZONE 'utc') FROM user_activities_old"
+    )
+    op.drop_table('user_activities_old')
+
+
+def downgrade() -> None:
+    """Copy rows back into a plain, unpartitioned user_activities table."""
+    _swap_out_old_table()
+
+    op.create_table('user_activities', *_columns(partitioned=False))
+    for name, columns in INDEXES:
+        op.create_index(name, 'user_activities', columns, unique=False)
+
+    op.execute('INSERT INTO user_activities SELECT * FROM user_activities_old')
+    # Dropping the parent drops all of its partitions
+    op.drop_table('user_activities_old')
@@ -0,0 +1,53 @@
+"""Add covering and composite indexes for the productivity aggregates
+
+Revision ID: e5a9c3d7f1b2
+Revises: d2f6b8a4c1e9
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9c3d7f1b2'
+down_revision: Union[str, Sequence[str], None] = 'd2f6b8a4c1e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+USER_TEAM_TS = ['user_identifier', 'team_id', sa.text('timestamp DESC')]
+
+
+def upgrade() -> None:
+    """Make the (user, team, timestamp) index covering and index the per-user counts."""
+    # Index-only scans for the per-type counts and line/file sums
+    op.drop_index('idx_activity_user_team_ts', table_name='user_activities')
+    op.create_index(
+        'idx_activity_user_team_ts',
+        'user_activities',
+        USER_TEAM_TS,
+        unique=False,
+        postgresql_include=['activity_type', 'lines_added', 'lines_removed', 'files_changed'],
+    )
+    op.create_index(
+        'idx_knowledge_user_team_created',
+        'knowledge_entries',
+        ['user_id', 'team_id', 'created_at'],
+        unique=False,
+    )
+    op.create_index(
+        'idx_decision_decider_team_created',
+        'decisions',
+        ['decided_by', 'team_id', 'created_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the composites and restore the non-covering activity index."""
+    op.drop_index('idx_decision_decider_team_created', table_name='decisions')
+    op.drop_index('idx_knowledge_user_team_created', table_name='knowledge_entries')
+    op.drop_index('idx_activity_user_team_ts', table_name='user_activities')
+    op.create_index('idx_activity_user_team_ts', 'user_activities', USER_TEAM_TS, unique=False)
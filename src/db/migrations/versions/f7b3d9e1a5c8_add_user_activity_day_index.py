@@ -0,0 +1,33 @@
+"""Add (user, team, timestamp::date) expression index to user_activities
+
+Revision ID: f7b3d9e1a5c8
+Revises: e5a9c3d7f1b2
+Create Date: 2026-10-16 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b3d9e1a5c8'
+down_revision: Union[str, Sequence[str], None] = 'e5a9c3d7f1b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index the activity date so per-day breakdowns avoid a sort."""
+    op.create_index(
+        'idx_activity_user_team_day',
+        'user_activities',
+        ['user_identifier', 'team_id', sa.text('CAST(timestamp AS DATE)')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the activity date index."""
+    op.drop_index('idx_activity_user_team_day', table_name='user_activities')
@@ -189,7 +189,8 @@ async def process_push_event(event_id: str, payload: dict):
                 commit_message=message,
                 files=all_files,
                 commit_url=commit.get("url"),
-                timestamp=datetime.fromisoformat(commit.get("timestamp", "").replace("Z", "+00:00")) if commit.get("timestamp") else None
+                timestamp=datetime.fromisoformat(commit.get("timestamp", "").replace("Z", "+00:00")) if commit.get("timestamp") else None,
+                deferred=True
             )
             
             # 2. Update file ownership
@@ -322,7 +323,8 @@ async def process_pull_request_event(event_id: str, payload: dict):
                 pr_number=pr_number,
                 pr_title=pr_title,
                 action="opened",
-                pr_url=pr_url
+                pr_url=pr_url,
+                deferred=True
             )
             
             # Store in knowledge base
@@ -383,7 +385,8 @@ async def process_pull_request_event(event_id: str, payload: dict):
                 pr_number=pr_number,
                 pr_title=pr_title,
                 action="merged" if is_merged else "closed",
-                pr_url=pr_url
+                pr_url=pr_url,
+                deferred=True
             )
             
             if is_merged:
@@ -440,7 +443,8 @@ async def process_pr_review(event_id: str, payload: dict):
             repo=repo,
             pr_number=pr_number,
             review_state=review_state,
-            pr_url=pr_url
+            pr_url=pr_url,
+            deferred=True
         )
         
         # Store review content
@@ -10,13 +10,16 @@ Handles:
 - /challenge → Challenge a decision
 """
 
+import asyncio
+import json
 import re
+
+import orjson
 from slack_bolt.async_app import AsyncApp
 from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
 
 from src.agents.knowledge_agent import query_agent
-from src.vectors.embeddings import embedding_service
-from src.vectors.qdrant_client import vector_store
+from src.vectors.batcher import insert_batcher
 from src.services.automation import nl_parser, rule_manager
 from src.integrations.slack.team_mapper import get_team_id_for_slack_channel
 from src.config.settings import get_settings
@@ -30,6 +33,9 @@ app = AsyncApp(
     signing_secret=settings.slack_signing_secret
 )
 
+# Strong references to fire-and-forget tasks so they aren't garbage collected
+_background_tasks: set[asyncio.Task] = set()
+
 
 # ============================================================================
 # @MENTIONS - AI Agent Queries
@@ -180,6 +186,28 @@ async def handle_supymem_command(ack, respond, command):
         )
 
 
+async def _do_remember(respond, text: str, user_id: str, channel_id: str):
+    """Embed and store a /remember entry, reporting failures back to the user."""
+    try:
+        # Map Slack channel to database team for cross-platform integration
+        team_id = await get_team_id_for_slack_channel(channel_id)
+        
+        # Store in knowledge base with proper team_id
+        await insert_batcher.submit({
+            "content": text,
+            "source": "slack",
+            "team_id": team_id,
+            "user_id": user_id,
+            "slack_channel_id": channel_id  # Keep original for reference
+        })
+    except Exception as e:
+        logger.error("Remember command error", error=str(e))
+        await respond(
+            text="Sorry, I couldn't store that information.",
+            response_type="ephemeral"
+        )
+
+
 @app.command("/remember")
 async def handle_remember_command(ack, respond, command):
     """Handle /remember [info] - Store knowledge."""
@@ -196,33 +224,16 @@ async def handle_remember_command(ack, respond, command):
         )
         return
 
-    try:
-        # Map Slack channel to database team for cross-platform integration
-        team_id = await get_team_id_for_slack_channel(channel_id)
-        
-        # Store in knowledge base with proper team_id
-        embeddings = await embedding_service.embed(text)
-        await vector_store.insert(
-            vectors=embeddings,
-            payloads=[{
-                "content": text,
-                "source": "slack",
-                "team_id": team_id,
-                "user_id": user_id,
-                "slack_channel_id": channel_id  # Keep original for reference
-            }]
-        )
+    # Embedding can be slow on a cold model, so store in the background and
+    # answer right away to stay well inside Slack's response deadline
+    task = asyncio.create_task(_do_remember(respond, text, user_id, channel_id))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
 
-        await respond(
-            text=f"✅ Got it! I'll remember: _{text}_",
-            response_type="ephemeral"
-        )
-    except Exception as e:
-        logger.error("Remember command error", error=str(e))
-        await respond(
-            text="Sorry, I couldn't store that information.",
-            response_type="ephemeral"
-        )
+    await respond(
+        text=f"✅ Got it! I'll remember: _{text}_",
+        response_type="ephemeral"
+    )
 
 
 @app.command("/automate")
@@ -325,13 +336,14 @@ async def handle_my_tasks_command(ack, respond, command):
         from src.database.models import Task
 
         async with get_session() as session:
+            # Only the displayed columns are needed, so skip ORM hydration
             result = await session.execute(
-                select(Task).where(
+                select(Task.title, Task.priority, Task.status).where(
                     Task.assigned_to == user_id,
                     Task.status.in_(["pending", "in_progress"])
-                ).order_by(Task.priority.desc(), Task.created_at.desc()).limit(10)
+                ).order_by(Task.priority_rank.asc(), Task.created_at.desc()).limit(10)
             )
-            tasks = result.scalars().all()
+            tasks = result.all()
 
         if not tasks:
             await respond(
@@ -350,14 +362,14 @@ async def handle_my_tasks_command(ack, respond, command):
         priority_emoji = {"urgent": "🔴", "high": "🟠", "medium": "🟡", "low": "🟢"}
         status_emoji = {"pending": "⏳", "in_progress": "🔄"}
 
-        for task in tasks:
-            emoji = priority_emoji.get(task.priority, "⚪")
-            status = status_emoji.get(task.status, "")
+        for title, priority, task_status in tasks:
+            emoji = priority_emoji.get(priority, "⚪")
+            status = status_emoji.get(task_status, "")
             blocks.append({
                 "type": "section",
                 "text": {
                     "type": "mrkdwn",
-                    "text": f"{emoji} {status} *{task.title}*\n_{task.status}_ | Priority: {task.priority}"
+                    "text": f"{emoji} {status} *{title}*\n_{task_status}_ | Priority: {priority}"
                 }
             })
 
@@ -466,12 +478,37 @@ async def handle_message(event, client):
 # STARTUP
 # ============================================================================
 
+class _OrjsonCodec:
+    """Drop-in for the ``json`` module that serializes with orjson."""
+
+    loads = staticmethod(json.loads)
+    decoder = json.decoder
+
+    @staticmethod
+    def dumps(obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+
+
+def _use_orjson_for_responses():
+    """
+    Serialize respond() payloads with orjson.
+
+    Bolt posts block payloads to the command's response_url through
+    slack_sdk's AsyncWebhookClient, which calls ``json.dumps`` directly and
+    offers no serializer hook, so its module-level ``json`` is swapped.
+    """
+    from slack_sdk.webhook import async_client as webhook_async_client
+
+    webhook_async_client.json = _OrjsonCodec
+
+
 async def start_slack_bot():
     """Start the Slack bot in Socket Mode."""
     if not settings.slack_bot_token or not settings.slack_app_token:
         logger.warning("Slack tokens not configured, bot will not start")
         return
     
+    _use_orjson_for_responses()
     handler = AsyncSocketModeHandler(app, settings.slack_app_token)
     logger.info("Starting Slack bot in Socket Mode...")
     await handler.start_async()
@@ -3,7 +3,8 @@ import re
 
 from src.agents.knowledge_agent import query_agent
 from src.vectors.embeddings import embedding_service
-from src.vectors.qdrant_client import vector_store
+from src.vectors.qdrant_client import SearchHit, vector_store
+from src.vectors.batcher import insert_batcher
 from src.config.logging import get_logger
 
 logger = get_logger(__name__)
@@ -37,16 +38,12 @@ async def handle_remember(
 ) -> str:
     """Store knowledge from Slack."""
     try:
-        embeddings = await embedding_service.embed(text)
-        await vector_store.insert(
-            vectors=embeddings,
-            payloads=[{
-                "content": text,
-                "source": source,
-                "team_id": team_id,
-                "user_id": user_id,
-            }]
-        )
+        await insert_batcher.submit({
+            "content": text,
+            "source": source,
+            "team_id": team_id,
+            "user_id": user_id,
+        })
         return f"Got it! I'll remember: _{text}_"
     except Exception as e:
         logger.error("Remember handling failed", error=str(e))
@@ -57,11 +54,11 @@ async def handle_search(
     query: str,
     team_id: str,
     limit: int = 5,
-) -> List[Dict[str, Any]]:
+) -> List[SearchHit]:
     """Search knowledge from Slack."""
     try:
         embeddings = await embedding_service.embed(query)
-        results = await vector_store.search(
+        results = await vector_store.search_hits(
             query_vector=embeddings[0],
             limit=limit,
             filters={"team_id": team_id},
@@ -72,19 +69,15 @@ async def handle_search(
         return []
 
 
-def format_search_results(results: List[Dict[str, Any]]) -> str:
+def format_search_results(results: List[SearchHit]) -> str:
     """Format search results for Slack display."""
     if not results:
         return "No results found."
 
-    formatted = []
-    for i, r in enumerate(results, 1):
-        content = r.get("payload", {}).get("content", "")
-        source = r.get("payload", {}).get("source", "unknown")
-        score = r.get("score", 0)
-        formatted.append(f"{i}. [{source}] {content[:200]}... (score: {score:.2f})")
-
-    return "\n".join(formatted)
+    return "\n".join(
+        f"{i}. [{r.source}] {r.content[:200]}... (score: {r.score:.2f})"
+        for i, r in enumerate(results, 1)
+    )
 
 
 def extract_code_blocks(text: str) -> List[str]:
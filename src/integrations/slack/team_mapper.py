@@ -17,6 +17,10 @@ logger = get_logger(__name__)
 # Cache for team mappings (channel_id -> team_id)
 _channel_team_cache: dict[str, str] = {}
 
+# Only every Nth "no mapping" warning is logged
+_UNMAPPED_WARNING_SAMPLE_RATE = 100
+_unmapped_warning_count = 0
+
 
 async def get_team_id_for_slack_channel(channel_id: str, workspace_id: Optional[str] = None) -> str:
     """
@@ -54,7 +58,7 @@ async def get_team_id_for_slack_channel(channel_id: str, workspace_id: Optional[
             team = result.scalar_one_or_none()
             
             if team:
-                logger.info("Found team for Slack channel", channel_id=channel_id, team_id=team.id)
+                logger.debug("Found team for Slack channel", channel_id=channel_id, team_id=team.id)
                 _channel_team_cache[channel_id] = team.id
                 return team.id
             
@@ -78,7 +82,7 @@ async def get_team_id_for_slack_channel(channel_id: str, workspace_id: Optional[
                     default_team = result.scalar_one_or_none()
                     
                     if default_team:
-                        logger.info("Using org default team for channel", 
+                        logger.debug("Using org default team for channel", 
                                    channel_id=channel_id, team_id=default_team.id)
                         _channel_team_cache[channel_id] = default_team.id
                         return default_team.id
@@ -90,13 +94,20 @@ async def get_team_id_for_slack_channel(channel_id: str, workspace_id: Optional[
             default_team = result.scalar_one_or_none()
             
             if default_team:
-                logger.info("Using global default team for unmapped channel", 
+                logger.debug("Using global default team for unmapped channel", 
                            channel_id=channel_id, team_id=default_team.id)
                 _channel_team_cache[channel_id] = default_team.id
                 return default_team.id
             
             # No mapping found - use demo team as fallback for cross-platform sync
-            logger.warning("No team mapping found for Slack channel, using demo team", channel_id=channel_id)
+            global _unmapped_warning_count
+            if _unmapped_warning_count % _UNMAPPED_WARNING_SAMPLE_RATE == 0:
+                logger.warning(
+                    "No team mapping found for Slack channel, using demo team",
+                    channel_id=channel_id,
+                    occurrences=_unmapped_warning_count + 1,
+                )
+            _unmapped_warning_count += 1
             _channel_team_cache[channel_id] = "team-demo-001"
             return "team-demo-001"
             
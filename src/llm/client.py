@@ -1,11 +1,15 @@
+import asyncio
 from typing import List, Dict, AsyncIterator, Optional
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, APIError, APIConnectionError, APITimeoutError, RateLimitError
 from src.config.settings import get_settings
 from src.config.logging import get_logger
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Failures that mean "try the next provider"; anything else is a bug and propagates
+PROVIDER_ERRORS = (APIError, APIConnectionError, RateLimitError, APITimeoutError, asyncio.TimeoutError)
+
 
 class LLMClient:
     def __init__(self):
@@ -47,53 +51,105 @@ class LLMClient:
         else:  # ollama
             return requested_model  # Use requested model (llama3.2, etc.)
 
+    async def _complete_with(
+        self,
+        client_type: str,
+        client: AsyncOpenAI,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Run one completion against a single provider."""
+        response = await client.chat.completions.create(
+            model=self._get_model_for_client(client_type, model),
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content
+
+    async def _race_cloud_providers(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Query OpenAI and Groq concurrently and return the first success."""
+        pending = {
+            asyncio.create_task(self._complete_with(
+                client_type, client, messages, model, temperature, max_tokens
+            ))
+            for client_type, client in (("openai", self.openai_client), ("groq", self.groq_client))
+        }
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                    if not isinstance(last_error, PROVIDER_ERRORS):
+                        raise last_error
+                    logger.warning("Cloud provider failed during race", error=str(last_error))
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+
     async def complete(
         self,
         messages: List[Dict[str, str]],
         model: str = "llama3.2",
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        urgent: bool = False
     ) -> str:
-        """Generate completion with automatic fallback."""
-        
-        # Try OpenAI first (if configured)
-        if self.openai_client:
-            try:
-                response = await self.openai_client.chat.completions.create(
-                    model=self._get_model_for_client("openai", model),
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
-                return response.choices[0].message.content
-            except Exception as e:
-                logger.warning("OpenAI failed, trying fallback", error=str(e))
-        
-        # Try Groq second (if configured)
-        if self.groq_client:
+        """
+        Generate completion with automatic fallback.
+
+        With ``urgent=True`` and both OpenAI and Groq configured, the two are
+        queried concurrently and the first success wins, so a degraded
+        provider doesn't add its full timeout to user-facing latency. Leave it
+        off for background work, where the extra request is wasted spend.
+        """
+        if urgent and self.openai_client and self.groq_client:
             try:
-                response = await self.groq_client.chat.completions.create(
-                    model=self._get_model_for_client("groq", model),
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
-                return response.choices[0].message.content
-            except Exception as e:
-                logger.warning("Groq failed, trying Ollama fallback", error=str(e))
-        
+                return await self._race_cloud_providers(messages, model, temperature, max_tokens)
+            except PROVIDER_ERRORS as e:
+                logger.warning("OpenAI and Groq failed, trying Ollama fallback", error=str(e))
+        else:
+            # Try OpenAI first (if configured)
+            if self.openai_client:
+                try:
+                    return await self._complete_with(
+                        "openai", self.openai_client, messages, model, temperature, max_tokens
+                    )
+                except PROVIDER_ERRORS as e:
+                    logger.warning("OpenAI failed, trying fallback", error=str(e))
+
+            # Try Groq second (if configured)
+            if self.groq_client:
+                try:
+                    return await self._complete_with(
+                        "groq", self.groq_client, messages, model, temperature, max_tokens
+                    )
+                except PROVIDER_ERRORS as e:
+                    logger.warning("Groq failed, trying Ollama fallback", error=str(e))
+
         # Fallback to Ollama (local)
         try:
-            response = await self.ollama_client.chat.completions.create(
-                model=self._get_model_for_client("ollama", model),
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens
+            return await self._complete_with(
+                "ollama", self.ollama_client, messages, model, temperature, max_tokens
             )
-            return response.choices[0].message.content
-        except Exception as e:
+        except PROVIDER_ERRORS as e:
             logger.error("All LLM providers failed", error=str(e))
             raise
+        except Exception:
+            logger.error("Unexpected error from Ollama", exc_info=True)
+            raise
 
     async def stream(
         self,
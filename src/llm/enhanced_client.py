@@ -1,17 +1,34 @@
 """
 Enhanced LLM client with caching and retry logic.
 """
-from typing import List, Dict, Optional, AsyncIterator
+from typing import List, Dict, Optional, AsyncIterator, Tuple
+from functools import partial
 import asyncio
+import inspect
+import random
+import time
+import uuid
+
+import orjson
+from blake3 import blake3
 from openai import AsyncOpenAI, APIError, RateLimitError, APITimeoutError
+from qdrant_client.models import Range
 
 from src.config.settings import get_settings
 from src.config.logging import get_logger
 from src.cache.advanced_cache import cache
+from src.llm.client import PROVIDER_ERRORS
+from src.llm.router import ModelPool
+from src.vectors.embeddings import embedding_service
+from src.vectors.qdrant_client import VectorStore
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Semantic cache: minimum cosine similarity for a paraphrase to count as a hit
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_TTL = 3600
+
 
 class EnhancedLLMClient:
     """Enhanced LLM client with advanced features."""
@@ -38,6 +55,30 @@ class EnhancedLLMClient:
             api_key="ollama"
         )
         logger.info("Ollama client initialized")
+        
+        # Routing order and circuit breakers across the configured providers
+        self.pool = ModelPool(strategy=settings.llm_routing_strategy)
+        self.pool.add("openai", self.openai_client)
+        self.pool.add("groq", self.groq_client)
+        self.pool.add("ollama", self.ollama_client)
+        
+        # Streaming uses the highest-priority provider; Ollama is always present
+        primary = self.pool.deployments[0]
+        self._primary_client: AsyncOpenAI = primary.client
+        self._primary_type: str = primary.name
+        
+        # Generations currently running, shared by identical requests, keyed by cache key
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
+        # Fire-and-forget cache writes, referenced so they aren't collected early
+        self._bg_tasks: set[asyncio.Task] = set()
+        
+        # Semantic cache lives in its own collection, created on first use
+        self.semantic_cache = VectorStore(
+            collection_name="llm_semcache",
+            payload_indexes={"context_key": "keyword", "created_at": "float"}
+        )
+        self._semantic_cache_ready = False
     
     def _get_model_for_client(self, client_type: str, requested_model: str) -> str:
         """Get appropriate model name for each provider."""
@@ -50,24 +91,146 @@ class EnhancedLLMClient:
     
     def _get_cache_key(self, messages: List[Dict[str, str]], model: str, temperature: float) -> str:
         """Generate cache key for request."""
-        import hashlib
-        content = f"{model}:{temperature}:{str(messages)}"
-        return f"llm:{hashlib.md5(content.encode()).hexdigest()}"
+        # Sorted-key JSON gives a stable byte encoding regardless of dict order
+        content = orjson.dumps((model, temperature, messages), option=orjson.OPT_SORT_KEYS)
+        return f"llm:{blake3(content).hexdigest(16)}"
+    
+    @staticmethod
+    def _has_tool_traffic(messages: List[Dict[str, str]]) -> bool:
+        """Whether the prompt carries tool/function calls or their output."""
+        return any(
+            m.get("role") in ("tool", "function") or "tool_calls" in m or "function_call" in m
+            for m in messages
+        )
+    
+    def _is_semantic_cacheable(self, messages: List[Dict[str, str]]) -> bool:
+        """Only plain question/answer prompts are reused; tool traffic is not."""
+        if not messages or messages[-1].get("role") != "user":
+            return False
+        return not self._has_tool_traffic(messages)
+    
+    def _admit_to_cache(self, messages: List[Dict[str, str]]) -> bool:
+        """
+        Admission policy for the response cache.
+        
+        Huge prompts (long RAG context) and tool-call exchanges are almost
+        never repeated verbatim, so storing them only evicts hotter entries.
+        """
+        if self._has_tool_traffic(messages):
+            return False
+        return len(orjson.dumps(messages)) < settings.llm_cache_max_bytes
+    
+    async def _semantic_lookup(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float
+    ) -> Tuple[Optional[List[float]], Optional[str], Optional[str]]:
+        """
+        Look for a cached response to a paraphrase of the last user message.
+        
+        Matches are restricted to requests with identical model, temperature
+        and preceding messages (system prompt, retrieved context, history),
+        stored within the last SEMANTIC_CACHE_TTL seconds.
+        
+        Returns:
+            (embedding of the last user message, context key, cached response)
+        """
+        if not self._semantic_cache_ready:
+            await self.semantic_cache.initialize()
+            self._semantic_cache_ready = True
+        
+        embeddings = await embedding_service.embed(messages[-1]["content"])
+        context_key = self._get_cache_key(messages[:-1], model, temperature)
+        # Expired entries are filtered out by the search itself, so they
+        # can't shadow a fresher match
+        hits = await self.semantic_cache.search(
+            query_vector=embeddings[0],
+            limit=1,
+            filters={
+                "context_key": context_key,
+                "created_at": Range(gte=time.time() - SEMANTIC_CACHE_TTL),
+            },
+            score_threshold=SEMANTIC_CACHE_THRESHOLD
+        )
+        
+        if hits:
+            return embeddings[0], context_key, hits[0]["payload"].get("response")
+        return embeddings[0], context_key, None
+    
+    async def _semantic_store(
+        self,
+        vector: List[float],
+        context_key: str,
+        cache_key: str,
+        content: str
+    ) -> None:
+        """Store a response for paraphrase lookups; the exact prompt maps to one point."""
+        try:
+            await self.semantic_cache.insert(
+                vectors=[vector],
+                payloads=[{
+                    "context_key": context_key,
+                    "response": content,
+                    "created_at": time.time()
+                }],
+                # Deterministic id: a refreshed entry replaces the expired one
+                ids=[str(uuid.uuid5(uuid.NAMESPACE_OID, cache_key))]
+            )
+        except Exception as e:
+            logger.warning("Semantic cache store failed", error=str(e))
+    
+    @staticmethod
+    def _get_retry_after(error: Exception) -> Optional[float]:
+        """Read the provider's Retry-After hint (seconds) from an error response."""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+        try:
+            if "retry-after-ms" in headers:
+                return float(headers["retry-after-ms"]) / 1000
+            if "retry-after" in headers:
+                return float(headers["retry-after"])
+        except (TypeError, ValueError):
+            pass
+        return None
     
     async def _retry_with_backoff(
         self,
         func,
         max_retries: int = 3,
-        base_delay: float = 1.0
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        timeout: Optional[float] = None
     ):
-        """Retry function with exponential backoff."""
+        """
+        Retry function with full-jitter exponential backoff.
+        
+        Args:
+            timeout: Overall budget in seconds for all attempts and sleeps;
+                asyncio.TimeoutError is raised once it runs out, and the last
+                error is raised early if the next backoff would overrun it
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        
         for attempt in range(max_retries):
             try:
-                return await func()
+                if deadline is None:
+                    return await func()
+                return await asyncio.wait_for(func(), max(deadline - loop.time(), 0))
             except (RateLimitError, APITimeoutError) as e:
                 if attempt == max_retries - 1:
                     raise
-                delay = base_delay * (2 ** attempt)
+                # Randomize so concurrent callers don't retry in lockstep
+                delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+                retry_after = self._get_retry_after(e)
+                if retry_after is not None:
+                    delay = max(delay, min(retry_after, max_delay))
+                # No point sleeping if no time would be left for the retry
+                if deadline is not None and loop.time() + delay >= deadline:
+                    raise
                 logger.warning(
                     "LLM request failed, retrying",
                     attempt=attempt + 1,
@@ -79,6 +242,24 @@ class EnhancedLLMClient:
                 logger.error("LLM API error", error=str(e))
                 raise
     
+    def _spawn(self, coro) -> None:
+        """Run a coroutine off the response path, keeping a reference until done."""
+        task = asyncio.create_task(coro)
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+    
+    def _finish_inflight(self, cache_key: str, task: asyncio.Task) -> None:
+        """Forget a finished shared generation."""
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved in case every caller gave up
+    
+    async def drain(self) -> None:
+        """Wait for pending background writes; call on shutdown."""
+        if self._bg_tasks:
+            await asyncio.gather(*self._bg_tasks, return_exceptions=True)
+    
     async def complete(
         self,
         messages: List[Dict[str, str]],
@@ -86,7 +267,9 @@ class EnhancedLLMClient:
         temperature: float = 0.7,
         max_tokens: int = 2000,
         use_cache: bool = True,
-        stream: bool = False
+        stream: bool = False,
+        semantic: bool = False,
+        timeout: Optional[float] = None
     ) -> str:
         """
         Generate completion with caching and retry logic.
@@ -98,61 +281,112 @@ class EnhancedLLMClient:
             max_tokens: Max tokens to generate
             use_cache: Whether to use response caching
             stream: Whether to stream response
+            semantic: Also reuse responses to paraphrased questions
+                (embedding similarity on the last user message)
+            timeout: Seconds the caller is willing to wait, across retries
+                and provider fallbacks
         """
+        # Hashed once here and reused for the lookup, coalescing and the store
+        cache_key = self._get_cache_key(messages, model, temperature) if use_cache else None
+        
         # Check cache first
-        if use_cache and not stream:
-            cache_key = self._get_cache_key(messages, model, temperature)
+        if cache_key and not stream:
             cached_response = await cache.get(cache_key)
             if cached_response:
                 logger.debug("LLM cache hit", model=model)
                 return cached_response
+            
+            # An identical request is already running: share its result
+            inflight = self._inflight.get(cache_key)
+            if inflight is not None:
+                logger.debug("Joining in-flight LLM request", model=model)
+                return await asyncio.wait_for(asyncio.shield(inflight), timeout)
+            
+            # Generate in a task of its own so a caller that is cancelled
+            # doesn't cancel the joiners waiting on the same result
+            task = asyncio.create_task(self._generate(
+                messages, model, temperature, max_tokens, cache_key, semantic, timeout
+            ))
+            self._inflight[cache_key] = task
+            task.add_done_callback(partial(self._finish_inflight, cache_key))
+            return await asyncio.shield(task)
         
-        # Try providers in order
-        response = None
-        used_model = model
-        
-        if self.openai_client:
+        return await self._generate(
+            messages, model, temperature, max_tokens, cache_key, semantic and not stream, timeout
+        )
+    
+    async def _generate(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        cache_key: Optional[str],
+        semantic: bool,
+        timeout: Optional[float] = None
+    ) -> str:
+        """Run the provider chain for a cache miss and store the result under cache_key."""
+        semantic_vector = None
+        if cache_key and semantic and self._is_semantic_cacheable(messages):
             try:
-                used_model = self._get_model_for_client("openai", model)
-                response = await self._retry_with_backoff(
-                    lambda: self.openai_client.chat.completions.create(
-                        model=used_model,
-                        messages=messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens
-                    )
+                semantic_vector, context_key, cached_response = await self._semantic_lookup(
+                    messages, model, temperature
                 )
+                if cached_response:
+                    logger.debug("LLM semantic cache hit", model=model)
+                    return cached_response
             except Exception as e:
-                logger.warning("OpenAI failed", error=str(e))
+                semantic_vector = None
+                logger.warning("Semantic cache lookup failed", error=str(e))
         
-        if not response and self.groq_client:
-            try:
-                used_model = self._get_model_for_client("groq", model)
-                response = await self._retry_with_backoff(
-                    lambda: self.groq_client.chat.completions.create(
-                        model=used_model,
-                        messages=messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens
-                    )
-                )
-            except Exception as e:
-                logger.warning("Groq failed", error=str(e))
+        # Try providers in routing order, skipping any with an open circuit
+        response = None
+        used_model = model
+        last_error: Optional[Exception] = None
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
         
-        if not response:
+        for deployment in self.pool.candidates():
+            remaining = deadline - loop.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                break
+            if not self.pool.try_acquire(deployment):
+                continue
+            used_model = self._get_model_for_client(deployment.name, model)
+            started = time.perf_counter()
             try:
-                used_model = self._get_model_for_client("ollama", model)
                 response = await self._retry_with_backoff(
-                    lambda: self.ollama_client.chat.completions.create(
+                    partial(
+                        deployment.client.chat.completions.create,
                         model=used_model,
                         messages=messages,
                         temperature=temperature,
                         max_tokens=max_tokens
-                    )
+                    ),
+                    timeout=remaining
                 )
-            except Exception as e:
-                logger.error("All LLM providers failed", error=str(e))
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                # The caller gave up or its time budget ran out; that says
+                # nothing about the provider, so don't count it against it
+                self.pool.release(deployment)
+                raise
+            except PROVIDER_ERRORS as e:
+                self.pool.record_failure(deployment)
+                last_error = e
+                logger.warning("LLM provider failed", provider=deployment.name, error=str(e))
+                continue
+            except Exception:
+                # Release a half-open probe slot, but don't mask the bug with a fallback
+                self.pool.record_failure(deployment)
+                logger.error("Unexpected LLM provider error", provider=deployment.name, exc_info=True)
                 raise
+            self.pool.record_success(deployment, time.perf_counter() - started)
+            break
+        
+        if response is None:
+            logger.error("All LLM providers failed", error=str(last_error))
+            raise last_error or RuntimeError("No LLM provider available (all circuits open)")
         
         # Extract response
         content = response.choices[0].message.content
@@ -160,9 +394,11 @@ class EnhancedLLMClient:
         logger.info("LLM completion", model=used_model)
         
         # Cache response
-        if use_cache:
-            cache_key = self._get_cache_key(messages, model, temperature)
-            await cache.set(cache_key, content, ttl=3600)  # 1 hour
+        if cache_key and self._admit_to_cache(messages):
+            self._spawn(cache.set(cache_key, content, ttl=3600))  # 1 hour
+        
+        if semantic_vector is not None:
+            self._spawn(self._semantic_store(semantic_vector, context_key, cache_key, content))
         
         return content
     
@@ -172,14 +408,17 @@ class EnhancedLLMClient:
         model: str = "llama3.2",
         temperature: float = 0.7
     ) -> AsyncIterator[str]:
-        """Stream completion tokens."""
-        client = self.openai_client or self.groq_client or self.ollama_client
-        used_model = self._get_model_for_client(
-            "openai" if self.openai_client else ("groq" if self.groq_client else "ollama"),
-            model
-        )
+        """
+        Stream completion tokens.
+        
+        This must stay an async generator. Handed to a StreamingResponse, it is
+        iterated on the event loop; a sync iterator would instead be run
+        through Starlette's thread pool one chunk at a time, which is far
+        slower. Routes should use stream_sse() for event-stream responses.
+        """
+        used_model = self._get_model_for_client(self._primary_type, model)
         
-        stream = await client.chat.completions.create(
+        stream = await self._primary_client.chat.completions.create(
             model=used_model,
             messages=messages,
             temperature=temperature,
@@ -189,7 +428,26 @@ class EnhancedLLMClient:
         async for chunk in stream:
             if chunk.choices[0].delta.content:
                 yield chunk.choices[0].delta.content
+    
+    async def stream_sse(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "llama3.2",
+        temperature: float = 0.7
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream completion tokens as Server-Sent Events frames.
+        
+        Usage:
+            StreamingResponse(enhanced_llm_client.stream_sse(messages), media_type="text/event-stream")
+        """
+        async for delta in self.stream_complete(messages, model, temperature):
+            yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+
 
+# Streaming routes rely on these being async generators (see stream_complete)
+assert inspect.isasyncgenfunction(EnhancedLLMClient.stream_complete)
+assert inspect.isasyncgenfunction(EnhancedLLMClient.stream_sse)
 
 # Global instance
 enhanced_llm_client = EnhancedLLMClient()
@@ -0,0 +1,127 @@
+"""
+Provider routing for LLM clients.
+
+A ModelPool holds the configured provider deployments, orders them by a
+routing strategy and keeps a circuit breaker per deployment so a provider
+that keeps failing is skipped outright instead of being retried on every
+request.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+import enum
+import time
+
+from openai import AsyncOpenAI
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"        # Healthy, requests flow
+    OPEN = "open"            # Failing, skipped until the cooldown passes
+    HALF_OPEN = "half_open"  # Cooldown over, a single probe request is allowed
+
+
+class RoutingStrategy(str, enum.Enum):
+    PRIORITY = "priority"        # Registration order (OpenAI -> Groq -> Ollama)
+    ROUND_ROBIN = "round_robin"  # Rotate the starting provider per request
+    LATENCY = "latency"          # Fastest recent average first
+
+
+@dataclass
+class Deployment:
+    """A provider client plus its circuit breaker state."""
+    name: str
+    client: AsyncOpenAI
+    state: CircuitState = CircuitState.CLOSED
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    probe_in_flight: bool = False
+    avg_latency: float = 0.0
+
+
+class ModelPool:
+    """Ordered set of provider deployments with per-deployment circuit breakers."""
+
+    def __init__(
+        self,
+        strategy: str = RoutingStrategy.PRIORITY,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0
+    ):
+        """
+        Args:
+            strategy: One of the RoutingStrategy values
+            failure_threshold: Consecutive failures that open a circuit
+            cooldown: Seconds an open circuit waits before allowing a probe
+        """
+        self.strategy = RoutingStrategy(strategy)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.deployments: List[Deployment] = []
+        self._rotation = 0
+
+    def add(self, name: str, client: Optional[AsyncOpenAI]) -> None:
+        """Register a provider; unconfigured (None) clients are ignored."""
+        if client is not None:
+            self.deployments.append(Deployment(name=name, client=client))
+
+    def candidates(self) -> List[Deployment]:
+        """Deployments in the order they should be tried for one request."""
+        if self.strategy == RoutingStrategy.ROUND_ROBIN and self.deployments:
+            start = self._rotation % len(self.deployments)
+            self._rotation += 1
+            return self.deployments[start:] + self.deployments[:start]
+        if self.strategy == RoutingStrategy.LATENCY:
+            return sorted(self.deployments, key=lambda d: d.avg_latency)
+        return list(self.deployments)
+
+    def try_acquire(self, deployment: Deployment) -> bool:
+        """Check the circuit breaker; returns False if the deployment must be skipped."""
+        if deployment.state == CircuitState.CLOSED:
+            return True
+
+        if deployment.state == CircuitState.OPEN:
+            if time.monotonic() - deployment.opened_at < self.cooldown:
+                return False
+            deployment.state = CircuitState.HALF_OPEN
+            logger.info("LLM provider circuit half-open", provider=deployment.name)
+
+        # Half-open: let exactly one probe through
+        if deployment.probe_in_flight:
+            return False
+        deployment.probe_in_flight = True
+        return True
+
+    def release(self, deployment: Deployment) -> None:
+        """Free an acquired deployment whose request was abandoned, without scoring it."""
+        deployment.probe_in_flight = False
+
+    def record_success(self, deployment: Deployment, latency: float) -> None:
+        if deployment.state != CircuitState.CLOSED:
+            logger.info("LLM provider circuit closed", provider=deployment.name)
+        deployment.state = CircuitState.CLOSED
+        deployment.consecutive_failures = 0
+        deployment.probe_in_flight = False
+        deployment.avg_latency = (
+            latency if deployment.avg_latency == 0.0
+            else 0.8 * deployment.avg_latency + 0.2 * latency
+        )
+
+    def record_failure(self, deployment: Deployment) -> None:
+        deployment.consecutive_failures += 1
+        deployment.probe_in_flight = False
+        if (
+            deployment.state == CircuitState.HALF_OPEN
+            or deployment.consecutive_failures >= self.failure_threshold
+        ):
+            if deployment.state != CircuitState.OPEN:
+                logger.warning(
+                    "LLM provider circuit opened",
+                    provider=deployment.name,
+                    failures=deployment.consecutive_failures
+                )
+            deployment.state = CircuitState.OPEN
+            deployment.opened_at = time.monotonic()
@@ -1,9 +1,9 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
-from prometheus_client import make_asgi_app
+from prometheus_client import CONTENT_TYPE_LATEST
 import time
 
 from src.config.settings import get_settings
@@ -23,6 +23,11 @@ from src.integrations.github.webhooks import router as github_router
 from src.api.middleware import RequestLoggingMiddleware, TeamContextMiddleware
 from src.api.exceptions import SupymemException, to_http_exception
 from src.cache.advanced_cache import cache
+from src.monitoring.metrics import metrics_snapshot
+from src.services.analytics import activity_tracker
+from src.services.analytics.activity import ensure_activity_partitions
+from src.services.impact import notification_service
+from src.llm.enhanced_client import enhanced_llm_client
 
 settings = get_settings()
 configure_logging(settings.log_level)
@@ -38,6 +43,12 @@ async def lifespan(app: FastAPI):
     await vector_store.initialize()
     logger.info("Vector store initialized")
     
+    # Keep monthly activity partitions ahead of the calendar
+    try:
+        await ensure_activity_partitions()
+    except Exception as e:
+        logger.warning("Could not create activity partitions", error=str(e))
+    
     # Warm cache (optional)
     # await warm_cache([...])
     
@@ -48,6 +59,12 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Supymem-Kiro...")
     
+    # Let fire-and-forget LLM cache writes, buffered activities and
+    # queued notifications finish
+    await enhanced_llm_client.drain()
+    await activity_tracker.drain()
+    await notification_service.drain()
+    
     # Log final metrics
     cache_stats = cache.stats()
     logger.info("Final metrics", cache=cache_stats)
@@ -58,6 +75,7 @@ app = FastAPI(
     description="AI-powered collaborative knowledge agent - Enhanced Edition",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
@@ -135,23 +153,25 @@ app.include_router(export_router, prefix="/api/v1", tags=["export"])
 app.include_router(central_knowledge_router, prefix="/api/v1/central-knowledge", tags=["central-knowledge"])
 app.include_router(github_router, tags=["github"])
 
-# Mount Prometheus metrics endpoint
-metrics_app = make_asgi_app()
-app.mount("/metrics", metrics_app)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus metrics, re-rendered at most every few seconds."""
+    return Response(await metrics_snapshot.render(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.get("/health")
-async def health():
+async def health() -> ORJSONResponse:
     """Health check endpoint."""
-    return {
+    return ORJSONResponse({
         "status": "healthy",
         "version": "0.1.0",
         "timestamp": time.time()
-    }
+    })
 
 
 @app.get("/health/detailed")
-async def detailed_health():
+async def detailed_health() -> ORJSONResponse:
     """Detailed health check with component status."""
     health_status = {
         "status": "healthy",
@@ -185,17 +205,17 @@ async def detailed_health():
         "info": "LLM client available"
     }
     
-    return health_status
+    return ORJSONResponse(health_status)
 
 
 @app.get("/")
-async def root():
+async def root() -> ORJSONResponse:
     """Root endpoint with API information."""
-    return {
+    return ORJSONResponse({
         "name": "Supymem-Kiro API",
         "version": "0.1.0",
         "description": "AI-powered collaborative knowledge agent - Enhanced Edition",
         "docs": "/docs",
         "health": "/health",
         "metrics": "/metrics"
-    }
+    })
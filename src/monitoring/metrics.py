@@ -1,14 +1,85 @@
 """
 Prometheus metrics for monitoring application performance.
 """
-from prometheus_client import Counter, Histogram, Gauge, Info
+from prometheus_client import Counter, Histogram, Gauge, Info, REGISTRY, generate_latest
+from prometheus_client.core import HistogramMetricFamily
+from prometheus_client.registry import Collector, CollectorRegistry
+from prometheus_client.utils import INF, floatToGoString
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
 from functools import wraps
-from time import time
-from typing import Callable, TypeVar, ParamSpec
+from time import perf_counter
+import asyncio
+from typing import Any, Callable, Dict, Optional, ParamSpec, Sequence, Tuple, TypeVar
 
 P = ParamSpec('P')
 T = TypeVar('T')
 
+
+class _FastHistogramChild:
+    """Bucket counts for one label set of a FastHistogram."""
+    __slots__ = ("_edges", "counts", "sum")
+
+    def __init__(self, edges: Tuple[float, ...]):
+        self._edges = edges
+        self.counts = array('Q', [0] * len(edges))
+        self.sum = 0.0
+
+    def observe(self, amount: float) -> None:
+        # Single-writer event loop, so no lock; bisect finds the first edge >= amount
+        self.counts[bisect_left(self._edges, amount)] += 1
+        self.sum += amount
+
+
+class FastHistogram(Collector):
+    """
+    Histogram for very hot paths, with the same name, labels and buckets as
+    prometheus_client.Histogram.
+    
+    observe() is a bisect plus two unlocked increments instead of
+    Histogram's mutex and per-bucket updates. Cumulative buckets are only
+    built when the registry is scraped.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS,
+        registry: Optional[CollectorRegistry] = REGISTRY
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        edges = sorted(float(b) for b in buckets)
+        if edges[-1] != INF:
+            edges.append(INF)
+        self._edges = tuple(edges)
+        self._children: Dict[Tuple[str, ...], _FastHistogramChild] = {}
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, **labelkwargs: str) -> _FastHistogramChild:
+        key = tuple(str(labelkwargs[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = _FastHistogramChild(self._edges)
+        return child
+
+    def collect(self):
+        family = HistogramMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            buckets = []
+            for edge, count in zip(self._edges, child.counts):
+                cumulative += count
+                buckets.append((floatToGoString(edge), cumulative))
+            family.add_metric(list(key), buckets, child.sum)
+        yield family
+
+
 # API Metrics
 http_requests_total = Counter(
     'http_requests_total',
@@ -60,7 +131,7 @@ vector_search_total = Counter(
     ['collection', 'status']
 )
 
-vector_search_duration_seconds = Histogram(
+vector_search_duration_seconds = FastHistogram(
     'vector_search_duration_seconds',
     'Vector search duration in seconds',
     ['collection']
@@ -79,7 +150,7 @@ db_queries_total = Counter(
     ['operation', 'table', 'status']
 )
 
-db_query_duration_seconds = Histogram(
+db_query_duration_seconds = FastHistogram(
     'db_query_duration_seconds',
     'Database query duration in seconds',
     ['operation', 'table']
@@ -143,129 +214,175 @@ app_info.info({
 
 
 # Decorators for automatic metric tracking
-def track_http_request(endpoint: str):
-    """Decorator to track HTTP request metrics."""
+def _status_class(status_code: int) -> str:
+    """Collapse an HTTP status code into its class label (2xx, 4xx, 5xx...)."""
+    return f"{status_code // 100}xx"
+
+
+def _http_status(outcome: Any) -> str:
+    """Status class of a response, or of the exception that replaced it."""
+    default = 500 if isinstance(outcome, Exception) else 200
+    return _status_class(getattr(outcome, 'status_code', default))
+
+
+def _outcome_status(outcome: Any) -> str:
+    return 'error' if isinstance(outcome, Exception) else 'success'
+
+
+@dataclass(slots=True)
+class _BoundChildren:
+    """Label children of one decorated function for one label set."""
+    label_values: Dict[str, str]
+    histogram: Any
+    gauge: Optional[Any]
+    counters: Dict[str, Any] = field(default_factory=dict)
+
+
+def _tracked(
+    counter: Counter,
+    histogram: Histogram,
+    labels: Dict[str, str],
+    status_fn: Callable[[Any], str] = _outcome_status,
+    gauge: Optional[Gauge] = None,
+    dynamic_label: Optional[Tuple[str, str]] = None
+):
+    """
+    Build a decorator that counts and times an async function.
+    
+    Label children are resolved once per label set and kept on the
+    decorated function, so a call only does inc()/observe() on them instead
+    of hashing the label values through .labels() each time.
+    
+    Args:
+        counter: Counter labelled with `labels` plus 'status'
+        histogram: Histogram labelled with `labels`
+        labels: Label values fixed at decoration time
+        status_fn: Maps the result, or the raised exception, to a status label
+        gauge: Optional in-progress gauge with the histogram's labels
+        dynamic_label: (name, default) of a label read from the call's kwargs
+    """
     def decorator(func: Callable[P, T]) -> Callable[P, T]:
+        bound: Dict[Optional[str], _BoundChildren] = {}
+        
+        def bind(key: Optional[str]) -> _BoundChildren:
+            label_values = dict(labels)
+            if dynamic_label:
+                label_values[dynamic_label[0]] = key
+            children = _BoundChildren(
+                label_values=label_values,
+                histogram=histogram.labels(**label_values),
+                gauge=gauge.labels(**label_values) if gauge else None
+            )
+            bound[key] = children
+            return children
+        
         @wraps(func)
         async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
-            method = kwargs.get('method', 'GET')
+            key = kwargs.get(*dynamic_label) if dynamic_label else None
+            children = bound.get(key) or bind(key)
             
-            http_requests_in_progress.labels(method=method, endpoint=endpoint).inc()
-            start_time = time()
+            if children.gauge:
+                children.gauge.inc()
+            start_time = perf_counter()
             
             try:
                 result = await func(*args, **kwargs)
-                status = '200'
+                status = status_fn(result)
                 return result
             except Exception as e:
-                status = '500'
+                status = status_fn(e)
                 raise
             finally:
-                duration = time() - start_time
-                http_requests_total.labels(
-                    method=method,
-                    endpoint=endpoint,
-                    status=status
-                ).inc()
-                http_request_duration_seconds.labels(
-                    method=method,
-                    endpoint=endpoint
-                ).observe(duration)
-                http_requests_in_progress.labels(
-                    method=method,
-                    endpoint=endpoint
-                ).dec()
+                duration = perf_counter() - start_time
+                counter_child = children.counters.get(status)
+                if counter_child is None:
+                    counter_child = counter.labels(**children.label_values, status=status)
+                    children.counters[status] = counter_child
+                counter_child.inc()
+                children.histogram.observe(duration)
+                if children.gauge:
+                    children.gauge.dec()
         
         return wrapper
     return decorator
 
 
+def track_http_request(endpoint: str):
+    """
+    Decorator to track HTTP request metrics.
+    
+    Args:
+        endpoint: Route template such as "/api/v1/knowledge/{id}", never the
+            raw request path; every distinct value creates new time series.
+    """
+    if not isinstance(endpoint, str) or not endpoint.startswith("/"):
+        raise ValueError(f"endpoint must be a route template like '/api/v1/items/{{id}}', got {endpoint!r}")
+    
+    return _tracked(
+        http_requests_total,
+        http_request_duration_seconds,
+        {'endpoint': endpoint},
+        status_fn=_http_status,
+        gauge=http_requests_in_progress,
+        dynamic_label=('method', 'GET')
+    )
+
+
 def track_llm_request(provider: str, model: str):
     """Decorator to track LLM request metrics."""
-    def decorator(func: Callable[P, T]) -> Callable[P, T]:
-        @wraps(func)
-        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
-            start_time = time()
-            
-            try:
-                result = await func(*args, **kwargs)
-                status = 'success'
-                return result
-            except Exception as e:
-                status = 'error'
-                raise
-            finally:
-                duration = time() - start_time
-                llm_requests_total.labels(
-                    provider=provider,
-                    model=model,
-                    status=status
-                ).inc()
-                llm_request_duration_seconds.labels(
-                    provider=provider,
-                    model=model
-                ).observe(duration)
-        
-        return wrapper
-    return decorator
+    return _tracked(
+        llm_requests_total,
+        llm_request_duration_seconds,
+        {'provider': provider, 'model': model}
+    )
 
 
 def track_vector_search(collection: str):
     """Decorator to track vector search metrics."""
-    def decorator(func: Callable[P, T]) -> Callable[P, T]:
-        @wraps(func)
-        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
-            start_time = time()
-            
-            try:
-                result = await func(*args, **kwargs)
-                status = 'success'
-                return result
-            except Exception as e:
-                status = 'error'
-                raise
-            finally:
-                duration = time() - start_time
-                vector_search_total.labels(
-                    collection=collection,
-                    status=status
-                ).inc()
-                vector_search_duration_seconds.labels(
-                    collection=collection
-                ).observe(duration)
-        
-        return wrapper
-    return decorator
+    return _tracked(
+        vector_search_total,
+        vector_search_duration_seconds,
+        {'collection': collection}
+    )
 
 
 def track_db_query(operation: str, table: str):
     """Decorator to track database query metrics."""
-    def decorator(func: Callable[P, T]) -> Callable[P, T]:
-        @wraps(func)
-        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
-            start_time = time()
-            
-            try:
-                result = await func(*args, **kwargs)
-                status = 'success'
-                return result
-            except Exception as e:
-                status = 'error'
-                raise
-            finally:
-                duration = time() - start_time
-                db_queries_total.labels(
-                    operation=operation,
-                    table=table,
-                    status=status
-                ).inc()
-                db_query_duration_seconds.labels(
-                    operation=operation,
-                    table=table
-                ).observe(duration)
-        
-        return wrapper
-    return decorator
+    return _tracked(
+        db_queries_total,
+        db_query_duration_seconds,
+        {'operation': operation, 'table': table}
+    )
+
+
+class MetricsSnapshot:
+    """
+    Rendered text exposition of a registry, reused between scrapes.
+    
+    Rendering walks every metric and label set, so it is done in a worker
+    thread at most once per `max_age` seconds; scrapes in between get the
+    cached bytes.
+    """
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY, max_age: float = 5.0):
+        self.registry = registry
+        self.max_age = max_age
+        self._data = b""
+        self._rendered_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def render(self) -> bytes:
+        if perf_counter() - self._rendered_at < self.max_age:
+            return self._data
+        async with self._lock:
+            # Another scrape may have refreshed it while we waited
+            if perf_counter() - self._rendered_at >= self.max_age:
+                self._data = await asyncio.to_thread(generate_latest, self.registry)
+                self._rendered_at = perf_counter()
+        return self._data
+
+
+metrics_snapshot = MetricsSnapshot()
 
 
 # Helper functions for updating business metrics
@@ -7,31 +7,210 @@ Tracks all user activities for:
 - Activity feeds
 """
 
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Any, AsyncIterator, Tuple
+from datetime import date, datetime, timedelta, timezone
+import time
 from dataclasses import dataclass
-import uuid
+from contextlib import nullcontext
+import asyncio
 
-from sqlalchemy import select, func, and_, desc
+import orjson
+from sqlalchemy import select, func, and_, or_, desc, exists, tuple_, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.session import get_session
-from src.database.models import UserActivity, ActivityType
+from src.database.models import UserActivity, ActivityType, uuid7
+from src.cache.redis_client import cache, STREAM_ACTIVITY_EVENTS
+from src.services.analytics.productivity import productivity_analytics
 from src.config.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Dashboards poll the same summaries; results may be this many seconds stale
+SUMMARY_CACHE_TTL = 60
+SUMMARY_CACHE_MAX_USERS = 4096
+
+# Rows per fetch when streaming a feed
+FEED_STREAM_CHUNK = 200
+
+# Backlog kept in the activity stream if the writer falls behind
+ACTIVITY_STREAM_MAXLEN = 100000
+
+# Rows buffered in-process before track() waits for the flusher
+ACTIVITY_QUEUE_MAX = 10000
+
+# Insert attempts per batch before it is handed to the activity stream
+ACTIVITY_BATCH_ATTEMPTS = 3
+
+
+_UTC = timezone.utc
+
 
 def ensure_naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
     """Convert timezone-aware datetime to naive UTC datetime for database storage."""
-    if dt is None:
-        return None
-    if dt.tzinfo is not None:
-        # Convert to UTC and remove timezone info
-        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
-    return dt
+    if dt is None or dt.tzinfo is None:
+        return dt
+    return dt.astimezone(_UTC).replace(tzinfo=None)
+
+
+async def ensure_activity_partitions(months_ahead: int = 3) -> None:
+    """
+    Create the monthly user_activities partitions up to `months_ahead`.
+    
+    Runs at API startup and periodically from ActivityWriterWorker. If a
+    month's rows already reached the default partition before its
+    partition existed, they are moved into the new partition, since
+    Postgres refuses to attach a range the default partition still holds.
+    """
+    month = datetime.utcnow().date().replace(day=1)
+    async with get_session() as session:
+        for _ in range(months_ahead + 1):
+            end = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+            await _ensure_activity_partition(session, month, end)
+            month = end
+
+
+async def _ensure_activity_partition(session: AsyncSession, start: date, end: date) -> None:
+    name = f"user_activities_p{start:%Y_%m}"
+    exists_sql = text("SELECT to_regclass(:name) IS NOT NULL").bindparams(name=name)
+    if await session.scalar(exists_sql):
+        return
+    
+    # Hold off activity writes (and other replicas) until the partition is in place
+    await session.execute(text("LOCK TABLE user_activities IN SHARE ROW EXCLUSIVE MODE"))
+    if await session.scalar(exists_sql):
+        return
+    
+    in_range = f"timestamp >= '{start}' AND timestamp < '{end}'"
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    stranded = await session.scalar(text(
+        f"SELECT EXISTS (SELECT 1 FROM user_activities_default WHERE {in_range})"
+    ))
+    if not stranded:
+        await session.execute(text(f"CREATE TABLE {name} PARTITION OF user_activities {bounds}"))
+        return
+    
+    logger.warning("Moving activities out of the default partition", partition=name)
+    await session.execute(text(
+        f"CREATE TABLE {name} (LIKE user_activities INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    await session.execute(text(
+        f"WITH moved AS (DELETE FROM user_activities_default WHERE {in_range} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ))
+    await session.execute(text(f"ALTER TABLE user_activities ATTACH PARTITION {name} {bounds}"))
+
+
+# Columns projected by the feed queries, labelled with their response keys
+_USER_FEED_COLUMNS = (
+    UserActivity.id,
+    UserActivity.activity_type.label("type"),
+    UserActivity.title,
+    UserActivity.description,
+    UserActivity.source,
+    UserActivity.source_url,
+    UserActivity.related_files,
+    UserActivity.related_repo,
+    UserActivity.lines_added,
+    UserActivity.lines_removed,
+    UserActivity.timestamp,
+)
+
+_TEAM_FEED_COLUMNS = (
+    UserActivity.id,
+    UserActivity.activity_type.label("type"),
+    UserActivity.user_identifier.label("user"),
+    UserActivity.title,
+    UserActivity.source,
+    UserActivity.source_url,
+    UserActivity.timestamp,
+)
+
+
+def _feed_rows(result) -> List[Dict]:
+    """Row mappings as response dicts, with the timestamp in ISO format."""
+    return [
+        {**row, "timestamp": row["timestamp"].isoformat()}
+        for row in result.mappings().all()
+    ]
 
 
-@dataclass
+def _session_scope(session: Optional[AsyncSession]):
+    """Use the caller's session as-is, or open (and commit/close) a new one."""
+    return nullcontext(session) if session is not None else get_session()
+
+
+def _page(query, cursor: Optional[Tuple[datetime, str]], limit: int):
+    """
+    Newest-first page of activities, starting after a keyset cursor.
+    
+    The cursor is the (timestamp, id) of the last row of the previous page,
+    so each page is an index seek rather than an OFFSET scan, and rows
+    inserted meanwhile don't shift later pages.
+    """
+    if cursor:
+        before_ts, before_id = cursor
+        query = query.where(
+            tuple_(UserActivity.timestamp, UserActivity.id)
+            < tuple_(ensure_naive_utc(before_ts), before_id)
+        )
+    return query.order_by(desc(UserActivity.timestamp), desc(UserActivity.id)).limit(limit)
+
+
+def _activity_row(
+    activity_type: str,
+    user_identifier: str,
+    team_id: str,
+    title: str,
+    description: Optional[str] = None,
+    source: Optional[str] = None,
+    source_id: Optional[str] = None,
+    source_url: Optional[str] = None,
+    related_files: Optional[List[str]] = None,
+    related_task_id: Optional[str] = None,
+    related_pr_number: Optional[int] = None,
+    related_repo: Optional[str] = None,
+    lines_added: int = 0,
+    lines_removed: int = 0,
+    files_changed: int = 0,
+    metadata: Optional[Dict[str, Any]] = None,
+    timestamp: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Build the user_activities insert parameters for one activity."""
+    return {
+        "id": uuid7(),
+        "user_identifier": user_identifier,
+        "team_id": team_id,
+        "activity_type": activity_type,
+        "title": title,
+        "description": description,
+        "source": source,
+        "source_id": source_id,
+        "source_url": source_url,
+        "related_files": related_files or [],
+        "related_task_id": related_task_id,
+        "related_pr_number": related_pr_number,
+        "related_repo": related_repo,
+        "lines_added": lines_added,
+        "lines_removed": lines_removed,
+        "files_changed": files_changed,
+        "extra_data": metadata or {},
+        # Ensure timestamp is naive UTC for database storage
+        "timestamp": ensure_naive_utc(timestamp) if timestamp else datetime.utcnow()
+    }
+
+
+def _stream_payload(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Activity stream payload for an insert row; inverse of activity_row_from_stream()."""
+    return {**row, "timestamp": row["timestamp"].isoformat()}
+
+
+def activity_row_from_stream(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild insert parameters from a track_async() stream payload."""
+    return {**payload, "timestamp": datetime.fromisoformat(payload["timestamp"])}
+
+
+@dataclass(slots=True, frozen=True)
 class ActivityRecord:
     """Represents a single activity."""
     activity_type: str
@@ -47,11 +226,56 @@ class ActivityRecord:
     timestamp: datetime
 
 
+# Column order of the rows bulk_load_activities() hands to COPY
+_COPY_COLUMNS = (
+    "id",
+    "user_identifier",
+    "team_id",
+    "activity_type",
+    "title",
+    "description",
+    "source",
+    "source_id",
+    "source_url",
+    "related_files",
+    "lines_added",
+    "lines_removed",
+    "files_changed",
+    "extra_data",
+    "timestamp",
+)
+
+
 class ActivityTracker:
     """
     Tracks user activities across the system.
+    
+    Writes are buffered: track() queues the row and returns, and a
+    background task inserts queued rows in batches, one transaction each.
+    A batch that keeps failing is appended to STREAM_ACTIVITY_EVENTS,
+    where ActivityWriterWorker inserts it idempotently.
     """
 
+    def __init__(
+        self,
+        max_batch_size: int = 500,
+        max_wait: float = 0.05,
+        max_queue_size: int = ACTIVITY_QUEUE_MAX
+    ):
+        """
+        Args:
+            max_batch_size: Maximum rows inserted in one statement
+            max_wait: Seconds to wait for more rows after the first arrives
+            max_queue_size: Rows buffered before track() waits for the flusher
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=max_queue_size)
+        self._worker: Optional[asyncio.Task] = None
+        # (user, team) -> days -> (expires_at, summary); grouped so track() can drop a user in O(1)
+        self._summary_cache: Dict[Tuple[str, str], Dict[int, Tuple[float, Dict[str, Any]]]] = {}
+        self._summary_inflight: Dict[Tuple[str, str, int], asyncio.Future] = {}
+
     async def track(
         self,
         activity_type: str,
@@ -75,44 +299,213 @@ class ActivityTracker:
         """
         Track a new activity.
         
+        The row is written shortly afterwards by the background flusher;
+        call drain() to wait for it.
+        
         Returns:
             Activity ID
         """
-        activity_id = str(uuid.uuid4())
-        # Ensure timestamp is naive UTC for database storage
-        timestamp = ensure_naive_utc(timestamp) or datetime.utcnow()
-        
-        async with get_session() as session:
-            activity = UserActivity(
-                id=activity_id,
-                user_identifier=user_identifier,
-                team_id=team_id,
-                activity_type=activity_type,
-                title=title,
-                description=description,
-                source=source,
-                source_id=source_id,
-                source_url=source_url,
-                related_files=related_files or [],
-                related_task_id=related_task_id,
-                related_pr_number=related_pr_number,
-                related_repo=related_repo,
-                lines_added=lines_added,
-                lines_removed=lines_removed,
-                files_changed=files_changed,
-                metadata=metadata or {},
-                timestamp=timestamp
+        row = _activity_row(
+            activity_type=activity_type,
+            user_identifier=user_identifier,
+            team_id=team_id,
+            title=title,
+            description=description,
+            source=source,
+            source_id=source_id,
+            source_url=source_url,
+            related_files=related_files,
+            related_task_id=related_task_id,
+            related_pr_number=related_pr_number,
+            related_repo=related_repo,
+            lines_added=lines_added,
+            lines_removed=lines_removed,
+            files_changed=files_changed,
+            metadata=metadata,
+            timestamp=timestamp
+        )
+        activity_id = row["id"]
+        
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        
+        await self._queue.put(row)
+        
+        logger.debug(
+            "Activity tracked",
+            activity_id=activity_id,
+            type=activity_type,
+            user=user_identifier
+        )
+        
+        return activity_id
+
+    async def track_async(self, *args, **kwargs) -> str:
+        """
+        Track a new activity through the activity Redis stream.
+        
+        Takes the same arguments as track(). The row is appended to
+        STREAM_ACTIVITY_EVENTS and persisted in batches by
+        ActivityWriterWorker, so it survives an API restart and bursts
+        are not bound by database commit latency. Falls back to track()
+        when Redis is unavailable. Cached productivity refreshes once the
+        writer stores the row; cached summaries within SUMMARY_CACHE_TTL.
+        
+        Returns:
+            Activity ID
+        """
+        if cache.client is None:
+            return await self.track(*args, **kwargs)
+        
+        row = _activity_row(*args, **kwargs)
+        try:
+            await cache.stream_add(
+                stream=STREAM_ACTIVITY_EVENTS,
+                event_type=row["activity_type"],
+                payload=_stream_payload(row),
+                maxlen=ACTIVITY_STREAM_MAXLEN
             )
-            session.add(activity)
+        except Exception as e:
+            logger.warning("Activity stream unavailable, writing directly", error=str(e))
+            return await self.track(*args, **kwargs)
+        
+        logger.debug(
+            "Activity queued",
+            activity_id=row["id"],
+            type=row["activity_type"],
+            user=row["user_identifier"]
+        )
+        
+        return row["id"]
+
+    async def bulk_load_activities(
+        self,
+        records: Iterable[ActivityRecord],
+        session: Optional[AsyncSession] = None
+    ) -> int:
+        """
+        Load historical activities with a single COPY FROM STDIN.
+        
+        Meant for backfills and imports. Bypasses the ORM and the write
+        queue; JSON columns are encoded with orjson up front.
+        
+        Args:
+            records: Activities to load
+            session: Optional session whose transaction the COPY joins
             
-            logger.debug(
-                "Activity tracked",
-                activity_id=activity_id,
-                type=activity_type,
-                user=user_identifier
+        Returns:
+            Number of rows loaded
+        """
+        rows = [
+            (
+                uuid7(),
+                record.user_identifier,
+                record.team_id,
+                record.activity_type,
+                record.title,
+                record.description,
+                record.source,
+                record.source_id,
+                record.source_url,
+                orjson.dumps(record.related_files or []).decode(),
+                0,
+                0,
+                len(record.related_files or ()),
+                orjson.dumps(record.metadata or {}).decode(),
+                ensure_naive_utc(record.timestamp) or datetime.utcnow(),
             )
+            for record in records
+        ]
+        if not rows:
+            return 0
         
-        return activity_id
+        async with _session_scope(session) as s:
+            conn = await s.connection()
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                UserActivity.__tablename__,
+                records=rows,
+                columns=_COPY_COLUMNS
+            )
+        
+        # Any cached summary may now be missing rows
+        self._summary_cache.clear()
+        productivity_analytics.invalidate()
+        await productivity_analytics.activity_written(row[2] for row in rows)
+        
+        logger.info("Activities bulk loaded", count=len(rows))
+        return len(rows)
+
+    async def drain(self) -> None:
+        """Wait until every queued activity has been written or handed to the stream."""
+        if self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for one row, then collect more until full or max_wait passes."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Insert a batch, retrying with backoff, then fall back to the activity stream."""
+        for attempt in range(ACTIVITY_BATCH_ATTEMPTS):
+            try:
+                async with get_session() as session:
+                    await session.execute(insert(UserActivity), batch)
+                await self.activity_written(batch)
+                return
+            except Exception as e:
+                logger.warning(
+                    "Activity batch insert failed",
+                    error=str(e),
+                    size=len(batch),
+                    attempt=attempt + 1
+                )
+                if attempt + 1 < ACTIVITY_BATCH_ATTEMPTS:
+                    await asyncio.sleep(0.1 * 2 ** attempt)
+        
+        # The writer worker inserts stream rows with ON CONFLICT DO NOTHING,
+        # so a batch that partly landed is not duplicated
+        try:
+            if cache.client is None:
+                raise RuntimeError("Redis unavailable")
+            for row in batch:
+                await cache.stream_add(
+                    stream=STREAM_ACTIVITY_EVENTS,
+                    event_type=row["activity_type"],
+                    payload=_stream_payload(row),
+                    maxlen=ACTIVITY_STREAM_MAXLEN
+                )
+        except Exception as e:
+            logger.error("Activity batch dropped", error=str(e), size=len(batch))
+
+    async def activity_written(self, rows: List[Dict[str, Any]]) -> None:
+        """Drop cached summaries and productivity that the stored rows make stale."""
+        for row in rows:
+            self._summary_cache.pop((row["user_identifier"], row["team_id"]), None)
+        await productivity_analytics.activity_written(row["team_id"] for row in rows)
+
+    async def _run(self):
+        """Insert queued activities in multi-row batches."""
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
 
     async def track_commit(
         self,
@@ -125,10 +518,12 @@ class ActivityTracker:
         lines_added: int = 0,
         lines_removed: int = 0,
         commit_url: Optional[str] = None,
-        timestamp: Optional[datetime] = None
+        timestamp: Optional[datetime] = None,
+        deferred: bool = False
     ) -> str:
-        """Track a commit activity."""
-        return await self.track(
+        """Track a commit activity. deferred=True goes through track_async()."""
+        track = self.track_async if deferred else self.track
+        return await track(
             activity_type=ActivityType.COMMIT.value,
             user_identifier=user_identifier,
             team_id=team_id,
@@ -142,7 +537,6 @@ class ActivityTracker:
             lines_added=lines_added,
             lines_removed=lines_removed,
             files_changed=len(files),
-            metadata={"commit_sha": commit_sha, "repo": repo},
             timestamp=timestamp
         )
 
@@ -156,16 +550,18 @@ class ActivityTracker:
         action: str,  # opened, merged, closed
         files: Optional[List[str]] = None,
         pr_url: Optional[str] = None,
-        timestamp: Optional[datetime] = None
+        timestamp: Optional[datetime] = None,
+        deferred: bool = False
     ) -> str:
-        """Track a PR activity."""
+        """Track a PR activity. deferred=True goes through track_async()."""
         activity_type = {
             "opened": ActivityType.PR_OPENED.value,
             "merged": ActivityType.PR_MERGED.value,
             "closed": ActivityType.PR_CLOSED.value,
         }.get(action, ActivityType.PR_OPENED.value)
         
-        return await self.track(
+        track = self.track_async if deferred else self.track
+        return await track(
             activity_type=activity_type,
             user_identifier=user_identifier,
             team_id=team_id,
@@ -177,7 +573,6 @@ class ActivityTracker:
             related_files=files or [],
             related_pr_number=pr_number,
             related_repo=repo,
-            metadata={"pr_number": pr_number, "action": action, "repo": repo},
             timestamp=timestamp
         )
 
@@ -189,10 +584,12 @@ class ActivityTracker:
         pr_number: int,
         review_state: str,  # approved, changes_requested, commented
         pr_url: Optional[str] = None,
-        timestamp: Optional[datetime] = None
+        timestamp: Optional[datetime] = None,
+        deferred: bool = False
     ) -> str:
-        """Track a PR review."""
-        return await self.track(
+        """Track a PR review. deferred=True goes through track_async()."""
+        track = self.track_async if deferred else self.track
+        return await track(
             activity_type=ActivityType.PR_REVIEW.value,
             user_identifier=user_identifier,
             team_id=team_id,
@@ -203,7 +600,8 @@ class ActivityTracker:
             source_url=pr_url,
             related_pr_number=pr_number,
             related_repo=repo,
-            metadata={"pr_number": pr_number, "review_state": review_state, "repo": repo},
+            # Only the state; repo and PR number have their own columns
+            metadata={"review_state": review_state},
             timestamp=timestamp
         )
 
@@ -224,7 +622,6 @@ class ActivityTracker:
             title=f"Created task: {task_title}",
             source=source,
             related_task_id=task_id,
-            metadata={"task_id": task_id},
             timestamp=timestamp
         )
 
@@ -245,7 +642,6 @@ class ActivityTracker:
             title=f"Completed task: {task_title}",
             source=source,
             related_task_id=task_id,
-            metadata={"task_id": task_id},
             timestamp=timestamp
         )
 
@@ -256,10 +652,12 @@ class ActivityTracker:
         activity_types: Optional[List[str]] = None,
         since: Optional[datetime] = None,
         until: Optional[datetime] = None,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[Tuple[datetime, str]] = None,
+        session: Optional[AsyncSession] = None
     ) -> List[Dict]:
         """
-        Get activities for a user.
+        Get activities for a user, newest first.
         
         Args:
             user_identifier: User to get activities for
@@ -268,12 +666,39 @@ class ActivityTracker:
             since: Only activities after this time
             until: Only activities before this time
             limit: Max number to return
+            cursor: (timestamp, id) of the last activity of the previous page
+            session: Caller's session to run in, e.g. shared across a
+                dashboard's reads; a new one is opened if omitted
         
         Returns:
-            List of activity dicts
+            List of activity dicts; pass the last one's (timestamp, id) as
+            the cursor for the next page
         """
-        async with get_session() as session:
-            query = select(UserActivity).where(
+        return [
+            activity async for activity in self.iter_user_activities(
+                user_identifier, team_id, activity_types, since, until, limit, cursor, session
+            )
+        ]
+
+    async def iter_user_activities(
+        self,
+        user_identifier: str,
+        team_id: Optional[str] = None,
+        activity_types: Optional[List[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[Tuple[datetime, str]] = None,
+        session: Optional[AsyncSession] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream activities for a user, newest first (see get_user_activities).
+        
+        Rows are fetched from a server-side cursor in chunks of
+        FEED_STREAM_CHUNK, so memory stays flat for large limits.
+        """
+        async with _session_scope(session) as session:
+            query = select(*_USER_FEED_COLUMNS).where(
                 UserActivity.user_identifier == user_identifier
             )
             
@@ -286,38 +711,23 @@ class ActivityTracker:
             if until:
                 query = query.where(UserActivity.timestamp <= until)
             
-            query = query.order_by(desc(UserActivity.timestamp)).limit(limit)
-            
-            result = await session.execute(query)
-            activities = result.scalars().all()
-            
-            return [
-                {
-                    "id": a.id,
-                    "type": a.activity_type,
-                    "title": a.title,
-                    "description": a.description,
-                    "source": a.source,
-                    "source_url": a.source_url,
-                    "related_files": a.related_files,
-                    "related_repo": a.related_repo,
-                    "lines_added": a.lines_added,
-                    "lines_removed": a.lines_removed,
-                    "timestamp": a.timestamp.isoformat()
-                }
-                for a in activities
-            ]
+            query = _page(query, cursor, limit).execution_options(yield_per=FEED_STREAM_CHUNK)
+            result = await session.stream(query)
+            async for row in result.mappings():
+                yield {**row, "timestamp": row["timestamp"].isoformat()}
 
     async def get_team_activities(
         self,
         team_id: str,
         since: Optional[datetime] = None,
         until: Optional[datetime] = None,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[Tuple[datetime, str]] = None,
+        session: Optional[AsyncSession] = None
     ) -> List[Dict]:
-        """Get recent activities for a team."""
-        async with get_session() as session:
-            query = select(UserActivity).where(
+        """Get recent activities for a team, paged by (timestamp, id) cursor."""
+        async with _session_scope(session) as session:
+            query = select(*_TEAM_FEED_COLUMNS).where(
                 UserActivity.team_id == team_id
             )
             
@@ -326,76 +736,98 @@ class ActivityTracker:
             if until:
                 query = query.where(UserActivity.timestamp <= until)
             
-            query = query.order_by(desc(UserActivity.timestamp)).limit(limit)
-            
-            result = await session.execute(query)
-            activities = result.scalars().all()
-            
-            return [
-                {
-                    "id": a.id,
-                    "type": a.activity_type,
-                    "user": a.user_identifier,
-                    "title": a.title,
-                    "source": a.source,
-                    "source_url": a.source_url,
-                    "timestamp": a.timestamp.isoformat()
-                }
-                for a in activities
-            ]
+            result = await session.execute(_page(query, cursor, limit))
+            return _feed_rows(result)
 
     async def get_activity_summary(
         self,
         user_identifier: str,
         team_id: str,
-        days: int = 7
+        days: int = 7,
+        session: Optional[AsyncSession] = None
     ) -> Dict[str, Any]:
         """
         Get activity summary for a user.
         
+        Results are cached for SUMMARY_CACHE_TTL seconds, and concurrent
+        misses for the same summary share a single query.
+        
         Returns:
             Summary with counts by activity type
         """
+        per_user = self._summary_cache.get((user_identifier, team_id))
+        cached = per_user.get(days) if per_user else None
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        key = (user_identifier, team_id, days)
+        inflight = self._summary_inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._summary_inflight[key] = future
+        try:
+            summary = await self._query_activity_summary(user_identifier, team_id, days, session)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved in case nobody joined
+            raise
+        else:
+            future.set_result(summary)
+        finally:
+            del self._summary_inflight[key]
+        
+        if len(self._summary_cache) >= SUMMARY_CACHE_MAX_USERS:
+            # Evict the oldest-inserted user
+            self._summary_cache.pop(next(iter(self._summary_cache)))
+        self._summary_cache.setdefault((user_identifier, team_id), {})[days] = (
+            time.monotonic() + SUMMARY_CACHE_TTL, summary
+        )
+        return summary
+
+    async def _query_activity_summary(
+        self,
+        user_identifier: str,
+        team_id: str,
+        days: int,
+        session: Optional[AsyncSession]
+    ) -> Dict[str, Any]:
+        """Run the grouped summary query (uncached)."""
         since = datetime.utcnow() - timedelta(days=days)
         
-        async with get_session() as session:
-            # Count by type
+        async with _session_scope(session) as session:
+            # Counts and line totals per type in one pass over the index range
             result = await session.execute(
                 select(
                     UserActivity.activity_type,
-                    func.count(UserActivity.id).label("count")
-                ).where(
-                    and_(
-                        UserActivity.user_identifier == user_identifier,
-                        UserActivity.team_id == team_id,
-                        UserActivity.timestamp >= since
-                    )
-                ).group_by(UserActivity.activity_type)
-            )
-            type_counts = {row[0]: row[1] for row in result.all()}
-            
-            # Total lines
-            result = await session.execute(
-                select(
+                    func.count(UserActivity.id).label("count"),
                     func.sum(UserActivity.lines_added).label("added"),
                     func.sum(UserActivity.lines_removed).label("removed"),
-                    func.sum(UserActivity.files_changed).label("files")
+                    # Only commits record files_changed; skip the column elsewhere
+                    func.sum(UserActivity.files_changed).filter(
+                        UserActivity.activity_type == ActivityType.COMMIT.value
+                    ).label("files")
                 ).where(
                     and_(
                         UserActivity.user_identifier == user_identifier,
                         UserActivity.team_id == team_id,
                         UserActivity.timestamp >= since
                     )
-                )
+                ).group_by(UserActivity.activity_type)
             )
-            totals = result.one()
+            rows = result.all()
+            type_counts = {row.activity_type: row.count for row in rows}
             
             return {
                 "period_days": days,
                 "activity_counts": type_counts,
-                "total_lines_added": totals[0] or 0,
-                "total_lines_removed": totals[1] or 0,
-                "total_files_changed": totals[2] or 0,
+                "total_lines_added": sum(row.added or 0 for row in rows),
+                "total_lines_removed": sum(row.removed or 0 for row in rows),
+                "total_files_changed": sum(row.files or 0 for row in rows),
                 "total_activities": sum(type_counts.values())
             }
 
@@ -405,7 +837,8 @@ class ActivityTracker:
         team_id: str,
         task_type: Optional[str] = None,
         task_keywords: Optional[List[str]] = None,
-        since: Optional[datetime] = None
+        since: Optional[datetime] = None,
+        session: Optional[AsyncSession] = None
     ) -> bool:
         """
         Check if user has completed a task matching criteria.
@@ -417,45 +850,36 @@ class ActivityTracker:
             task_type: Task category to match
             task_keywords: Keywords to search in task title
             since: Only check activities after this time
+            session: Caller's session to run in; a new one is opened if omitted
         
         Returns:
             True if matching task completion found
         """
         since = since or (datetime.utcnow() - timedelta(hours=24))
         
-        async with get_session() as session:
-            query = select(UserActivity).where(
-                and_(
-                    UserActivity.user_identifier == user_identifier,
-                    UserActivity.team_id == team_id,
-                    UserActivity.activity_type == ActivityType.TASK_COMPLETED.value,
-                    UserActivity.timestamp >= since
-                )
-            )
-            
-            result = await session.execute(query)
-            activities = result.scalars().all()
+        async with _session_scope(session) as session:
+            conditions = [
+                UserActivity.user_identifier == user_identifier,
+                UserActivity.team_id == team_id,
+                UserActivity.activity_type == ActivityType.TASK_COMPLETED.value,
+                UserActivity.timestamp >= since
+            ]
             
-            for activity in activities:
-                # Check keywords in title
-                if task_keywords:
-                    title_lower = activity.title.lower()
-                    if any(kw.lower() in title_lower for kw in task_keywords):
-                        return True
-                
-                # Check task type in extra_data
-                if task_type:
-                    extra_data = activity.extra_data or {}
-                    if extra_data.get("task_type") == task_type:
-                        return True
-                    if task_type.lower() in activity.title.lower():
-                        return True
-                
-                # If no filters, any completion matches
-                if not task_keywords and not task_type:
-                    return True
+            # Keyword or task-type match (case-insensitive); no filters means any completion
+            matches = [
+                UserActivity.title.icontains(kw, autoescape=True)
+                for kw in (task_keywords or [])
+            ]
+            if task_type:
+                matches.append(UserActivity.extra_data["task_type"].as_string() == task_type)
+                matches.append(UserActivity.title.icontains(task_type, autoescape=True))
+            if matches:
+                conditions.append(or_(*matches))
             
-            return False
+            found = await session.scalar(
+                select(exists().where(and_(*conditions)))
+            )
+            return bool(found)
 
 
 # Singleton instance
@@ -7,23 +7,59 @@ Aggregates user activities into productivity metrics:
 - Trend analysis
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
 from datetime import datetime, date, timedelta
 from dataclasses import dataclass
+import asyncio
+import time
 import uuid
 
-from sqlalchemy import select, func, and_, cast, Date
+import orjson
+from sqlalchemy import select, func, and_, case, cast, literal_column, Date, Numeric, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.session import get_session
 from src.database.models import (
     UserActivity, ProductivitySnapshot, KnowledgeEntry,
-    Decision
+    Decision, PRODUCTIVITY_WEIGHTS, OTHER_ACTIVITY_WEIGHT
 )
+from src.cache.redis_client import cache
 from src.config.logging import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Dashboards re-poll the same aggregates; results may be this many seconds stale
+PRODUCTIVITY_CACHE_TTL = 120
+PRODUCTIVITY_CACHE_MAX_TEAMS = 1024
+PRODUCTIVITY_CACHE_MAX_KEYS_PER_TEAM = 256
+
+# Members listed in get_team_productivity rankings
+TEAM_LEADERBOARD_SIZE = 10
+
+# Snapshot rows per fetch in get_daily_breakdown
+BREAKDOWN_STREAM_CHUNK = 100
+
+# Days after a day ends that its activity may still arrive (stream backlog,
+# webhook redelivery); snapshots only cover days this far in the past
+SNAPSHOT_SETTLE_DAYS = 2
+
+
+def _revision_key(team_id: str) -> str:
+    """Redis counter bumped whenever a team's activity is written, by any process."""
+    return f"productivity:rev:{team_id}"
+
+
+def _settled_day() -> date:
+    """Most recent day whose activity is no longer expected to change."""
+    return datetime.utcnow().date() - timedelta(days=SNAPSHOT_SETTLE_DAYS + 1)
+
+
+def _settled_at(day: date) -> datetime:
+    """When a day's activity counts as final."""
+    return datetime.combine(day + timedelta(days=SNAPSHOT_SETTLE_DAYS + 1), datetime.min.time())
+
 
 @dataclass
 class UserProductivitySummary:
@@ -60,17 +96,91 @@ class ProductivityAnalytics:
     Service for generating productivity analytics.
     """
 
-    # Weights for productivity score calculation
-    WEIGHTS = {
-        "commit": 1.0,
-        "pr_opened": 3.0,
-        "pr_merged": 5.0,
-        "pr_review": 2.0,
-        "task_completed": 4.0,
-        "task_created": 1.5,
-        "knowledge_entry": 1.0,
-        "decision": 2.0,
-    }
+    # Weights for productivity score calculation; the snapshot score column uses the same
+    WEIGHTS = {activity_type: weight for activity_type, (_, weight) in PRODUCTIVITY_WEIGHTS.items()}
+
+    def __init__(self):
+        # team_id -> (user or None for the team view, days, day) -> [expires_at, result, JSON body, revision]
+        self._cache: Dict[str, Dict[Tuple[Optional[str], int, date], List[Any]]] = {}
+
+    def invalidate(self, team_id: Optional[str] = None) -> None:
+        """Drop cached productivity for a team and its members, or for every team."""
+        if team_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(team_id, None)
+
+    async def activity_written(self, team_ids: Iterable[str]) -> None:
+        """
+        Mark teams' cached productivity stale once their new activity is stored.
+        
+        Drops this process's entries and bumps the teams' Redis revisions,
+        which the other API processes compare on every cache hit.
+        """
+        for team_id in set(team_ids):
+            self.invalidate(team_id)
+            try:
+                await cache.increment(_revision_key(team_id))
+            except Exception as e:
+                logger.warning("Could not bump productivity revision", team_id=team_id, error=str(e))
+
+    async def _revision(self, team_id: str) -> Optional[int]:
+        try:
+            return await cache.get(_revision_key(team_id))
+        except Exception:
+            # Fall back to the TTL alone while Redis is unavailable
+            return None
+
+    async def _cache_entry(
+        self,
+        team_id: str,
+        user_identifier: Optional[str],
+        days: int,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> List[Any]:
+        """Return the cache entry younger than PRODUCTIVITY_CACHE_TTL, computing it if needed."""
+        key = (user_identifier, days, datetime.utcnow().date())
+        revision = await self._revision(team_id)
+        per_team = self._cache.get(team_id)
+        hit = per_team.get(key) if per_team else None
+        if hit and hit[0] > time.monotonic() and hit[3] == revision:
+            return hit
+        
+        entry = [time.monotonic() + PRODUCTIVITY_CACHE_TTL, await compute(), None, revision]
+        
+        if team_id not in self._cache and len(self._cache) >= PRODUCTIVITY_CACHE_MAX_TEAMS:
+            # Evict the oldest-inserted team
+            self._cache.pop(next(iter(self._cache)))
+        per_team = self._cache.setdefault(team_id, {})
+        per_team.pop(key, None)
+        if len(per_team) >= PRODUCTIVITY_CACHE_MAX_KEYS_PER_TEAM:
+            # Evict the oldest-inserted key; keys of past days age out first
+            per_team.pop(next(iter(per_team)))
+        per_team[key] = entry
+        return entry
+
+    async def _cached(
+        self,
+        team_id: str,
+        user_identifier: Optional[str],
+        days: int,
+        compute: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Cached result of compute()."""
+        return (await self._cache_entry(team_id, user_identifier, days, compute))[1]
+
+    async def _cached_json(
+        self,
+        team_id: str,
+        user_identifier: Optional[str],
+        days: int,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> bytes:
+        """Cached result of compute() as JSON, encoded once per cache entry."""
+        entry = await self._cache_entry(team_id, user_identifier, days, compute)
+        if entry[2] is None:
+            entry[2] = orjson.dumps(entry[1])
+        return entry[2]
 
     async def generate_daily_snapshot(
         self,
@@ -81,52 +191,34 @@ class ProductivityAnalytics:
         """
         Generate a daily productivity snapshot for a user.
         
+        Defaults to the most recent settled day (SNAPSHOT_SETTLE_DAYS ago).
+        
         Returns:
             Snapshot ID
         """
-        snapshot_date = snapshot_date or (datetime.utcnow() - timedelta(days=1)).date()
+        snapshot_date = snapshot_date or _settled_day()
         snapshot_id = str(uuid.uuid4())
         
         # Get activity counts
         start = datetime.combine(snapshot_date, datetime.min.time())
-        end = datetime.combine(snapshot_date, datetime.max.time())
+        end = datetime.combine(snapshot_date + timedelta(days=1), datetime.min.time())
         
         async with get_session() as session:
-            # Count activities by type
-            activity_counts = await self._count_activities(
-                session, user_identifier, team_id, start, end
-            )
-            
-            # Get code metrics
-            code_metrics = await self._get_code_metrics(
+            # Count activities by type and get code metrics
+            activity_counts, code_metrics = await self._fetch_activity_and_code(
                 session, user_identifier, team_id, start, end
             )
             
-            # Calculate productivity score
-            score = self._calculate_score(activity_counts, code_metrics)
-            
-            # Store snapshot
-            snapshot = ProductivitySnapshot(
-                id=snapshot_id,
-                user_identifier=user_identifier,
-                team_id=team_id,
-                snapshot_date=snapshot_date,
-                commits_count=activity_counts.get("commit", 0),
-                prs_opened=activity_counts.get("pr_opened", 0),
-                prs_merged=activity_counts.get("pr_merged", 0),
-                prs_reviewed=activity_counts.get("pr_review", 0),
-                tasks_created=activity_counts.get("task_created", 0),
-                tasks_completed=activity_counts.get("task_completed", 0),
-                lines_added=code_metrics.get("lines_added", 0),
-                lines_removed=code_metrics.get("lines_removed", 0),
-                files_changed=code_metrics.get("files_changed", 0),
-                productivity_score=score,
-                metrics_detail={
-                    "activity_counts": activity_counts,
-                    "code_metrics": code_metrics
-                }
+            # Plain Core insert; the database generates and returns the score
+            result = await session.execute(
+                insert(ProductivitySnapshot)
+                .values(self._snapshot_row(
+                    snapshot_id, user_identifier, team_id, snapshot_date,
+                    activity_counts, code_metrics
+                ))
+                .returning(ProductivitySnapshot.productivity_score)
             )
-            session.add(snapshot)
+            score = result.scalar_one()
         
         logger.info(
             "Daily snapshot generated",
@@ -137,6 +229,88 @@ class ProductivityAnalytics:
         
         return snapshot_id
 
+    async def generate_daily_snapshots_for_team(
+        self,
+        team_id: str,
+        snapshot_date: Optional[date] = None
+    ) -> int:
+        """
+        Generate the daily snapshots of every active team member in one pass.
+        
+        One grouped query over the team's activity and one multi-row
+        insert, instead of generate_daily_snapshot() per user. Defaults to
+        the most recent settled day (SNAPSHOT_SETTLE_DAYS ago).
+        
+        Returns:
+            Number of snapshots written
+        """
+        snapshot_date = snapshot_date or _settled_day()
+        
+        start = datetime.combine(snapshot_date, datetime.min.time())
+        end = datetime.combine(snapshot_date + timedelta(days=1), datetime.min.time())
+        
+        async with get_session() as session:
+            activity_counts, code_metrics = await self._fetch_team_activity(
+                session, team_id, start, end
+            )
+            
+            rows = [
+                self._snapshot_row(
+                    str(uuid.uuid4()), user, team_id, snapshot_date,
+                    counts, code_metrics[user]
+                )
+                for user, counts in activity_counts.items()
+            ]
+            if rows:
+                await session.execute(insert(ProductivitySnapshot), rows)
+        
+        logger.info(
+            "Team daily snapshots generated",
+            team_id=team_id,
+            date=str(snapshot_date),
+            count=len(rows)
+        )
+        
+        return len(rows)
+
+    @classmethod
+    def _snapshot_row(
+        cls,
+        snapshot_id: str,
+        user_identifier: str,
+        team_id: str,
+        snapshot_date: date,
+        activity_counts: Dict[str, int],
+        code_metrics: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """Column values of one ProductivitySnapshot (the score is generated)."""
+        return {
+            "id": snapshot_id,
+            "user_identifier": user_identifier,
+            "team_id": team_id,
+            "snapshot_date": snapshot_date,
+            **{
+                column: activity_counts.get(activity_type, 0)
+                for activity_type, (column, _) in PRODUCTIVITY_WEIGHTS.items()
+            },
+            "other_activities": cls._other_activities(activity_counts),
+            "lines_added": code_metrics.get("lines_added", 0),
+            "lines_removed": code_metrics.get("lines_removed", 0),
+            "files_changed": code_metrics.get("files_changed", 0),
+            "metrics_detail": {
+                "activity_counts": activity_counts,
+                "code_metrics": code_metrics
+            }
+        }
+
+    @classmethod
+    def _other_activities(cls, activity_counts: Dict[str, int]) -> int:
+        """Count of activities whose type has no weight, hence no snapshot column."""
+        return sum(
+            count for activity_type, count in activity_counts.items()
+            if activity_type not in cls.WEIGHTS
+        )
+
     async def get_user_productivity(
         self,
         user_identifier: str,
@@ -145,66 +319,78 @@ class ProductivityAnalytics:
     ) -> UserProductivitySummary:
         """
         Get productivity summary for a user.
+        
+        Cached for PRODUCTIVITY_CACHE_TTL seconds; activity ingest for the
+        team clears it.
         """
+        return await self._cached(
+            team_id, user_identifier, days,
+            lambda: self._compute_user_productivity(user_identifier, team_id, days)
+        )
+
+    async def get_user_productivity_json(
+        self,
+        user_identifier: str,
+        team_id: str,
+        days: int = 7
+    ) -> bytes:
+        """get_user_productivity() encoded as a JSON response body."""
+        return await self._cached_json(
+            team_id, user_identifier, days,
+            lambda: self._compute_user_productivity(user_identifier, team_id, days)
+        )
+
+    async def _compute_user_productivity(
+        self,
+        user_identifier: str,
+        team_id: str,
+        days: int
+    ) -> UserProductivitySummary:
         end_date = datetime.utcnow().date()
         start_date = end_date - timedelta(days=days)
         
         start = datetime.combine(start_date, datetime.min.time())
-        end = datetime.combine(end_date, datetime.max.time())
+        end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
         
-        async with get_session() as session:
-            # Get activity counts
-            activity_counts = await self._count_activities(
-                session, user_identifier, team_id, start, end
-            )
-            
-            # Get code metrics
-            code_metrics = await self._get_code_metrics(
-                session, user_identifier, team_id, start, end
-            )
-            
-            # Get knowledge contributions
-            knowledge_count = await self._count_knowledge_entries(
-                session, user_identifier, team_id, start, end
-            )
-            
-            # Get decisions made
-            decisions_count = await self._count_decisions(
-                session, user_identifier, team_id, start, end
-            )
-            
-            # Calculate score
-            score = self._calculate_score(activity_counts, code_metrics)
-            
-            # Get trend
-            trend = await self._calculate_trend(
-                session, user_identifier, team_id, days
-            )
-            
-            # Find most active day
-            most_active = await self._find_most_active_day(
-                session, user_identifier, team_id, start, end
-            )
-            
-            return UserProductivitySummary(
-                user_identifier=user_identifier,
-                period_start=start_date,
-                period_end=end_date,
-                commits=activity_counts.get("commit", 0),
-                prs_opened=activity_counts.get("pr_opened", 0),
-                prs_merged=activity_counts.get("pr_merged", 0),
-                prs_reviewed=activity_counts.get("pr_review", 0),
-                tasks_completed=activity_counts.get("task_completed", 0),
-                tasks_created=activity_counts.get("task_created", 0),
-                lines_added=code_metrics.get("lines_added", 0),
-                lines_removed=code_metrics.get("lines_removed", 0),
-                files_changed=code_metrics.get("files_changed", 0),
-                knowledge_entries=knowledge_count,
-                decisions_made=decisions_count,
-                productivity_score=score,
-                activity_trend=trend,
-                most_active_day=most_active
-            )
+        # Independent queries, each on its own session and connection, run concurrently
+        (
+            (activity_counts, code_metrics, per_day),
+            knowledge_count,
+            decisions_count,
+            trend
+        ) = await asyncio.gather(
+            self._in_session(self._rollup_activity, user_identifier, team_id, start_date, end_date),
+            self._in_session(self._count_knowledge_entries, user_identifier, team_id, start, end),
+            self._in_session(self._count_decisions, user_identifier, team_id, start, end),
+            self._in_session(self._calculate_trend, user_identifier, team_id, days)
+        )
+        
+        most_active = (
+            max(sorted(per_day), key=per_day.__getitem__).strftime("%A")  # Day name
+            if per_day else None
+        )
+        
+        score = self._calculate_score(activity_counts, code_metrics)
+        
+        return UserProductivitySummary(
+            user_identifier=user_identifier,
+            period_start=start_date,
+            period_end=end_date,
+            commits=activity_counts.get("commit", 0),
+            prs_opened=activity_counts.get("pr_opened", 0),
+            prs_merged=activity_counts.get("pr_merged", 0),
+            prs_reviewed=activity_counts.get("pr_review", 0),
+            tasks_completed=activity_counts.get("task_completed", 0),
+            tasks_created=activity_counts.get("task_created", 0),
+            lines_added=code_metrics.get("lines_added", 0),
+            lines_removed=code_metrics.get("lines_removed", 0),
+            files_changed=code_metrics.get("files_changed", 0),
+            knowledge_entries=knowledge_count,
+            decisions_made=decisions_count,
+            productivity_score=score,
+            activity_trend=trend,
+            most_active_day=most_active
+        )
 
     async def get_team_productivity(
         self,
@@ -213,63 +399,54 @@ class ProductivityAnalytics:
     ) -> Dict[str, Any]:
         """
         Get team-wide productivity metrics.
+        
+        Cached like get_user_productivity().
         """
+        return await self._cached(
+            team_id, None, days,
+            lambda: self._compute_team_productivity(team_id, days)
+        )
+
+    async def get_team_productivity_json(
+        self,
+        team_id: str,
+        days: int = 7
+    ) -> bytes:
+        """get_team_productivity() encoded as a JSON response body."""
+        return await self._cached_json(
+            team_id, None, days,
+            lambda: self._compute_team_productivity(team_id, days)
+        )
+
+    async def _compute_team_productivity(
+        self,
+        team_id: str,
+        days: int
+    ) -> Dict[str, Any]:
         end_date = datetime.utcnow().date()
         start_date = end_date - timedelta(days=days)
         
         start = datetime.combine(start_date, datetime.min.time())
-        end = datetime.combine(end_date, datetime.max.time())
+        end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
         
         async with get_session() as session:
-            # Get all team members with activity
-            result = await session.execute(
-                select(UserActivity.user_identifier)
-                .where(
-                    and_(
-                        UserActivity.team_id == team_id,
-                        UserActivity.timestamp >= start,
-                        UserActivity.timestamp <= end
-                    )
-                )
-                .distinct()
+            # Ranking, ordering and team totals are all computed by the database
+            rankings, active_users, totals = await self._team_leaderboard(
+                session, team_id, start, end, TEAM_LEADERBOARD_SIZE
             )
-            users = [r[0] for r in result.all()]
-            
-            # Get per-user summaries
-            user_summaries = []
-            for user in users:
-                summary = await self.get_user_productivity(user, team_id, days)
-                user_summaries.append({
-                    "user": user,
-                    "productivity_score": summary.productivity_score,
-                    "commits": summary.commits,
-                    "prs_merged": summary.prs_merged,
-                    "tasks_completed": summary.tasks_completed,
-                    "lines_added": summary.lines_added,
-                    "trend": summary.activity_trend
-                })
             
-            # Sort by productivity
-            user_summaries.sort(key=lambda x: x["productivity_score"], reverse=True)
-            
-            # Calculate team totals
-            totals = {
-                "total_commits": sum(u["commits"] for u in user_summaries),
-                "total_prs_merged": sum(u["prs_merged"] for u in user_summaries),
-                "total_tasks_completed": sum(u["tasks_completed"] for u in user_summaries),
-                "total_lines_added": sum(u["lines_added"] for u in user_summaries),
-                "average_productivity": (
-                    sum(u["productivity_score"] for u in user_summaries) / len(user_summaries)
-                    if user_summaries else 0
-                )
-            }
+            trends = await self._calculate_team_trends(
+                session, team_id, days, [u["user"] for u in rankings]
+            )
+            for ranking in rankings:
+                ranking["trend"] = trends.get(ranking["user"], "stable")
             
             return {
                 "team_id": team_id,
                 "period_start": str(start_date),
                 "period_end": str(end_date),
-                "active_users": len(users),
-                "user_rankings": user_summaries[:10],  # Top 10
+                "active_users": active_users,
+                "user_rankings": rankings,
                 "totals": totals
             }
 
@@ -285,8 +462,17 @@ class ProductivityAnalytics:
         end_date = datetime.utcnow().date()
         
         async with get_session() as session:
-            result = await session.execute(
-                select(ProductivitySnapshot)
+            # Only the reported columns, fetched in chunks rather than as ORM objects
+            result = await session.stream(
+                select(
+                    ProductivitySnapshot.snapshot_date,
+                    ProductivitySnapshot.commits_count,
+                    ProductivitySnapshot.prs_opened,
+                    ProductivitySnapshot.prs_merged,
+                    ProductivitySnapshot.tasks_completed,
+                    ProductivitySnapshot.lines_added,
+                    ProductivitySnapshot.productivity_score
+                )
                 .where(
                     and_(
                         ProductivitySnapshot.user_identifier == user_identifier,
@@ -295,60 +481,93 @@ class ProductivityAnalytics:
                     )
                 )
                 .order_by(ProductivitySnapshot.snapshot_date)
+                .execution_options(yield_per=BREAKDOWN_STREAM_CHUNK)
             )
-            snapshots = result.scalars().all()
             
             return [
                 {
-                    "date": str(s.snapshot_date),
-                    "commits": s.commits_count,
-                    "prs_opened": s.prs_opened,
-                    "prs_merged": s.prs_merged,
-                    "tasks_completed": s.tasks_completed,
-                    "lines_added": s.lines_added,
-                    "productivity_score": s.productivity_score
+                    "date": str(snapshot_date),
+                    "commits": commits,
+                    "prs_opened": prs_opened,
+                    "prs_merged": prs_merged,
+                    "tasks_completed": tasks_completed,
+                    "lines_added": lines_added,
+                    "productivity_score": score
                 }
-                for s in snapshots
+                async for (
+                    snapshot_date, commits, prs_opened, prs_merged,
+                    tasks_completed, lines_added, score
+                ) in result
             ]
 
-    async def _count_activities(
+    async def _in_session(self, query: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """Run a query helper on a session of its own."""
+        async with get_session() as session:
+            return await query(session, *args)
+
+    async def _fetch_team_activity(
         self,
         session: AsyncSession,
-        user_identifier: str,
         team_id: str,
         start: datetime,
         end: datetime
-    ) -> Dict[str, int]:
-        """Count activities by type."""
+    ) -> Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]:
+        """
+        Per-member activity counts and code metrics for [start, end) in one query.
+        
+        Returns:
+            (counts by type per user, code metrics per user)
+        """
         result = await session.execute(
             select(
+                UserActivity.user_identifier,
                 UserActivity.activity_type,
-                func.count(UserActivity.id).label("count")
+                func.count(UserActivity.id),
+                func.sum(UserActivity.lines_added),
+                func.sum(UserActivity.lines_removed),
+                func.sum(UserActivity.files_changed)
             )
             .where(
                 and_(
-                    UserActivity.user_identifier == user_identifier,
                     UserActivity.team_id == team_id,
                     UserActivity.timestamp >= start,
-                    UserActivity.timestamp <= end
+                    UserActivity.timestamp < end
                 )
             )
-            .group_by(UserActivity.activity_type)
+            .group_by(UserActivity.user_identifier, UserActivity.activity_type)
         )
         
-        return {row[0]: row[1] for row in result.all()}
+        activity_counts: Dict[str, Dict[str, int]] = {}
+        code_metrics: Dict[str, Dict[str, int]] = {}
+        for user, activity_type, count, added, removed, files in result.all():
+            activity_counts.setdefault(user, {})[activity_type] = count
+            metrics = code_metrics.setdefault(
+                user, {"lines_added": 0, "lines_removed": 0, "files_changed": 0}
+            )
+            metrics["lines_added"] += added or 0
+            metrics["lines_removed"] += removed or 0
+            metrics["files_changed"] += files or 0
+        
+        return activity_counts, code_metrics
 
-    async def _get_code_metrics(
+    async def _fetch_activity_and_code(
         self,
         session: AsyncSession,
         user_identifier: str,
         team_id: str,
         start: datetime,
         end: datetime
-    ) -> Dict[str, int]:
-        """Get aggregated code metrics."""
+    ) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Count activities by type and aggregate code metrics for [start, end) in one query.
+        
+        Returns:
+            (activity counts by type, code metrics)
+        """
         result = await session.execute(
             select(
+                UserActivity.activity_type,
+                func.count(UserActivity.id).label("count"),
                 func.sum(UserActivity.lines_added).label("added"),
                 func.sum(UserActivity.lines_removed).label("removed"),
                 func.sum(UserActivity.files_changed).label("files")
@@ -358,17 +577,136 @@ class ProductivityAnalytics:
                     UserActivity.user_identifier == user_identifier,
                     UserActivity.team_id == team_id,
                     UserActivity.timestamp >= start,
-                    UserActivity.timestamp <= end
+                    UserActivity.timestamp < end
                 )
             )
+            .group_by(UserActivity.activity_type)
         )
-        row = result.one()
         
-        return {
-            "lines_added": row[0] or 0,
-            "lines_removed": row[1] or 0,
-            "files_changed": row[2] or 0
+        activity_counts = {}
+        code_metrics = {"lines_added": 0, "lines_removed": 0, "files_changed": 0}
+        for activity_type, count, added, removed, files in result.all():
+            activity_counts[activity_type] = count
+            code_metrics["lines_added"] += added or 0
+            code_metrics["lines_removed"] += removed or 0
+            code_metrics["files_changed"] += files or 0
+        
+        return activity_counts, code_metrics
+
+    async def _rollup_activity(
+        self,
+        session: AsyncSession,
+        user_identifier: str,
+        team_id: str,
+        start_date: date,
+        end_date: date
+    ) -> Tuple[Dict[str, int], Dict[str, int], Dict[date, int]]:
+        """
+        Activity counts, code metrics and per-day totals for [start_date, end_date].
+        
+        Past days are read from their ProductivitySnapshot rows, if the
+        snapshot was taken after the day settled; an earlier snapshot may
+        miss activity that arrived late. UserActivity is only aggregated
+        from the first day without such a snapshot onwards.
+        
+        Returns:
+            (activity counts by type, code metrics, activity count per day)
+        """
+        result = await session.execute(
+            select(
+                ProductivitySnapshot.snapshot_date,
+                ProductivitySnapshot.metrics_detail,
+                ProductivitySnapshot.lines_added,
+                ProductivitySnapshot.lines_removed,
+                ProductivitySnapshot.files_changed,
+                ProductivitySnapshot.created_at
+            )
+            .where(
+                and_(
+                    ProductivitySnapshot.user_identifier == user_identifier,
+                    ProductivitySnapshot.team_id == team_id,
+                    ProductivitySnapshot.snapshot_date >= start_date,
+                    ProductivitySnapshot.snapshot_date < end_date
+                )
+            )
+            .order_by(ProductivitySnapshot.created_at)
+        )
+        # A regenerated snapshot replaces the earlier one for its day
+        snapshots = {
+            row[0]: row[:5] for row in result.all()
+            if row[5] is not None and row[5] >= _settled_at(row[0])
         }
+        
+        raw_from = start_date
+        while raw_from < end_date and raw_from in snapshots:
+            raw_from += timedelta(days=1)
+        
+        activity_counts: Dict[str, int] = {}
+        code_metrics = {"lines_added": 0, "lines_removed": 0, "files_changed": 0}
+        per_day: Dict[date, int] = {}
+        
+        for day, detail, added, removed, files in snapshots.values():
+            if day >= raw_from:
+                continue
+            for activity_type, count in ((detail or {}).get("activity_counts") or {}).items():
+                activity_counts[activity_type] = activity_counts.get(activity_type, 0) + count
+                per_day[day] = per_day.get(day, 0) + count
+            code_metrics["lines_added"] += added or 0
+            code_metrics["lines_removed"] += removed or 0
+            code_metrics["files_changed"] += files or 0
+        
+        rows = await self._daily_breakdown_raw(session, user_identifier, team_id, raw_from, end_date)
+        for day, activity_type, count, added, removed, files in rows:
+            activity_counts[activity_type] = activity_counts.get(activity_type, 0) + count
+            code_metrics["lines_added"] += added or 0
+            code_metrics["lines_removed"] += removed or 0
+            code_metrics["files_changed"] += files or 0
+            per_day[day] = per_day.get(day, 0) + count
+        
+        return activity_counts, code_metrics, per_day
+
+    async def _daily_breakdown_raw(
+        self,
+        session: AsyncSession,
+        user_identifier: str,
+        team_id: str,
+        start_date: date,
+        end_date: date
+    ) -> List[Tuple[date, str, int, Optional[int], Optional[int], Optional[int]]]:
+        """
+        Activity count and code sums per (day, activity_type) for [start_date, end_date].
+        
+        Filters and groups on the same CAST(timestamp AS DATE) expression as
+        idx_activity_user_team_day, so the index yields the rows already
+        ordered by day. The equivalent raw timestamp range is repeated so
+        the planner can prune user_activities partitions.
+        
+        Returns:
+            Rows of (day, activity_type, count, lines_added, lines_removed, files_changed)
+        """
+        day = cast(UserActivity.timestamp, Date)
+        result = await session.execute(
+            select(
+                day.label("day"),
+                UserActivity.activity_type,
+                func.count(UserActivity.id).label("count"),
+                func.sum(UserActivity.lines_added).label("added"),
+                func.sum(UserActivity.lines_removed).label("removed"),
+                func.sum(UserActivity.files_changed).label("files")
+            )
+            .where(
+                and_(
+                    UserActivity.user_identifier == user_identifier,
+                    UserActivity.team_id == team_id,
+                    day >= start_date,
+                    day <= end_date,
+                    UserActivity.timestamp >= datetime.combine(start_date, datetime.min.time()),
+                    UserActivity.timestamp < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+                )
+            )
+            .group_by(day, UserActivity.activity_type)
+        )
+        return result.all()
 
     async def _count_knowledge_entries(
         self,
@@ -386,7 +724,7 @@ class ProductivityAnalytics:
                     KnowledgeEntry.user_id == user_identifier,
                     KnowledgeEntry.team_id == team_id,
                     KnowledgeEntry.created_at >= start,
-                    KnowledgeEntry.created_at <= end
+                    KnowledgeEntry.created_at < end
                 )
             )
         )
@@ -408,7 +746,7 @@ class ProductivityAnalytics:
                     Decision.decided_by == user_identifier,
                     Decision.team_id == team_id,
                     Decision.created_at >= start,
-                    Decision.created_at <= end
+                    Decision.created_at < end
                 )
             )
         )
@@ -427,75 +765,164 @@ class ProductivityAnalytics:
         current_start = now - timedelta(days=days)
         previous_start = now - timedelta(days=days * 2)
         
-        # Current period count
-        current = await session.execute(
-            select(func.count(UserActivity.id))
+        # Both periods counted in one scan of the combined range; future-dated
+        # (clock-skewed) rows are left out of the current period
+        result = await session.execute(
+            select(
+                func.count(UserActivity.id).filter(UserActivity.timestamp >= current_start),
+                func.count(UserActivity.id).filter(UserActivity.timestamp < current_start)
+            )
             .where(
                 and_(
                     UserActivity.user_identifier == user_identifier,
                     UserActivity.team_id == team_id,
-                    UserActivity.timestamp >= current_start
+                    UserActivity.timestamp >= previous_start,
+                    UserActivity.timestamp <= now
                 )
             )
         )
-        current_count = current.scalar() or 0
+        current_count, previous_count = result.one()
         
-        # Previous period count
-        previous = await session.execute(
-            select(func.count(UserActivity.id))
+        return self._trend_label(current_count or 0, previous_count or 0)
+
+    async def _team_leaderboard(
+        self,
+        session: AsyncSession,
+        team_id: str,
+        start: datetime,
+        end: datetime,
+        limit: int
+    ) -> Tuple[List[Dict[str, Any]], int, Dict[str, Any]]:
+        """
+        Top team members by productivity score for [start, end), in one query.
+        
+        A CTE aggregates each member's activity and score; the outer query
+        takes the top `limit` rows and carries team-wide totals as window
+        aggregates, so members past the limit are never sent back.
+        
+        Returns:
+            (ranked member rows, number of active members, team totals)
+        """
+        activity_type = UserActivity.activity_type
+        # Weights are inlined as numeric literals, not bound as untyped parameters
+        weight = case(
+            *[(activity_type == t, literal_column(repr(w))) for t, w in self.WEIGHTS.items()],
+            else_=literal_column(repr(OTHER_ACTIVITY_WEIGHT))
+        )
+        lines = func.coalesce(UserActivity.lines_added, 0) + func.coalesce(UserActivity.lines_removed, 0)
+        
+        agg = (
+            select(
+                UserActivity.user_identifier.label("user"),
+                func.count(UserActivity.id).filter(activity_type == "commit").label("commits"),
+                func.count(UserActivity.id).filter(activity_type == "pr_merged").label("prs_merged"),
+                func.count(UserActivity.id).filter(activity_type == "task_completed").label("tasks_completed"),
+                func.coalesce(func.sum(UserActivity.lines_added), 0).label("lines_added"),
+                func.round(
+                    cast(func.sum(weight) + func.sum(lines) / 100.0 * 0.5, Numeric), 2
+                ).label("score")
+            )
             .where(
                 and_(
-                    UserActivity.user_identifier == user_identifier,
                     UserActivity.team_id == team_id,
-                    UserActivity.timestamp >= previous_start,
-                    UserActivity.timestamp < current_start
+                    UserActivity.timestamp >= start,
+                    UserActivity.timestamp < end
                 )
             )
+            .group_by(UserActivity.user_identifier)
+            .cte("agg")
         )
-        previous_count = previous.scalar() or 0
         
-        if previous_count == 0:
-            return "stable"
+        result = await session.execute(
+            select(
+                agg.c.user,
+                agg.c.score,
+                agg.c.commits,
+                agg.c.prs_merged,
+                agg.c.tasks_completed,
+                agg.c.lines_added,
+                func.count().over(),
+                func.sum(agg.c.commits).over(),
+                func.sum(agg.c.prs_merged).over(),
+                func.sum(agg.c.tasks_completed).over(),
+                func.sum(agg.c.lines_added).over(),
+                func.avg(agg.c.score).over()
+            )
+            .order_by(agg.c.score.desc(), agg.c.user)
+            .limit(limit)
+        )
+        rows = result.all()
         
-        change = (current_count - previous_count) / previous_count
+        rankings = [
+            {
+                "user": user,
+                "productivity_score": float(score),
+                "commits": commits,
+                "prs_merged": prs_merged,
+                "tasks_completed": tasks_completed,
+                "lines_added": lines_added
+            }
+            for user, score, commits, prs_merged, tasks_completed, lines_added, *_ in rows
+        ]
         
-        if change > 0.1:
-            return "increasing"
-        elif change < -0.1:
-            return "decreasing"
-        return "stable"
+        active_users, commits, prs_merged, tasks_completed, lines_added, average = (
+            rows[0][6:] if rows else (0, 0, 0, 0, 0, 0)
+        )
+        totals = {
+            "total_commits": int(commits),
+            "total_prs_merged": int(prs_merged),
+            "total_tasks_completed": int(tasks_completed),
+            "total_lines_added": int(lines_added),
+            "average_productivity": float(average)
+        }
+        
+        return rankings, active_users, totals
 
-    async def _find_most_active_day(
+    async def _calculate_team_trends(
         self,
         session: AsyncSession,
-        user_identifier: str,
         team_id: str,
-        start: datetime,
-        end: datetime
-    ) -> Optional[str]:
-        """Find the most active day."""
+        days: int,
+        users: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """Calculate the activity trend of every team member, or of `users`, in one query."""
+        now = datetime.utcnow()
+        current_start = now - timedelta(days=days)
+        previous_start = now - timedelta(days=days * 2)
+        
         result = await session.execute(
             select(
-                cast(UserActivity.timestamp, Date).label("day"),
-                func.count(UserActivity.id).label("count")
+                UserActivity.user_identifier,
+                func.count(UserActivity.id).filter(UserActivity.timestamp >= current_start),
+                func.count(UserActivity.id).filter(UserActivity.timestamp < current_start)
             )
             .where(
-                and_(
-                    UserActivity.user_identifier == user_identifier,
-                    UserActivity.team_id == team_id,
-                    UserActivity.timestamp >= start,
-                    UserActivity.timestamp <= end
-                )
+                UserActivity.team_id == team_id,
+                UserActivity.timestamp >= previous_start,
+                UserActivity.timestamp <= now,
+                *([UserActivity.user_identifier.in_(users)] if users is not None else [])
             )
-            .group_by(cast(UserActivity.timestamp, Date))
-            .order_by(func.count(UserActivity.id).desc())
-            .limit(1)
+            .group_by(UserActivity.user_identifier)
         )
-        row = result.first()
         
-        if row:
-            return row[0].strftime("%A")  # Day name
-        return None
+        return {
+            user: self._trend_label(current or 0, previous or 0)
+            for user, current, previous in result.all()
+        }
+
+    @staticmethod
+    def _trend_label(current_count: int, previous_count: int) -> str:
+        """Classify the change between two periods' activity counts."""
+        if previous_count == 0:
+            return "stable"
+        
+        change = (current_count - previous_count) / previous_count
+        
+        if change > 0.1:
+            return "increasing"
+        elif change < -0.1:
+            return "decreasing"
+        return "stable"
 
     def _calculate_score(
         self,
@@ -503,15 +930,20 @@ class ProductivityAnalytics:
         code_metrics: Dict[str, int]
     ) -> float:
         """Calculate weighted productivity score."""
+        weight = self.WEIGHTS.get
         score = 0.0
         
+        # Iterate the (usually few) types present rather than every weight
         for activity_type, count in activity_counts.items():
-            weight = self.WEIGHTS.get(activity_type, 1.0)
-            score += count * weight
+            score += count * weight(activity_type, OTHER_ACTIVITY_WEIGHT)
         
-        # Add code contribution bonus
+        return self._finish_score(score, code_metrics)
+
+    @staticmethod
+    def _finish_score(weighted_activity: float, code_metrics: Dict[str, int]) -> float:
+        """Add the code contribution bonus to a weighted activity sum and round."""
         lines = code_metrics.get("lines_added", 0) + code_metrics.get("lines_removed", 0)
-        score += (lines / 100) * 0.5  # Small bonus per 100 lines
+        score = weighted_activity + (lines / 100) * 0.5  # Small bonus per 100 lines
         
         return round(score, 2)
 
@@ -1,14 +1,24 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
 import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
-import uuid
+from typing import Dict, Optional, Tuple
 
-from passlib.context import CryptContext
-from jose import jwt, JWTError
-from sqlalchemy import select, func
+import bcrypt
+from jose import jwk, jwt, JWTError
+from sqlalchemy import bindparam, select, update, delete, func, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from src.database.models import User, Organization, OrganizationMember, Team, TeamMember, Invite
+from src.database.models import (
+    User, Organization, OrganizationMember, Team, TeamMember, Invite, uuid7
+)
 from src.config.settings import get_settings
 from src.config.logging import get_logger
 
@@ -16,29 +26,135 @@ logger = get_logger(__name__)
 settings = get_settings()
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = settings.bcrypt_rounds
+# bcrypt only reads this many bytes; legacy hashes truncate longer passwords, as passlib did
+BCRYPT_MAX_PASSWORD_BYTES = 72
+# passlib's bcrypt_sha256 (v2) layout, so hashes stay readable by passlib
+BCRYPT_SHA256_PREFIX = "$bcrypt-sha256$"
+BCRYPT_SHA256_TEMPLATE = BCRYPT_SHA256_PREFIX + "v=2,t=2b,r=%d$%s$%s"
+
+
+def _bcrypt_sha256_key(password: str, salt: str) -> bytes:
+    """Pre-hash a password so all of it counts, however long (HMAC keyed on the salt)."""
+    digest = hmac.new(salt.encode(), password.encode(), hashlib.sha256).digest()
+    return base64.b64encode(digest)
+
+
+def _hash_password(password: str) -> str:
+    """bcrypt_sha256 hash of a password, called directly rather than through passlib."""
+    config = bcrypt.gensalt(rounds=BCRYPT_ROUNDS).decode()
+    salt = config[-22:]
+    hashed = bcrypt.hashpw(_bcrypt_sha256_key(password, salt), config.encode()).decode()
+    return BCRYPT_SHA256_TEMPLATE % (BCRYPT_ROUNDS, salt, hashed[-31:])
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Check a password against a bcrypt_sha256 or plain bcrypt hash.
+    
+    Plain bcrypt hashes predate the pre-hash and still verify; malformed
+    hashes never match.
+    """
+    try:
+        if hashed_password.startswith(BCRYPT_SHA256_PREFIX):
+            params, salt, checksum = hashed_password[len(BCRYPT_SHA256_PREFIX):].split("$")
+            rounds = int(params.rsplit("r=", 1)[1])
+            key = _bcrypt_sha256_key(plain_password, salt)
+            return bcrypt.checkpw(key, f"$2b${rounds:02d}${salt}{checksum}".encode())
+        secret = plain_password.encode()[:BCRYPT_MAX_PASSWORD_BYTES]
+        return bcrypt.checkpw(secret, hashed_password.encode())
+    except (ValueError, IndexError):
+        return False
+
+
+# Columns behind UserResponse / OrganizationResponse, for listings that
+# don't need full ORM objects
+USER_SUMMARY_COLUMNS = (
+    User.id, User.email, User.name, User.avatar_url, User.is_email_verified,
+    User.github_username, User.slack_username, User.current_org_id,
+    User.current_team_id, User.is_active, User.created_at,
+)
+ORGANIZATION_SUMMARY_COLUMNS = (
+    Organization.id, Organization.name, Organization.slug, Organization.description,
+    Organization.logo_url, Organization.plan, Organization.max_users,
+    Organization.max_teams, Organization.is_active, Organization.created_at,
+)
+
+
+# Hot lookups, built once; each call only binds its parameters
+_SELECT_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+_SELECT_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_SELECT_ORG_BY_ID = select(Organization).where(Organization.id == bindparam("org_id"))
+_SELECT_ORG_BY_SLUG = select(Organization).where(Organization.slug == bindparam("slug"))
+_SELECT_MEMBER_ROLE = select(OrganizationMember.role).where(
+    OrganizationMember.user_id == bindparam("user_id"),
+    OrganizationMember.organization_id == bindparam("org_id"),
+)
+_SELECT_PENDING_INVITE = select(Invite).options(joinedload(Invite.organization)).where(
+    Invite.token == bindparam("token"),
+    Invite.status == "pending",
+)
+
+
+async def _insert_new(session: AsyncSession, model, values: dict, conflict_on: list, conflict_where=None):
+    """
+    INSERT a row unless it would violate the given unique index.
+    
+    One round trip instead of SELECT-then-INSERT, and no race between the two.
+    
+    Returns:
+        The inserted object, or None if a conflicting row already exists
+    """
+    return await session.scalar(
+        insert(model)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=conflict_on, index_where=conflict_where)
+        .returning(model)
+    )
+
+
+# bcrypt releases the GIL while hashing, so hashes run in parallel on these
+# threads instead of stalling the event loop (and the shared default executor)
+_password_pool = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="password-hash"
+)
 
 # JWT settings
 JWT_SECRET = settings.secret_key
 JWT_ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
-REFRESH_TOKEN_EXPIRE_DAYS = 30
+# Built once: given the raw secret, jose re-parses it and constructs a new key on every call
+_JWT_KEY = jwk.construct(JWT_SECRET, JWT_ALGORITHM)
+ACCESS_TOKEN_EXPIRE_SECONDS = 60 * 60 * 24  # 24 hours
+REFRESH_TOKEN_EXPIRE_SECONDS = 60 * 60 * 24 * 30  # 30 days
+
+# Decoded tokens are reused for this many seconds (never past their exp)
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_MAX_ENTRIES = 10000
 
 
 class AuthService:
     """Authentication and user management service."""
 
+    def __init__(self):
+        # token -> (wall-clock expiry, decoded payload)
+        self._token_cache: Dict[str, Tuple[float, dict]] = {}
+
     # =========================================================================
     # PASSWORD UTILITIES
     # =========================================================================
 
-    def hash_password(self, password: str) -> str:
-        """Hash a password."""
-        return pwd_context.hash(password)
+    async def hash_password(self, password: str) -> str:
+        """Hash a password off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_pool, _hash_password, password)
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash."""
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _password_pool, _verify_password, plain_password, hashed_password
+        )
 
     # =========================================================================
     # JWT TOKEN UTILITIES
@@ -46,40 +162,49 @@ class AuthService:
 
     def create_access_token(self, user_id: str, org_id: Optional[str] = None) -> Tuple[str, int]:
         """Create a JWT access token."""
-        expires_delta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        expire = datetime.utcnow() + expires_delta
-        
         payload = {
             "sub": user_id,
             "org_id": org_id,
-            "exp": expire,
+            "exp": int(time.time()) + ACCESS_TOKEN_EXPIRE_SECONDS,
             "type": "access"
         }
         
-        token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
-        return token, int(expires_delta.total_seconds())
+        token = jwt.encode(payload, _JWT_KEY, algorithm=JWT_ALGORITHM)
+        return token, ACCESS_TOKEN_EXPIRE_SECONDS
 
     def create_refresh_token(self, user_id: str) -> str:
         """Create a refresh token."""
-        expires_delta = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-        expire = datetime.utcnow() + expires_delta
-        
         payload = {
             "sub": user_id,
-            "exp": expire,
+            "exp": int(time.time()) + REFRESH_TOKEN_EXPIRE_SECONDS,
             "type": "refresh"
         }
         
-        return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+        return jwt.encode(payload, _JWT_KEY, algorithm=JWT_ALGORITHM)
 
     def decode_token(self, token: str) -> Optional[dict]:
-        """Decode and validate a JWT token."""
+        """
+        Decode and validate a JWT token.
+        
+        Every authenticated request decodes its token, so valid payloads are
+        cached for TOKEN_CACHE_TTL seconds, bounded by the token's own exp.
+        """
+        now = time.time()
+        cached = self._token_cache.get(token)
+        if cached and cached[0] > now:
+            return cached[1]
+        
         try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-            return payload
+            payload = jwt.decode(token, _JWT_KEY, algorithms=[JWT_ALGORITHM])
         except JWTError as e:
             logger.warning("Token decode failed", error=str(e))
             return None
+        
+        if len(self._token_cache) >= TOKEN_CACHE_MAX_ENTRIES:
+            # Evict the oldest-inserted token
+            self._token_cache.pop(next(iter(self._token_cache)))
+        self._token_cache[token] = (min(now + TOKEN_CACHE_TTL, payload.get("exp", now)), payload)
+        return payload
 
     # =========================================================================
     # USER OPERATIONS
@@ -93,22 +218,15 @@ class AuthService:
         name: str
     ) -> User:
         """Create a new user."""
-        # Check if user exists
-        existing = await session.execute(
-            select(User).where(User.email == email)
-        )
-        if existing.scalar_one_or_none():
-            raise ValueError("User with this email already exists")
-
-        user = User(
-            id=str(uuid.uuid4()),
+        user = await _insert_new(session, User, dict(
+            id=uuid7(),
             email=email,
-            password_hash=self.hash_password(password),
+            password_hash=await self.hash_password(password),
             name=name,
             is_email_verified=True,  # Skip email verification for now
-        )
-        session.add(user)
-        await session.flush()
+        ), [User.email])
+        if user is None:
+            raise ValueError("User with this email already exists")
         
         logger.info("User created", user_id=user.id, email=email)
         return user
@@ -119,36 +237,37 @@ class AuthService:
         email: str,
         password: str
     ) -> Optional[User]:
-        """Authenticate a user with email and password."""
-        result = await session.execute(
-            select(User).where(User.email == email, User.is_active == True)
-        )
-        user = result.scalar_one_or_none()
+        """
+        Authenticate a user with email and password.
         
-        if not user or not user.password_hash:
-            return None
+        Only the id and hash are read until the password checks out; the
+        full user then comes back from the last-login UPDATE.
+        """
+        credentials = (await session.execute(
+            select(User.id, User.password_hash).where(User.email == email, User.is_active == True)
+        )).first()
         
-        if not self.verify_password(password, user.password_hash):
+        if not credentials or not credentials.password_hash:
             return None
         
-        # Update last login
-        user.last_login_at = datetime.utcnow()
-        await session.flush()
+        if not await self.verify_password(password, credentials.password_hash):
+            return None
         
-        return user
+        return await session.scalar(
+            update(User)
+            .where(User.id == credentials.id)
+            .values(last_login_at=datetime.utcnow())
+            .returning(User)
+        )
 
     async def get_user_by_id(self, session: AsyncSession, user_id: str) -> Optional[User]:
         """Get a user by ID."""
-        result = await session.execute(
-            select(User).where(User.id == user_id)
-        )
+        result = await session.execute(_SELECT_USER_BY_ID, {"user_id": user_id})
         return result.scalar_one_or_none()
 
     async def get_user_by_email(self, session: AsyncSession, email: str) -> Optional[User]:
         """Get a user by email."""
-        result = await session.execute(
-            select(User).where(User.email == email)
-        )
+        result = await session.execute(_SELECT_USER_BY_EMAIL, {"email": email})
         return result.scalar_one_or_none()
 
     # =========================================================================
@@ -164,60 +283,52 @@ class AuthService:
         description: Optional[str] = None
     ) -> Organization:
         """Create a new organization with the creator as owner."""
-        # Check slug uniqueness
-        existing = await session.execute(
-            select(Organization).where(Organization.slug == slug)
-        )
-        if existing.scalar_one_or_none():
-            raise ValueError("Organization with this slug already exists")
-
-        # Create organization
-        org = Organization(
-            id=str(uuid.uuid4()),
+        # Create organization unless the slug is taken
+        org = await _insert_new(session, Organization, dict(
+            id=uuid7(),
             name=name,
             slug=slug,
             description=description,
-        )
-        session.add(org)
-        await session.flush()
+        ), [Organization.slug])
+        if org is None:
+            raise ValueError("Organization with this slug already exists")
 
         # Add creator as owner
         membership = OrganizationMember(
-            id=str(uuid.uuid4()),
+            id=uuid7(),
             user_id=owner_id,
             organization_id=org.id,
             role="owner",
         )
-        session.add(membership)
 
         # Create default team
         default_team = Team(
-            id=str(uuid.uuid4()),
+            id=uuid7(),
             organization_id=org.id,
             name="General",
             slug="general",
             description="Default team for all members",
             is_default=True,
         )
-        session.add(default_team)
-        await session.flush()
 
         # Add owner to default team
         team_member = TeamMember(
-            id=str(uuid.uuid4()),
+            id=uuid7(),
             user_id=owner_id,
             team_id=default_team.id,
             role="admin",
         )
-        session.add(team_member)
-
-        # Update user's current org
-        user = await self.get_user_by_id(session, owner_id)
-        if user:
-            user.current_org_id = org.id
-            user.current_team_id = default_team.id
 
+        # IDs are assigned here, so one flush inserts all three in FK order
+        session.add_all([membership, default_team, team_member])
         await session.flush()
+
+        # Update user's current org without loading the user first
+        await session.execute(
+            update(User)
+            .where(User.id == owner_id)
+            .values(current_org_id=org.id, current_team_id=default_team.id)
+        )
         
         logger.info("Organization created", org_id=org.id, owner_id=owner_id)
         return org
@@ -227,9 +338,14 @@ class AuthService:
         session: AsyncSession,
         user_id: str
     ) -> list:
-        """Get all organizations a user belongs to."""
+        """
+        Get all organizations a user belongs to.
+        
+        Returns:
+            Rows of the organization's response columns plus the user's role
+        """
         result = await session.execute(
-            select(Organization, OrganizationMember.role)
+            select(*ORGANIZATION_SUMMARY_COLUMNS, OrganizationMember.role)
             .join(OrganizationMember, Organization.id == OrganizationMember.organization_id)
             .where(OrganizationMember.user_id == user_id)
             .where(Organization.is_active == True)
@@ -242,9 +358,7 @@ class AuthService:
         org_id: str
     ) -> Optional[Organization]:
         """Get an organization by ID."""
-        result = await session.execute(
-            select(Organization).where(Organization.id == org_id)
-        )
+        result = await session.execute(_SELECT_ORG_BY_ID, {"org_id": org_id})
         return result.scalar_one_or_none()
 
     async def get_organization_by_slug(
@@ -253,9 +367,7 @@ class AuthService:
         slug: str
     ) -> Optional[Organization]:
         """Get an organization by slug."""
-        result = await session.execute(
-            select(Organization).where(Organization.slug == slug)
-        )
+        result = await session.execute(_SELECT_ORG_BY_SLUG, {"slug": slug})
         return result.scalar_one_or_none()
 
     async def get_user_role_in_org(
@@ -266,11 +378,7 @@ class AuthService:
     ) -> Optional[str]:
         """Get a user's role in an organization."""
         result = await session.execute(
-            select(OrganizationMember.role)
-            .where(
-                OrganizationMember.user_id == user_id,
-                OrganizationMember.organization_id == org_id
-            )
+            _SELECT_MEMBER_ROLE, {"user_id": user_id, "org_id": org_id}
         )
         row = result.scalar_one_or_none()
         return row if row else None
@@ -280,9 +388,14 @@ class AuthService:
         session: AsyncSession,
         org_id: str
     ) -> list:
-        """Get all members of an organization."""
+        """
+        Get all members of an organization.
+        
+        Returns:
+            Rows of the user's response columns plus role and joined_at
+        """
         result = await session.execute(
-            select(User, OrganizationMember.role, OrganizationMember.joined_at)
+            select(*USER_SUMMARY_COLUMNS, OrganizationMember.role, OrganizationMember.joined_at)
             .join(OrganizationMember, User.id == OrganizationMember.user_id)
             .where(OrganizationMember.organization_id == org_id)
             .where(User.is_active == True)
@@ -304,7 +417,7 @@ class AuthService:
     ) -> Team:
         """Create a new team within an organization."""
         team = Team(
-            id=str(uuid.uuid4()),
+            id=uuid7(),
             organization_id=org_id,
             name=name,
             slug=slug,
@@ -315,7 +428,7 @@ class AuthService:
 
         # Add creator as team admin
         team_member = TeamMember(
-            id=str(uuid.uuid4()),
+            id=uuid7(),
             user_id=creator_id,
             team_id=team.id,
             role="admin",
@@ -362,22 +475,14 @@ class AuthService:
         role: str = "member"
     ) -> TeamMember:
         """Add a user to a team."""
-        # Check if already a member
-        existing = await session.execute(
-            select(TeamMember)
-            .where(TeamMember.user_id == user_id, TeamMember.team_id == team_id)
-        )
-        if existing.scalar_one_or_none():
-            raise ValueError("User is already a member of this team")
-
-        member = TeamMember(
-            id=str(uuid.uuid4()),
+        member = await _insert_new(session, TeamMember, dict(
+            id=uuid7(),
             user_id=user_id,
             team_id=team_id,
             role=role,
-        )
-        session.add(member)
-        await session.flush()
+        ), [TeamMember.team_id, TeamMember.user_id])
+        if member is None:
+            raise ValueError("User is already a member of this team")
         return member
 
     # =========================================================================
@@ -394,43 +499,32 @@ class AuthService:
         team_id: Optional[str] = None
     ) -> Invite:
         """Create an invitation to join an organization."""
-        # Check if user already exists in org
-        existing_user = await self.get_user_by_email(session, email)
-        if existing_user:
-            existing_membership = await session.execute(
-                select(OrganizationMember)
-                .where(
-                    OrganizationMember.user_id == existing_user.id,
-                    OrganizationMember.organization_id == org_id
-                )
-            )
-            if existing_membership.scalar_one_or_none():
-                raise ValueError("User is already a member of this organization")
-
-        # Check for pending invite
-        existing_invite = await session.execute(
-            select(Invite)
-            .where(
-                Invite.email == email,
-                Invite.organization_id == org_id,
-                Invite.status == "pending"
-            )
+        # Check if user already exists in org (one id lookup, no rows hydrated)
+        existing_membership = await session.scalar(
+            select(OrganizationMember.id)
+            .join(User, User.id == OrganizationMember.user_id)
+            .where(User.email == email, OrganizationMember.organization_id == org_id)
+            .limit(1)
         )
-        if existing_invite.scalar_one_or_none():
-            raise ValueError("An invite for this email is already pending")
-
-        invite = Invite(
-            id=str(uuid.uuid4()),
+        if existing_membership:
+            raise ValueError("User is already a member of this organization")
+
+        # At most one pending invite per address (partial unique index). The
+        # predicate must be literal SQL: PostgreSQL cannot match the index
+        # against a bound parameter
+        invite = await _insert_new(session, Invite, dict(
+            id=uuid7(),
             email=email,
             organization_id=org_id,
             team_id=team_id,
             role=role,
             token=secrets.token_urlsafe(32),
             invited_by=invited_by,
+            status="pending",
             expires_at=datetime.utcnow() + timedelta(days=7),
-        )
-        session.add(invite)
-        await session.flush()
+        ), [Invite.organization_id, Invite.email], text("status = 'pending'"))
+        if invite is None:
+            raise ValueError("An invite for this email is already pending")
 
         logger.info("Invite created", invite_id=invite.id, email=email, org_id=org_id)
         return invite
@@ -443,11 +537,8 @@ class AuthService:
         password: str
     ) -> Tuple[User, Organization]:
         """Accept an invitation and create/update user."""
-        # Find invite
-        result = await session.execute(
-            select(Invite)
-            .where(Invite.token == token, Invite.status == "pending")
-        )
+        # Find invite, with its organization in the same query
+        result = await session.execute(_SELECT_PENDING_INVITE, {"token": token})
         invite = result.scalar_one_or_none()
         
         if not invite:
@@ -458,17 +549,26 @@ class AuthService:
             await session.flush()
             raise ValueError("Invitation has expired")
 
+        # Claim the invite; a concurrent accept of the same token matches no row
+        claimed = await session.execute(
+            update(Invite)
+            .where(Invite.id == invite.id, Invite.status == "pending")
+            .values(status="accepted", accepted_at=datetime.utcnow())
+        )
+        if not claimed.rowcount:
+            raise ValueError("Invalid or expired invitation")
+
         # Get or create user
         user = await self.get_user_by_email(session, invite.email)
         if not user:
             user = await self.create_user(session, invite.email, password, name)
         elif not user.password_hash:
-            user.password_hash = self.hash_password(password)
+            user.password_hash = await self.hash_password(password)
             user.name = name
 
         # Add to organization
         org_member = OrganizationMember(
-            id=str(uuid.uuid4()),
+            id=uuid7(),
             user_id=user.id,
             organization_id=invite.organization_id,
             role=invite.role,
@@ -476,45 +576,30 @@ class AuthService:
         )
         session.add(org_member)
 
-        # Add to team if specified
-        if invite.team_id:
-            team_member = TeamMember(
-                id=str(uuid.uuid4()),
-                user_id=user.id,
-                team_id=invite.team_id,
-                role="member",
-            )
-            session.add(team_member)
-        else:
-            # Add to default team
+        # Add to the invite's team, or else the default team
+        team_id = invite.team_id
+        if not team_id:
             default_team = await session.execute(
-                select(Team)
+                select(Team.id)
                 .where(Team.organization_id == invite.organization_id, Team.is_default == True)
             )
-            team = default_team.scalar_one_or_none()
-            if team:
-                team_member = TeamMember(
-                    id=str(uuid.uuid4()),
-                    user_id=user.id,
-                    team_id=team.id,
-                    role="member",
-                )
-                session.add(team_member)
-
-        # Update invite status
-        invite.status = "accepted"
-        invite.accepted_at = datetime.utcnow()
+            team_id = default_team.scalar_one_or_none()
+        if team_id:
+            # A membership left over from an earlier stint in the org is kept
+            await _insert_new(session, TeamMember, dict(
+                id=uuid7(),
+                user_id=user.id,
+                team_id=team_id,
+                role="member",
+            ), [TeamMember.team_id, TeamMember.user_id])
 
         # Set user's current org
         user.current_org_id = invite.organization_id
 
         await session.flush()
 
-        # Get organization
-        org = await self.get_organization_by_id(session, invite.organization_id)
-
         logger.info("Invite accepted", user_id=user.id, org_id=invite.organization_id)
-        return user, org
+        return user, invite.organization
 
     # =========================================================================
     # MEMBER MANAGEMENT
@@ -552,28 +637,23 @@ class AuthService:
     ) -> bool:
         """Remove a member from an organization."""
         # Remove from all teams in org
-        teams = await self.get_organization_teams(session, org_id)
-        for team in teams:
-            await session.execute(
-                select(TeamMember)
-                .where(TeamMember.team_id == team.id, TeamMember.user_id == user_id)
+        await session.execute(
+            delete(TeamMember)
+            .where(
+                TeamMember.user_id == user_id,
+                TeamMember.team_id.in_(select(Team.id).where(Team.organization_id == org_id))
             )
+        )
         
         # Remove from org
         result = await session.execute(
-            select(OrganizationMember)
+            delete(OrganizationMember)
             .where(
                 OrganizationMember.organization_id == org_id,
                 OrganizationMember.user_id == user_id
             )
         )
-        member = result.scalar_one_or_none()
-        
-        if member:
-            await session.delete(member)
-            await session.flush()
-            return True
-        return False
+        return result.rowcount > 0
 
 
 # Singleton instance
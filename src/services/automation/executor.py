@@ -10,12 +10,11 @@ Executes actions defined in automation rules:
 
 from typing import Dict, Optional, Any
 from datetime import datetime
-import uuid
 
 from sqlalchemy import select
 
 from src.database.session import get_session
-from src.database.models import Task
+from src.database.models import Task, uuid7
 from src.services.impact.notifications import notification_service, NotificationPayload
 from src.config.settings import get_settings
 from src.config.logging import get_logger
@@ -23,25 +22,40 @@ from src.config.logging import get_logger
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Pronouns in action params that refer back to the user who triggered the rule
+_PRONOUNS = frozenset({"him", "her", "them", "they"})
+
+
+def _build_slack_client():
+    """Create the Slack client once, if a bot token is configured."""
+    if not settings.slack_bot_token:
+        return None
+    try:
+        from slack_sdk.web.async_client import AsyncWebClient
+    except ImportError:
+        logger.warning("slack_sdk not available")
+        return None
+    return AsyncWebClient(token=settings.slack_bot_token)
+
+
+_SLACK_CLIENT = _build_slack_client()
+
 
 class ActionExecutor:
     """
     Executes automation actions.
     """
 
-    def __init__(self):
-        self._slack_client = None
+    _slack_client = _SLACK_CLIENT
 
-    @property
-    def slack_client(self):
-        """Lazy load Slack client."""
-        if self._slack_client is None and settings.slack_bot_token:
-            try:
-                from slack_sdk.web.async_client import AsyncWebClient
-                self._slack_client = AsyncWebClient(token=settings.slack_bot_token)
-            except ImportError:
-                logger.warning("slack_sdk not available")
-        return self._slack_client
+    # Action type -> handler method name, resolved with getattr per call
+    _EXECUTORS = {
+        "notify_user": "_execute_notify_user",
+        "create_task": "_execute_create_task",
+        "assign_task": "_execute_assign_task",
+        "send_message": "_execute_send_message",
+        "update_task": "_execute_update_task",
+    }
 
     async def execute(
         self,
@@ -64,23 +78,15 @@ class ActionExecutor:
         """
         context = context or {}
         
-        executors = {
-            "notify_user": self._execute_notify_user,
-            "create_task": self._execute_create_task,
-            "assign_task": self._execute_assign_task,
-            "send_message": self._execute_send_message,
-            "update_task": self._execute_update_task,
-        }
-        
-        executor = executors.get(action_type)
-        if not executor:
+        method_name = self._EXECUTORS.get(action_type)
+        if method_name is None:
             return {
                 "success": False,
                 "error": f"Unknown action type: {action_type}"
             }
         
         try:
-            result = await executor(action_params, team_id, context)
+            result = await getattr(self, method_name)(action_params, team_id, context)
             logger.info(
                 "Action executed",
                 action_type=action_type,
@@ -109,7 +115,7 @@ class ActionExecutor:
             return {"success": False, "error": "No user specified"}
         
         # Resolve pronouns from context
-        if user.lower() in ("him", "her", "them", "they"):
+        if user.lower() in _PRONOUNS:
             user = context.get("trigger_user", user)
         
         # Create notification
@@ -123,7 +129,7 @@ class ActionExecutor:
             related_change=context
         )
         
-        notification_id = await notification_service.create_notification(payload)
+        notification_id = await notification_service.enqueue(payload)
         
         return {
             "success": True,
@@ -150,10 +156,10 @@ class ActionExecutor:
         priority = params.get("priority", "medium")
         
         # Resolve pronouns
-        if assignee and assignee.lower() in ("him", "her", "them", "they"):
+        if assignee and assignee.lower() in _PRONOUNS:
             assignee = context.get("trigger_user", assignee)
         
-        task_id = str(uuid.uuid4())
+        task_id = uuid7()
         
         async with get_session() as session:
             task = Task(
@@ -173,7 +179,7 @@ class ActionExecutor:
         
         # Notify assignee if specified
         if assignee:
-            await notification_service.create_notification(NotificationPayload(
+            await notification_service.enqueue(NotificationPayload(
                 user_identifier=assignee,
                 team_id=team_id,
                 notification_type="task_assigned",
@@ -205,7 +211,7 @@ class ActionExecutor:
             return {"success": False, "error": "task_id and assignee required"}
         
         # Resolve pronouns
-        if assignee.lower() in ("him", "her", "them", "they"):
+        if assignee.lower() in _PRONOUNS:
             assignee = context.get("trigger_user", assignee)
         
         async with get_session() as session:
@@ -222,7 +228,7 @@ class ActionExecutor:
             task.updated_at = datetime.utcnow()
         
         # Notify new assignee
-        await notification_service.create_notification(NotificationPayload(
+        await notification_service.enqueue(NotificationPayload(
             user_identifier=assignee,
             team_id=team_id,
             notification_type="task_assigned",
@@ -253,11 +259,11 @@ class ActionExecutor:
         if not channel or not message:
             return {"success": False, "error": "channel and message required"}
         
-        if not self.slack_client:
+        if not self._slack_client:
             return {"success": False, "error": "Slack not configured"}
         
         try:
-            response = await self.slack_client.chat_postMessage(
+            response = await self._slack_client.chat_postMessage(
                 channel=channel,
                 text=message
             )
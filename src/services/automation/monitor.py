@@ -15,6 +15,9 @@ from src.config.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Rule actions running at once, so a burst of matches doesn't flood Slack and the DB
+MAX_CONCURRENT_ACTIONS = 8
+
 
 class ConditionMonitor:
     """
@@ -24,6 +27,7 @@ class ConditionMonitor:
     def __init__(self):
         self._running = False
         self._check_interval = 60  # seconds
+        self._action_slots = asyncio.Semaphore(MAX_CONCURRENT_ACTIONS)
 
     async def check_task_completed(
         self,
@@ -138,8 +142,6 @@ class ConditionMonitor:
         Returns:
             List of executed rule IDs
         """
-        executed_rules = []
-        
         try:
             # Get matching rules
             rules = await rule_manager.get_rules_for_trigger(
@@ -154,61 +156,94 @@ class ConditionMonitor:
                 matching_rules=len(rules)
             )
             
-            for rule in rules:
-                try:
-                    # Build execution context
-                    context = {
-                        "rule_id": rule["id"],
-                        "trigger_type": trigger_type,
-                        "trigger_data": trigger_data,
-                        "trigger_user": trigger_data.get("user") or trigger_data.get("author")
-                    }
-                    
-                    # Execute the action
-                    result = await action_executor.execute(
-                        action_type=rule["action_type"],
-                        action_params=rule["action_params"],
-                        team_id=team_id,
-                        context=context
-                    )
-                    
-                    # Record execution
-                    await rule_manager.record_execution(
-                        rule_id=rule["id"],
-                        triggered_by=trigger_data,
-                        status="success" if result.get("success") else "failed",
-                        result=result,
-                        actions_performed=[{
-                            "action_type": rule["action_type"],
-                            "result": result
-                        }],
-                        error=result.get("error")
-                    )
-                    
-                    if result.get("success"):
-                        executed_rules.append(rule["id"])
-                    
-                except Exception as e:
-                    logger.error(
-                        "Rule execution failed",
-                        rule_id=rule["id"],
-                        error=str(e)
-                    )
-                    await rule_manager.record_execution(
-                        rule_id=rule["id"],
-                        triggered_by=trigger_data,
-                        status="failed",
-                        result={},
-                        actions_performed=[],
-                        error=str(e)
-                    )
+            if not rules:
+                return []
             
-            return executed_rules
+            # Skip rules paused or deleted since they were cached
+            claimed = await rule_manager.claim_rules(team_id, [rule["id"] for rule in rules])
+            rules = [rule for rule in rules if rule["id"] in claimed]
+            if not rules:
+                return []
+            
+            # Run the actions concurrently, then record them in one transaction
+            executions = await asyncio.gather(*(
+                self._run_rule(rule, team_id, trigger_type, trigger_data)
+                for rule in rules
+            ))
+            try:
+                await rule_manager.record_executions(executions)
+            except Exception as e:
+                # The actions already ran; report them even if the log write failed
+                logger.error("Recording rule executions failed", error=str(e), count=len(executions))
+            
+            return [
+                execution["rule_id"]
+                for execution in executions
+                if execution["status"] == "success"
+            ]
             
         except Exception as e:
             logger.error("Condition check failed", error=str(e))
             return []
 
+    async def _run_rule(
+        self,
+        rule: Dict[str, Any],
+        team_id: str,
+        trigger_type: str,
+        trigger_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Execute one rule's action.
+        
+        Returns:
+            record_execution() keyword arguments describing the outcome
+        """
+        try:
+            # Build execution context
+            context = {
+                "rule_id": rule["id"],
+                "trigger_type": trigger_type,
+                "trigger_data": trigger_data,
+                "trigger_user": trigger_data.get("user") or trigger_data.get("author")
+            }
+            
+            # Execute the action
+            async with self._action_slots:
+                result = await action_executor.execute(
+                    action_type=rule["action_type"],
+                    action_params=rule["action_params"],
+                    team_id=team_id,
+                    context=context
+                )
+            
+            return dict(
+                rule_id=rule["id"],
+                triggered_by=trigger_data,
+                status="success" if result.get("success") else "failed",
+                result=result,
+                actions_performed=[{
+                    "action_type": rule["action_type"],
+                    "result": result
+                }],
+                error=result.get("error")
+            )
+            
+        except Exception as e:
+            logger.error(
+                "Rule execution failed",
+                rule_id=rule["id"],
+                error=str(e)
+            )
+            return dict(
+                rule_id=rule["id"],
+                triggered_by=trigger_data,
+                status="failed",
+                result={},
+                actions_performed=[],
+                error=str(e)
+            )
+
     async def run_periodic_check(self, team_ids: List[str]):
         """
         Run periodic checks for time-based triggers.
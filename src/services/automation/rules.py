@@ -4,11 +4,13 @@ Automation Rule Manager
 Manages CRUD operations for automation rules.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime
+import asyncio
+import time
 import uuid
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, update, insert, and_, case, func
 
 from src.database.session import get_session
 from src.database.models import AutomationRule, AutomationExecution
@@ -17,12 +19,114 @@ from src.config.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Active rules are re-read at most this often per (team, trigger type)
+ACTIVE_RULES_CACHE_TTL = 30
+ACTIVE_RULES_CACHE_MAX_TEAMS = 1024
+
+class _Folded(dict):
+    """Casefolded str() of trigger values, computed once per event on first use."""
+
+    def __init__(self, data: Dict[str, Any]):
+        super().__init__()
+        self._data = data
+
+    def __missing__(self, key: str) -> str:
+        folded = self[key] = str(self._data[key]).casefold()
+        return folded
+
+
+# (trigger data, its _Folded view) -> whether one condition holds
+Matcher = Callable[[Dict[str, Any], _Folded], bool]
+# Trigger data (and optionally its _Folded view) -> whether all of a rule's conditions hold
+RuleMatcher = Callable[..., bool]
+
+
+def _any_listed(actual: Any, expected: list) -> bool:
+    """List condition by equality, for values that can't go in a set."""
+    if isinstance(actual, list):
+        return any(e in actual for e in expected)
+    return actual in expected
+
+
+def _compile_condition(key: str, expected: Any) -> Matcher:
+    """
+    Specialize one condition on the type of its expected value.
+    
+    A condition whose key is missing from the trigger data doesn't apply.
+    Lists match if any entry matches, strings match case-insensitive
+    substrings, anything else must be equal.
+    """
+    if isinstance(expected, list):
+        try:
+            options = frozenset(expected)
+        except TypeError:
+            def check(data, folded):
+                actual = data.get(key)
+                return actual is None or _any_listed(actual, expected)
+            return check
+        
+        def check(data, folded):
+            actual = data.get(key)
+            if actual is None:
+                return True
+            try:
+                if isinstance(actual, list):
+                    return not options.isdisjoint(actual)
+                return actual in options
+            except TypeError:
+                return _any_listed(actual, expected)
+        return check
+    
+    if isinstance(expected, str):
+        needle = expected.casefold()
+        
+        def check(data, folded):
+            return data.get(key) is None or needle in folded[key]
+        return check
+    
+    def check(data, folded):
+        actual = data.get(key)
+        return actual is None or actual == expected
+    return check
+
+
+def _compile_matcher(conditions: Dict[str, Any]) -> RuleMatcher:
+    """
+    Build one matcher for all of a rule's conditions, once per cached rule.
+    
+    Rules checked against the same event should share its _Folded view so
+    each value is casefolded once.
+    """
+    checks = tuple(_compile_condition(key, expected) for key, expected in conditions.items())
+    
+    def matches(data: Dict[str, Any], folded: Optional[_Folded] = None) -> bool:
+        if folded is None:
+            folded = _Folded(data)
+        for check in checks:
+            if not check(data, folded):
+                return False
+        return True
+    return matches
+
 
 class AutomationRuleManager:
     """
     Manages automation rules in the database.
+    
+    Active rules are cached in-process for ACTIVE_RULES_CACHE_TTL seconds;
+    changes made through this manager drop the team's cached rules, and
+    the TTL bounds staleness for changes made elsewhere.
     """
 
+    def __init__(self):
+        # team -> trigger type -> (expires_at, rules, matchers); grouped so a team drops in O(1)
+        self._active_rules_cache: Dict[str, Dict[Optional[str], Tuple[float, List[Dict], List[RuleMatcher]]]] = {}
+        self._active_rules_inflight: Dict[Tuple[str, Optional[str]], asyncio.Future] = {}
+
+    def invalidate(self, team_id: str) -> None:
+        """Drop a team's cached active rules."""
+        self._active_rules_cache.pop(team_id, None)
+
     async def create_rule(
         self,
         team_id: str,
@@ -60,6 +164,7 @@ class AutomationRuleManager:
                 action=command.action.action_type
             )
         
+        self.invalidate(team_id)
         return rule_id
 
     async def get_rule(self, rule_id: str) -> Optional[Dict]:
@@ -83,10 +188,63 @@ class AutomationRuleManager:
         """
         Get all active rules for a team.
         
+        Served from the in-process cache when fresh; concurrent misses for
+        the same key share one query. The returned list is shared, so
+        callers must not mutate it.
+        
         Args:
             team_id: Team ID
             trigger_type: Filter by trigger type
         """
+        rules, _ = await self._active_rules(team_id, trigger_type)
+        return rules
+
+    async def _active_rules(
+        self,
+        team_id: str,
+        trigger_type: Optional[str]
+    ) -> Tuple[List[Dict], List[RuleMatcher]]:
+        """Cached active rules alongside their compiled condition matchers."""
+        cached = self._active_rules_cache.get(team_id, {}).get(trigger_type)
+        if cached and cached[0] > time.monotonic():
+            return cached[1], cached[2]
+        
+        key = (team_id, trigger_type)
+        inflight = self._active_rules_inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._active_rules_inflight[key] = future
+        try:
+            rules = await self._query_active_rules(team_id, trigger_type)
+            matchers = [_compile_matcher(rule["trigger_conditions"]) for rule in rules]
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved in case nobody joined
+            raise
+        else:
+            future.set_result((rules, matchers))
+        finally:
+            del self._active_rules_inflight[key]
+        
+        if team_id not in self._active_rules_cache and len(self._active_rules_cache) >= ACTIVE_RULES_CACHE_MAX_TEAMS:
+            # Evict the oldest-inserted team
+            self._active_rules_cache.pop(next(iter(self._active_rules_cache)))
+        self._active_rules_cache.setdefault(team_id, {})[trigger_type] = (
+            time.monotonic() + ACTIVE_RULES_CACHE_TTL, rules, matchers
+        )
+        return rules, matchers
+
+    async def _query_active_rules(
+        self,
+        team_id: str,
+        trigger_type: Optional[str]
+    ) -> List[Dict]:
+        """Load a team's active rules (uncached)."""
         async with get_session() as session:
             query = select(AutomationRule).where(
                 and_(
@@ -120,45 +278,45 @@ class AutomationRuleManager:
         Returns:
             List of matching rules
         """
-        rules = await self.get_active_rules(team_id, trigger_type)
-        matching = []
+        rules, matchers = await self._active_rules(team_id, trigger_type)
+        folded = _Folded(trigger_data)
+        return [rule for rule, matches in zip(rules, matchers) if matches(trigger_data, folded)]
+
+    async def claim_rules(self, team_id: str, rule_ids: List[str]) -> Set[str]:
+        """
+        Re-check matched rules against the database right before running them.
         
-        for rule in rules:
-            if self._matches_conditions(rule["trigger_conditions"], trigger_data):
-                matching.append(rule)
+        Other processes' caches can lag a pause or delete by up to
+        ACTIVE_RULES_CACHE_TTL, so only rules still active are claimed.
+        One-time rules are completed by the same UPDATE, so two events
+        racing for one can't both run it.
         
-        return matching
-
-    def _matches_conditions(
-        self,
-        conditions: Dict[str, Any],
-        trigger_data: Dict[str, Any]
-    ) -> bool:
-        """Check if trigger data matches rule conditions."""
-        for key, expected in conditions.items():
-            actual = trigger_data.get(key)
-            
-            if actual is None:
-                continue  # Condition not applicable
-            
-            # Handle different match types
-            if isinstance(expected, list):
-                # Any in list matches
-                if isinstance(actual, list):
-                    if not any(e in actual for e in expected):
-                        return False
-                elif actual not in expected:
-                    return False
-            elif isinstance(expected, str):
-                # String match (case-insensitive, supports partial)
-                if expected.lower() not in str(actual).lower():
-                    return False
-            else:
-                # Exact match
-                if actual != expected:
-                    return False
+        Returns:
+            IDs of the rules that may run
+        """
+        if not rule_ids:
+            return set()
         
-        return True
+        async with get_session() as session:
+            claimed = (await session.execute(
+                update(AutomationRule)
+                .where(
+                    AutomationRule.id.in_(rule_ids),
+                    AutomationRule.team_id == team_id,
+                    AutomationRule.status == "active"
+                )
+                .values(status=case(
+                    (AutomationRule.is_one_time.is_(True), "completed"),
+                    else_=AutomationRule.status,
+                ))
+                .returning(AutomationRule.id, AutomationRule.is_one_time)
+                .execution_options(synchronize_session=False)
+            )).all()
+        
+        # Our cache served a stale rule, or a one-time rule just completed
+        if len(claimed) < len(rule_ids) or any(rule.is_one_time for rule in claimed):
+            self.invalidate(team_id)
+        return {rule.id for rule in claimed}
 
     async def update_rule_status(
         self,
@@ -177,9 +335,12 @@ class AutomationRuleManager:
             
             rule.status = status
             rule.updated_at = datetime.utcnow()
+            team_id = rule.team_id
             
             logger.info("Rule status updated", rule_id=rule_id, status=status)
-            return True
+        
+        self.invalidate(team_id)
+        return True
 
     async def record_execution(
         self,
@@ -189,39 +350,89 @@ class AutomationRuleManager:
         result: Dict[str, Any],
         actions_performed: List[Dict],
         error: Optional[str] = None
-    ) -> str:
-        """Record a rule execution."""
-        execution_id = str(uuid.uuid4())
+    ) -> Optional[str]:
+        """Record a rule execution; returns None if the rule no longer exists."""
+        (execution_id,) = await self.record_executions([dict(
+            rule_id=rule_id,
+            triggered_by=triggered_by,
+            status=status,
+            result=result,
+            actions_performed=actions_performed,
+            error=error,
+        )])
+        return execution_id
+
+    async def record_executions(self, executions: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Record several rule executions in one transaction.
+        
+        Executions of rules that were deleted meanwhile are skipped, so
+        one missing rule can't fail the insert for the others.
+        
+        Args:
+            executions: Dicts of record_execution()'s keyword arguments
+        
+        Returns:
+            Execution IDs in the same order, None where the rule is gone
+        """
+        ids: List[Optional[str]] = []
+        rows = []
+        reopened_teams = set()
         
         async with get_session() as session:
-            # Record execution
-            execution = AutomationExecution(
-                id=execution_id,
-                rule_id=rule_id,
-                triggered_by_event=triggered_by,
-                status=status,
-                result=result,
-                actions_performed=actions_performed,
-                error_message=error
-            )
-            session.add(execution)
-            
-            # Update rule
-            result_db = await session.execute(
-                select(AutomationRule).where(AutomationRule.id == rule_id)
-            )
-            rule = result_db.scalar_one_or_none()
-            
-            if rule:
-                rule.execution_count += 1
-                rule.last_triggered_at = datetime.utcnow()
-                rule.last_execution_result = {"status": status, "execution_id": execution_id}
+            for execution in executions:
+                execution_id = str(uuid.uuid4())
+                status = execution["status"]
+                
+                # Bump the rule in place: no SELECT, and concurrent
+                # executions can't lose each other's increments
+                values = dict(
+                    execution_count=func.coalesce(AutomationRule.execution_count, 0) + 1,
+                    last_triggered_at=datetime.utcnow(),
+                    last_execution_result={"status": status, "execution_id": execution_id},
+                )
+                if status != "success":
+                    # claim_rules() completed a one-time rule up front; let it run again
+                    values["status"] = case(
+                        (
+                            and_(AutomationRule.is_one_time.is_(True), AutomationRule.status == "completed"),
+                            "active"
+                        ),
+                        else_=AutomationRule.status,
+                    )
+                rule = (await session.execute(
+                    update(AutomationRule)
+                    .where(AutomationRule.id == execution["rule_id"])
+                    .values(**values)
+                    .returning(AutomationRule.team_id, AutomationRule.is_one_time)
+                    .execution_options(synchronize_session=False)
+                )).first()
+                
+                if rule is None:
+                    logger.warning("Rule no longer exists, execution not recorded", rule_id=execution["rule_id"])
+                    ids.append(None)
+                    continue
+                
+                if status != "success" and rule.is_one_time:
+                    reopened_teams.add(rule.team_id)
                 
-                # Deactivate if one-time
-                if rule.is_one_time and status == "success":
-                    rule.status = "completed"
+                ids.append(execution_id)
+                rows.append(dict(
+                    id=execution_id,
+                    rule_id=execution["rule_id"],
+                    triggered_by_event=execution["triggered_by"],
+                    status=status,
+                    result=execution["result"],
+                    actions_performed=execution["actions_performed"],
+                    error_message=execution.get("error"),
+                ))
+            
+            if rows:
+                await session.execute(insert(AutomationExecution), rows)
         
-        return execution_id
+        for team_id in reopened_teams:
+            self.invalidate(team_id)
+        return ids
 
     async def delete_rule(self, rule_id: str) -> bool:
         """Delete a rule."""
@@ -235,8 +446,11 @@ class AutomationRuleManager:
                 return False
             
             await session.delete(rule)
+            team_id = rule.team_id
             logger.info("Rule deleted", rule_id=rule_id)
-            return True
+        
+        self.invalidate(team_id)
+        return True
 
     async def list_rules(
         self,
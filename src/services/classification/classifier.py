@@ -17,12 +17,16 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 import json
+import re
 
 from src.llm.client import llm_client
 from src.config.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Fallback for LLM replies that wrap the JSON object in prose
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
 
 class ContentCategory(str, Enum):
     TASK = "task"
@@ -168,8 +172,7 @@ class ContentClassifier:
             data = json.loads(response)
         except json.JSONDecodeError:
             # Try to extract JSON from response
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            json_match = _JSON_OBJECT_RE.search(response)
             if json_match:
                 data = json.loads(json_match.group())
             else:
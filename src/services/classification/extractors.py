@@ -5,12 +5,16 @@ Extractors for decisions, action items, and other structured data from content.
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 import json
+import re
 
 from src.llm.client import llm_client
 from src.config.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Fallback for LLM replies that wrap the JSON object in prose
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
 
 @dataclass
 class ExtractedDecision:
@@ -240,8 +244,7 @@ Description:
         try:
             return json.loads(response)
         except json.JSONDecodeError:
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            json_match = _JSON_OBJECT_RE.search(response)
             if json_match:
                 return json.loads(json_match.group())
             return {"has_decision": False}
@@ -316,8 +319,7 @@ class ActionItemExtractor:
         try:
             return json.loads(response)
         except json.JSONDecodeError:
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            json_match = _JSON_OBJECT_RE.search(response)
             if json_match:
                 return json.loads(json_match.group())
             return {"has_action_items": False, "action_items": []}
@@ -7,12 +7,13 @@ Sends notifications to users via various channels:
 - Email (future)
 """
 
-from typing import Dict, List, Optional
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 import uuid
 
-from sqlalchemy import select, or_
+from sqlalchemy import insert, select, or_
 
 from src.database.session import get_session
 from src.database.models import Notification, User, NotificationType
@@ -22,6 +23,12 @@ from src.config.logging import get_logger
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Notifications buffered in-process before enqueue() waits for the worker
+NOTIFICATION_QUEUE_MAX = 10000
+
+# Insert attempts per batch before its notifications are written one by one
+NOTIFICATION_BATCH_ATTEMPTS = 3
+
 
 @dataclass
 class NotificationPayload:
@@ -40,12 +47,59 @@ class NotificationPayload:
     delivery_channels: Optional[List[str]] = None
 
 
+def _notification_row(notification_id: str, payload: NotificationPayload) -> Dict[str, Any]:
+    """Column values for a new notification."""
+    return {
+        "id": notification_id,
+        "user_identifier": payload.user_identifier,
+        "team_id": payload.team_id,
+        "notification_type": payload.notification_type,
+        "title": payload.title,
+        "content": payload.content,
+        "source_type": payload.source_type,
+        "source_id": payload.source_id,
+        "source_url": payload.source_url,
+        "related_change": payload.related_change or {},
+        "affected_files": payload.affected_files or [],
+        "priority": payload.priority,
+        "delivery_channels": payload.delivery_channels or ["slack", "web"],
+        "created_at": datetime.utcnow(),
+    }
+
+
+def _wants_slack(payload: NotificationPayload) -> bool:
+    return payload.delivery_channels is None or "slack" in payload.delivery_channels
+
+
 class NotificationService:
     """
     Service for creating and delivering notifications.
+    
+    create_notification() writes and delivers inline; enqueue() hands the
+    notification to a background task that inserts queued notifications
+    in batches, one statement each, then delivers them. A batch that keeps
+    failing is retried row by row so one bad notification cannot drop the
+    rest.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_batch_size: int = 64,
+        max_wait: float = 0.05,
+        max_queue_size: int = NOTIFICATION_QUEUE_MAX
+    ):
+        """
+        Args:
+            max_batch_size: Maximum notifications inserted in one statement
+            max_wait: Seconds to wait for more notifications after the first arrives
+            max_queue_size: Notifications buffered before enqueue() waits
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue[Tuple[str, NotificationPayload]] = asyncio.Queue(
+            maxsize=max_queue_size
+        )
+        self._worker: Optional[asyncio.Task] = None
         self._slack_client = None
 
     @property
@@ -72,23 +126,7 @@ class NotificationService:
         notification_id = str(uuid.uuid4())
         
         async with get_session() as session:
-            notification = Notification(
-                id=notification_id,
-                user_identifier=payload.user_identifier,
-                team_id=payload.team_id,
-                notification_type=payload.notification_type,
-                title=payload.title,
-                content=payload.content,
-                source_type=payload.source_type,
-                source_id=payload.source_id,
-                source_url=payload.source_url,
-                related_change=payload.related_change or {},
-                affected_files=payload.affected_files or [],
-                priority=payload.priority,
-                delivery_channels=payload.delivery_channels or ["slack", "web"],
-                created_at=datetime.utcnow()
-            )
-            session.add(notification)
+            session.add(Notification(**_notification_row(notification_id, payload)))
             
             logger.info(
                 "Notification created",
@@ -98,11 +136,128 @@ class NotificationService:
             )
 
         # Attempt to deliver via Slack
-        if payload.delivery_channels is None or "slack" in payload.delivery_channels:
+        if _wants_slack(payload):
             await self._deliver_slack(notification_id, payload)
 
         return notification_id
 
+    async def enqueue(self, payload: NotificationPayload) -> str:
+        """
+        Queue a notification and return without waiting for it.
+        
+        The row is written and delivered shortly afterwards by the
+        background worker; call drain() to wait for it.
+        
+        Returns:
+            Notification ID
+        """
+        notification_id = str(uuid.uuid4())
+        
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        
+        await self._queue.put((notification_id, payload))
+        return notification_id
+
+    async def create_notifications_bulk(
+        self,
+        notifications: List[Tuple[str, NotificationPayload]]
+    ) -> None:
+        """Insert (id, payload) pairs in one statement, then deliver them."""
+        await self._insert_notifications(notifications)
+        logger.info("Notifications created", count=len(notifications))
+        await self._deliver_all(notifications)
+
+    async def _insert_notifications(
+        self,
+        notifications: List[Tuple[str, NotificationPayload]]
+    ) -> None:
+        async with get_session() as session:
+            await session.execute(
+                insert(Notification),
+                [_notification_row(notification_id, payload) for notification_id, payload in notifications]
+            )
+
+    async def _deliver_all(
+        self,
+        notifications: List[Tuple[str, NotificationPayload]]
+    ) -> None:
+        await asyncio.gather(*(
+            self._deliver_slack(notification_id, payload)
+            for notification_id, payload in notifications
+            if _wants_slack(payload)
+        ))
+
+    async def drain(self) -> None:
+        """Wait until every queued notification has been written and delivered."""
+        if self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def _next_batch(self) -> List[Tuple[str, NotificationPayload]]:
+        """Wait for one notification, then collect more until full or max_wait passes."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+
+    async def _write_batch(
+        self,
+        batch: List[Tuple[str, NotificationPayload]]
+    ) -> List[Tuple[str, NotificationPayload]]:
+        """Insert a batch with retries; returns the notifications that were written."""
+        for attempt in range(NOTIFICATION_BATCH_ATTEMPTS):
+            try:
+                await self._insert_notifications(batch)
+                return batch
+            except Exception as e:
+                logger.warning(
+                    "Notification batch insert failed",
+                    error=str(e),
+                    size=len(batch),
+                    attempt=attempt + 1
+                )
+                if attempt + 1 < NOTIFICATION_BATCH_ATTEMPTS:
+                    await asyncio.sleep(0.1 * 2 ** attempt)
+        
+        written = []
+        for notification in batch:
+            try:
+                await self._insert_notifications([notification])
+                written.append(notification)
+            except Exception as e:
+                logger.error(
+                    "Notification dropped",
+                    notification_id=notification[0],
+                    user=notification[1].user_identifier,
+                    error=str(e)
+                )
+        return written
+
+    async def _run(self):
+        """Create queued notifications in batches."""
+        while True:
+            batch = await self._next_batch()
+            try:
+                written = await self._write_batch(batch)
+                if written:
+                    logger.info("Notifications created", count=len(written))
+                    await self._deliver_all(written)
+            except Exception as e:
+                logger.error("Notification batch failed", error=str(e), size=len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
     async def create_change_impact_notifications(
         self,
         team_id: str,
@@ -1,4 +1,9 @@
-from .qdrant_client import VectorStore, vector_store
+from .qdrant_client import VectorStore, SearchHit, vector_store
 from .embeddings import EmbeddingService, embedding_service
+from .batcher import InsertBatcher, insert_batcher
 
-__all__ = ["VectorStore", "vector_store", "EmbeddingService", "embedding_service"]
+__all__ = [
+    "VectorStore", "SearchHit", "vector_store",
+    "EmbeddingService", "embedding_service",
+    "InsertBatcher", "insert_batcher",
+]
@@ -0,0 +1,116 @@
+"""
+Insert Batcher
+
+Groups knowledge entries (e.g. Slack /remember) into batches and stores
+them with a two-stage pipeline: while batch N is being upserted into
+Qdrant, batch N+1 is already being embedded.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.vectors.embeddings import embedding_service
+from src.vectors.qdrant_client import vector_store
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+_PendingEntry = Tuple[Dict[str, Any], asyncio.Future]
+
+
+class InsertBatcher:
+    """Batches knowledge entries and pipelines embedding with vector inserts."""
+
+    def __init__(self, max_batch_size: int = 16, max_wait: float = 0.05):
+        """
+        Args:
+            max_batch_size: Maximum entries embedded in one request
+            max_wait: Seconds to wait for more entries after the first arrives
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue[_PendingEntry] = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, payload: Dict[str, Any]) -> None:
+        """
+        Queue an entry for storage and wait until it has been inserted.
+
+        Args:
+            payload: Vector payload; its "content" field is embedded
+
+        Raises:
+            Exception: Whatever the embedding or insert step raised for the
+                batch this entry was part of
+        """
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, future))
+        await future
+
+    async def _next_batch(self) -> List[_PendingEntry]:
+        """Wait for one entry, then collect more until full or max_wait passes."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """Embed batches back to back, overlapping each insert with the next embed."""
+        insert_task: Optional[asyncio.Task] = None
+
+        while True:
+            batch = await self._next_batch()
+
+            try:
+                embeddings = await embedding_service.embed(
+                    [payload["content"] for payload, _ in batch]
+                )
+            except Exception as e:
+                logger.error("Batch embedding failed", error=str(e), size=len(batch))
+                self._resolve(batch, e)
+                continue
+
+            # Keep at most one insert in flight so memory stays bounded
+            if insert_task is not None:
+                await insert_task
+            insert_task = asyncio.create_task(self._insert(batch, embeddings))
+
+    async def _insert(self, batch: List[_PendingEntry], embeddings: List[List[float]]):
+        """Upsert one embedded batch and resolve its waiters."""
+        try:
+            await vector_store.insert(
+                vectors=embeddings,
+                payloads=[payload for payload, _ in batch],
+            )
+        except Exception as e:
+            logger.error("Batch insert failed", error=str(e), size=len(batch))
+            self._resolve(batch, e)
+        else:
+            self._resolve(batch)
+
+    @staticmethod
+    def _resolve(batch: List[_PendingEntry], error: Optional[Exception] = None):
+        for _, future in batch:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+
+# Singleton instance
+insert_batcher = InsertBatcher()
@@ -1,10 +1,13 @@
+import asyncio
 import uuid
+from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance, VectorParams, PointStruct,
-    Filter, FieldCondition, MatchValue,
-    HnswConfigDiff
+    Filter, FieldCondition, MatchValue, Range,
+    HnswConfigDiff, ScalarQuantization, ScalarQuantizationConfig,
+    ScalarType, SearchParams, QuantizationSearchParams
 )
 from src.config.settings import get_settings
 from src.config.logging import get_logger
@@ -13,19 +16,38 @@ logger = get_logger(__name__)
 settings = get_settings()
 
 
+@dataclass(slots=True)
+class SearchHit:
+    """A search result with the commonly used payload fields unpacked."""
+    id: str
+    score: float
+    source: str
+    content: str
+    payload: Dict[str, Any]
+
+
+# Payload fields indexed in a new collection, with their Qdrant schema type
+DEFAULT_PAYLOAD_INDEXES = {"source": "keyword", "team_id": "keyword"}
+
+
 class VectorStore:
-    def __init__(self):
+    def __init__(
+        self,
+        collection_name: str = "supymem_knowledge",
+        payload_indexes: Optional[Dict[str, str]] = None
+    ):
         self.client = QdrantClient(
             url=settings.qdrant_url,
             api_key=settings.qdrant_api_key if settings.qdrant_api_key else None,
             prefer_grpc=True,
             timeout=60
         )
-        self.collection_name = "supymem_knowledge"
+        self.collection_name = collection_name
         self.vector_size = 768  # nomic-embed-text dimension
+        self.payload_indexes = payload_indexes or DEFAULT_PAYLOAD_INDEXES
 
     async def initialize(self):
-        """Create collection if it doesn't exist."""
+        """Create the collection if it doesn't exist, and its payload indexes."""
         if not self.client.collection_exists(self.collection_name):
             self.client.create_collection(
                 collection_name=self.collection_name,
@@ -37,19 +59,25 @@ class VectorStore:
                     m=16,
                     ef_construct=128,
                 ),
+                # int8 copies of the vectors are kept in RAM for search (4x
+                # smaller than float32); originals are only used for rescoring
+                quantization_config=ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(
+                        type=ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True,
+                    ),
+                ),
             )
-            # Create payload indexes
-            self.client.create_payload_index(
-                collection_name=self.collection_name,
-                field_name="source",
-                field_schema="keyword"
-            )
+            logger.info("Created Qdrant collection", collection=self.collection_name)
+        
+        # Idempotent, so collections created before an index was added get it too
+        for field_name, field_schema in self.payload_indexes.items():
             self.client.create_payload_index(
                 collection_name=self.collection_name,
-                field_name="team_id",
-                field_schema="keyword"
+                field_name=field_name,
+                field_schema=field_schema
             )
-            logger.info("Created Qdrant collection", collection=self.collection_name)
 
     async def insert(
         self,
@@ -65,7 +93,9 @@ class VectorStore:
             for id_, vec, payload in zip(ids, vectors, payloads)
         ]
 
-        self.client.upsert(
+        # The sync client blocks on the round trip; keep it off the event loop
+        await asyncio.to_thread(
+            self.client.upsert,
             collection_name=self.collection_name,
             points=points,
             wait=True
@@ -73,17 +103,19 @@ class VectorStore:
         logger.info("Inserted vectors", count=len(points))
         return True
 
-    async def search(
+    def _query(
         self,
         query_vector: List[float],
-        limit: int = 10,
-        filters: Optional[Dict[str, Any]] = None,
-        score_threshold: float = 0.5
-    ) -> List[Dict]:
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        score_threshold: float
+    ):
         query_filter = None
         if filters:
+            # Range values filter numerically; anything else must match exactly
             conditions = [
-                FieldCondition(key=k, match=MatchValue(value=v))
+                FieldCondition(key=k, range=v) if isinstance(v, Range)
+                else FieldCondition(key=k, match=MatchValue(value=v))
                 for k, v in filters.items()
             ]
             query_filter = Filter(must=conditions)
@@ -94,18 +126,52 @@ class VectorStore:
             limit=limit,
             query_filter=query_filter,
             score_threshold=score_threshold,
+            search_params=SearchParams(
+                quantization=QuantizationSearchParams(rescore=True)
+            ),
             with_payload=True
         )
+        return results.points
 
+    async def search(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: float = 0.5
+    ) -> List[Dict]:
+        # The sync client blocks on the round trip; keep it off the event loop
+        points = await asyncio.to_thread(self._query, query_vector, limit, filters, score_threshold)
         return [
             {
                 "id": hit.id,
                 "score": hit.score,
                 "payload": hit.payload
             }
-            for hit in results.points
+            for hit in points
         ]
 
+    async def search_hits(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: float = 0.5
+    ) -> List[SearchHit]:
+        """Same as search(), but returns SearchHit objects instead of dicts."""
+        points = await asyncio.to_thread(self._query, query_vector, limit, filters, score_threshold)
+        hits = []
+        for hit in points:
+            payload = hit.payload or {}
+            hits.append(SearchHit(
+                id=hit.id,
+                score=hit.score,
+                source=payload.get("source", "unknown"),
+                content=payload.get("content", ""),
+                payload=payload,
+            ))
+        return hits
+
 
 # Singleton instance
 vector_store = VectorStore()
@@ -8,15 +8,18 @@ Workers:
 - change_processor: Processes Git events (commits, PRs, etc.)
 - notification_worker: Sends notifications via Slack, etc.
 - task_monitor: Monitors task completion conditions
+- activity_writer: Persists activities queued with track_async()
 """
 
 from src.workers.change_processor import ChangeProcessorWorker
 from src.workers.notification_worker import NotificationWorker
 from src.workers.task_monitor import TaskMonitorWorker
+from src.workers.activity_writer import ActivityWriterWorker
 
 __all__ = [
     "ChangeProcessorWorker",
     "NotificationWorker", 
-    "TaskMonitorWorker"
+    "TaskMonitorWorker",
+    "ActivityWriterWorker"
 ]
 
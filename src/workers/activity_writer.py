@@ -0,0 +1,134 @@
+"""
+Activity Writer Worker
+
+Persists activities queued by ActivityTracker.track_async() from the
+activity Redis Stream.
+
+Features:
+- Reads up to 500 messages per XREADGROUP
+- One multi-row INSERT and one XACK per read
+- Idempotent: redelivered activities are skipped by primary key
+- Keeps the upcoming monthly user_activities partitions created
+"""
+
+import asyncio
+from typing import List
+
+from sqlalchemy.dialects.postgresql import insert
+
+from src.workers.base import BaseWorker
+from src.cache.redis_client import (
+    StreamMessage,
+    STREAM_ACTIVITY_EVENTS,
+    GROUP_ACTIVITY_WRITER,
+    cache
+)
+from src.database.session import get_session
+from src.database.models import UserActivity
+from src.services.analytics.activity import (
+    activity_row_from_stream,
+    activity_tracker,
+    ensure_activity_partitions
+)
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds between checks that the next months' partitions exist
+PARTITION_CHECK_INTERVAL = 6 * 3600
+
+
+class ActivityWriterWorker(BaseWorker):
+    """
+    Batches activity stream messages into user_activities inserts.
+    """
+
+    batch_size = 500
+
+    @property
+    def stream_name(self) -> str:
+        return STREAM_ACTIVITY_EVENTS
+
+    @property
+    def group_name(self) -> str:
+        return GROUP_ACTIVITY_WRITER
+
+    async def start(self):
+        """Start consuming, maintaining activity partitions alongside."""
+        maintenance = asyncio.create_task(self._maintain_partitions())
+        try:
+            await super().start()
+        finally:
+            maintenance.cancel()
+
+    async def _maintain_partitions(self):
+        while True:
+            try:
+                await ensure_activity_partitions()
+            except Exception as e:
+                logger.error(
+                    "Activity partition maintenance failed",
+                    worker_id=self.worker_id,
+                    error=str(e)
+                )
+            await asyncio.sleep(PARTITION_CHECK_INTERVAL)
+
+    async def process_message(self, message: StreamMessage) -> bool:
+        """
+        Insert a single activity.
+
+        Args:
+            message: StreamMessage whose payload is an activity row
+
+        Returns:
+            True once the row is stored
+        """
+        await self._insert([message])
+        return True
+
+    async def handle_batch(self, messages: List[StreamMessage]):
+        """Insert a whole read in one statement and ack it with one XACK."""
+        try:
+            await self._insert(messages)
+        except Exception as e:
+            # Retry row by row so one bad message cannot hold back the rest
+            logger.warning(
+                "Activity batch insert failed, retrying individually",
+                worker_id=self.worker_id,
+                size=len(messages),
+                error=str(e)
+            )
+            await super().handle_batch(messages)
+            return
+
+        await cache.stream_ack_many(
+            stream=self.stream_name,
+            group=self.group_name,
+            message_ids=[msg.message_id for msg in messages]
+        )
+        self._messages_processed += len(messages)
+
+        logger.debug(
+            "Activity batch written",
+            worker_id=self.worker_id,
+            size=len(messages)
+        )
+
+    async def _insert(self, messages: List[StreamMessage]):
+        rows = [activity_row_from_stream(msg.payload) for msg in messages]
+        async with get_session() as session:
+            await session.execute(
+                insert(UserActivity).on_conflict_do_nothing(),
+                rows
+            )
+        await activity_tracker.activity_written(rows)
+
+
+async def main():
+    """Run the activity writer worker."""
+    worker = ActivityWriterWorker()
+    await worker.start()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -13,7 +13,7 @@ import asyncio
 import signal
 import os
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 from src.cache.redis_client import (
@@ -33,8 +33,14 @@ class BaseWorker(ABC):
     - stream_name: The Redis stream to consume from
     - group_name: The consumer group name
     - process_message: Handler for each message
+    
+    Subclasses may override handle_batch to process a whole read at once,
+    and batch_size to read more messages per XREADGROUP.
     """
     
+    # Max messages per XREADGROUP
+    batch_size = 10
+    
     def __init__(self, worker_id: Optional[str] = None):
         self.worker_id = worker_id or f"{self.__class__.__name__}-{os.getpid()}"
         self._running = False
@@ -118,20 +124,20 @@ class BaseWorker(ABC):
                     count=5
                 )
                 
-                for msg in pending_messages:
-                    await self._handle_message(msg)
+                if pending_messages:
+                    await self.handle_batch(pending_messages)
                 
                 # Read new messages
                 messages = await cache.stream_read(
                     stream=self.stream_name,
                     group=self.group_name,
                     consumer=self.worker_id,
-                    count=10,
+                    count=self.batch_size,
                     block=5000  # 5 second block
                 )
                 
-                for msg in messages:
-                    await self._handle_message(msg)
+                if messages:
+                    await self.handle_batch(messages)
                     
             except asyncio.CancelledError:
                 break
@@ -144,7 +150,8 @@ class BaseWorker(ABC):
                 self._errors += 1
                 await asyncio.sleep(1)  # Brief pause before retry
         
-        # Cleanup
+        # Cleanup; buffered writes may fall back to Redis, so flush them first
+        await self._drain_buffered_writes()
         await cache.disconnect()
         logger.info(
             "Worker stopped",
@@ -153,6 +160,26 @@ class BaseWorker(ABC):
             errors=self._errors
         )
     
+    async def _drain_buffered_writes(self):
+        """Flush rows that services queued in-process during this worker's run."""
+        from src.services.analytics.activity import activity_tracker
+        from src.services.impact.notifications import notification_service
+        
+        try:
+            await notification_service.drain()
+            await activity_tracker.drain()
+        except Exception as e:
+            logger.error(
+                "Failed to drain buffered writes",
+                worker_id=self.worker_id,
+                error=str(e)
+            )
+    
+    async def handle_batch(self, messages: List[StreamMessage]):
+        """Handle the messages of one read; by default one at a time."""
+        for msg in messages:
+            await self._handle_message(msg)
+    
     async def _handle_message(self, message: StreamMessage):
         """Handle a single message with error handling."""
         try:
@@ -31,6 +31,13 @@ class MockResult:
     def scalars(self):
         return self
     
+    def mappings(self):
+        return self
+    
+    async def __aiter__(self):
+        for row in self.all():
+            yield row
+    
     def all(self):
         if isinstance(self._data, list):
             return self._data
@@ -54,6 +61,10 @@ class MockAsyncSession:
         """Mock execute - returns empty result by default."""
         return MockResult([])
     
+    async def stream(self, statement, *args, **kwargs):
+        """Mock stream - same results as execute, iterable with async for."""
+        return await self.execute(statement, *args, **kwargs)
+    
     def add(self, obj):
         """Add object to pending."""
         if not hasattr(obj, 'id') or obj.id is None:
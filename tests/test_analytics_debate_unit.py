@@ -35,17 +35,260 @@ class TestActivityTracker:
                 source="github",
                 source_id="abc123"
             )
+            await tracker.drain()
             
             assert len(mock_session._pending_adds) > 0 or len(mock_session._committed) > 0 or result is not None
 
+    @pytest.mark.asyncio
+    async def test_track_batches_rows_into_one_insert(self):
+        """Test that a burst of track() calls is written with one multi-row insert."""
+        from tests.fixtures.mock_db import MockAsyncSession, MockResult
+        
+        executed = []
+        mock_session = MockAsyncSession()
+        
+        async def mock_execute(statement, params=None, *args, **kwargs):
+            executed.append(params)
+            return MockResult([])
+        
+        mock_session.execute = mock_execute
+        
+        with patch('src.services.analytics.activity.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            from src.services.analytics.activity import ActivityTracker
+            tracker = ActivityTracker()
+            
+            ids = [
+                await tracker.track(
+                    activity_type="commit",
+                    user_identifier="user123",
+                    team_id="team1",
+                    title=f"Commit {i}",
+                    metadata={"n": i}
+                )
+                for i in range(5)
+            ]
+            await tracker.drain()
+        
+        assert len(executed) == 1
+        assert [row["id"] for row in executed[0]] == ids
+        assert executed[0][0]["extra_data"] == {"n": 0}
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried(self):
+        """Test that a batch insert that fails once is retried and written."""
+        from tests.fixtures.mock_db import MockAsyncSession, MockResult
+        
+        executed = []
+        mock_session = MockAsyncSession()
+        
+        async def mock_execute(statement, params=None, *args, **kwargs):
+            executed.append(params)
+            if len(executed) == 1:
+                raise RuntimeError("connection reset")
+            return MockResult([])
+        
+        mock_session.execute = mock_execute
+        
+        with patch('src.services.analytics.activity.get_session') as mock_get_session, \
+             patch('src.services.analytics.activity.asyncio.sleep', AsyncMock()), \
+             patch('src.services.analytics.activity.cache') as mock_cache:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            mock_cache.stream_add = AsyncMock()
+            
+            from src.services.analytics.activity import ActivityTracker
+            tracker = ActivityTracker()
+            
+            activity_id = await tracker.track(
+                activity_type="commit", user_identifier="u1", team_id="t1", title="x"
+            )
+            await tracker.drain()
+        
+        assert len(executed) == 2
+        assert executed[1][0]["id"] == activity_id
+        mock_cache.stream_add.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_batch_that_keeps_failing_goes_to_the_activity_stream(self):
+        """Test that an unwritable batch is handed to the activity writer's stream."""
+        from src.cache.redis_client import STREAM_ACTIVITY_EVENTS
+        from src.services.analytics.activity import (
+            ACTIVITY_BATCH_ATTEMPTS, ActivityTracker, activity_row_from_stream
+        )
+        
+        mock_session = AsyncMock()
+        mock_session.execute = AsyncMock(side_effect=RuntimeError("database down"))
+        
+        with patch('src.services.analytics.activity.get_session') as mock_get_session, \
+             patch('src.services.analytics.activity.asyncio.sleep', AsyncMock()), \
+             patch('src.services.analytics.activity.cache') as mock_cache:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            mock_cache.stream_add = AsyncMock()
+            
+            tracker = ActivityTracker()
+            activity_id = await tracker.track(
+                activity_type="commit", user_identifier="u1", team_id="t1", title="x"
+            )
+            await tracker.drain()
+        
+        assert mock_session.execute.await_count == ACTIVITY_BATCH_ATTEMPTS
+        mock_cache.stream_add.assert_awaited_once()
+        kwargs = mock_cache.stream_add.await_args.kwargs
+        assert kwargs["stream"] == STREAM_ACTIVITY_EVENTS
+        assert activity_row_from_stream(kwargs["payload"])["id"] == activity_id
+
+    @pytest.mark.asyncio
+    async def test_track_waits_when_the_queue_is_full(self):
+        """Test that track() applies backpressure instead of growing without bound."""
+        import asyncio
+        
+        from src.services.analytics.activity import ActivityTracker
+        
+        tracker = ActivityTracker(max_queue_size=1)
+        with patch.object(tracker, '_run', new=AsyncMock()):
+            await tracker.track(activity_type="commit", user_identifier="u1", team_id="t1", title="a")
+            second = asyncio.create_task(
+                tracker.track(activity_type="commit", user_identifier="u1", team_id="t1", title="b")
+            )
+            await asyncio.sleep(0)
+            assert not second.done()
+            
+            tracker._queue.get_nowait()
+            await asyncio.wait_for(second, 1)
+
+    @pytest.mark.asyncio
+    async def test_partitions_are_created_and_stranded_rows_moved(self):
+        """Test that existing partitions are skipped and default-partition rows are moved."""
+        from datetime import date
+        from src.services.analytics.activity import _ensure_activity_partition
+
+        session = MagicMock()
+        session.execute = AsyncMock()
+
+        # Already there: nothing is locked or created
+        session.scalar = AsyncMock(return_value=True)
+        await _ensure_activity_partition(session, date(2026, 11, 1), date(2026, 12, 1))
+        session.execute.assert_not_awaited()
+
+        # Missing, with November rows already in the default partition
+        session.scalar = AsyncMock(side_effect=[False, False, True])
+        await _ensure_activity_partition(session, date(2026, 11, 1), date(2026, 12, 1))
+        statements = [str(call.args[0]) for call in session.execute.await_args_list]
+
+        assert statements[0].startswith("LOCK TABLE user_activities")
+        assert statements[1].startswith("CREATE TABLE user_activities_p2026_11 (LIKE user_activities")
+        assert "DELETE FROM user_activities_default WHERE timestamp >= '2026-11-01'" in statements[2]
+        assert "INSERT INTO user_activities_p2026_11 SELECT * FROM moved" in statements[2]
+        assert statements[3] == (
+            "ALTER TABLE user_activities ATTACH PARTITION user_activities_p2026_11 "
+            "FOR VALUES FROM ('2026-11-01') TO ('2026-12-01')"
+        )
+
+    @pytest.mark.asyncio
+    async def test_track_commit_does_not_copy_columns_into_extra_data(self):
+        """Test that repo and sha live only in their columns."""
+        from src.services.analytics.activity import ActivityTracker
+        
+        tracker = ActivityTracker()
+        tracker.track = AsyncMock(return_value="id")
+        
+        await tracker.track_commit(
+            user_identifier="user123",
+            team_id="team1",
+            repo="org/repo",
+            commit_sha="abc123",
+            commit_message="Fix bug",
+            files=["a.py"]
+        )
+        
+        kwargs = tracker.track.await_args.kwargs
+        assert kwargs["related_repo"] == "org/repo"
+        assert kwargs["source_id"] == "abc123"
+        assert "metadata" not in kwargs
+
+    @pytest.mark.asyncio
+    async def test_bulk_load_copies_records(self):
+        """Test that bulk_load_activities() issues one COPY with JSON-encoded columns."""
+        from datetime import datetime
+        from src.services.analytics.activity import ActivityTracker, ActivityRecord
+        
+        driver = MagicMock()
+        driver.copy_records_to_table = AsyncMock()
+        conn = MagicMock()
+        conn.get_raw_connection = AsyncMock(return_value=MagicMock(driver_connection=driver))
+        session = MagicMock()
+        session.connection = AsyncMock(return_value=conn)
+        
+        records = [
+            ActivityRecord(
+                activity_type="commit",
+                user_identifier="user123",
+                team_id="team1",
+                title=f"Commit {i}",
+                description=None,
+                source="github",
+                source_id=f"sha{i}",
+                source_url=None,
+                related_files=["a.py", "b.py"],
+                metadata={"imported": True},
+                timestamp=datetime(2024, 1, i + 1)
+            )
+            for i in range(3)
+        ]
+        
+        tracker = ActivityTracker()
+        assert await tracker.bulk_load_activities(records, session=session) == 3
+        
+        driver.copy_records_to_table.assert_awaited_once()
+        call = driver.copy_records_to_table.await_args
+        assert call.args[0] == "user_activities"
+        row = dict(zip(call.kwargs["columns"], call.kwargs["records"][0]))
+        assert row["related_files"] == '["a.py","b.py"]'
+        assert row["extra_data"] == '{"imported":true}'
+        assert row["files_changed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_track_async_publishes_to_activity_stream(self):
+        """Test that track_async() appends a JSON-safe row to the activity stream."""
+        import json
+        from datetime import datetime
+        from src.cache.redis_client import STREAM_ACTIVITY_EVENTS
+        from src.services.analytics.activity import ActivityTracker, activity_row_from_stream
+        
+        with patch('src.services.analytics.activity.cache') as mock_cache:
+            mock_cache.client = MagicMock()
+            mock_cache.stream_add = AsyncMock(return_value="1-0")
+            
+            tracker = ActivityTracker()
+            activity_id = await tracker.track_async(
+                activity_type="pr_review",
+                user_identifier="user123",
+                team_id="team1",
+                title="Reviewed PR #7",
+                timestamp=datetime(2024, 5, 1, 12, 0)
+            )
+        
+        kwargs = mock_cache.stream_add.await_args.kwargs
+        assert kwargs["stream"] == STREAM_ACTIVITY_EVENTS
+        payload = json.loads(json.dumps(kwargs["payload"]))
+        assert payload["id"] == activity_id
+        assert activity_row_from_stream(payload)["timestamp"] == datetime(2024, 5, 1, 12, 0)
+        assert tracker._worker is None
+
     @pytest.mark.asyncio
     async def test_get_user_activities(self):
         """Test getting activities for a user."""
         from tests.fixtures.mock_db import MockAsyncSession, MockResult
         
+        from datetime import datetime
+        
         mock_activities = [
-            MagicMock(id="a1", activity_type="commit", title="Commit 1"),
-            MagicMock(id="a2", activity_type="pr_review", title="Review 1"),
+            {"id": "a1", "type": "commit", "title": "Commit 1", "timestamp": datetime(2024, 1, 2)},
+            {"id": "a2", "type": "pr_review", "title": "Review 1", "timestamp": datetime(2024, 1, 1)},
         ]
         
         mock_session = MockAsyncSession()
@@ -65,15 +308,20 @@ class TestActivityTracker:
             result = await tracker.get_user_activities("user123", "team1", limit=10)
             
             assert isinstance(result, list)
+            assert result[0] == {
+                "id": "a1", "type": "commit", "title": "Commit 1", "timestamp": "2024-01-02T00:00:00"
+            }
 
     @pytest.mark.asyncio
     async def test_get_team_activities(self):
         """Test getting activities for a team."""
         from tests.fixtures.mock_db import MockAsyncSession, MockResult
         
+        from datetime import datetime
+        
         mock_activities = [
-            MagicMock(id="a1", user_identifier="user1", activity_type="commit"),
-            MagicMock(id="a2", user_identifier="user2", activity_type="task_completed"),
+            {"id": "a1", "user": "user1", "type": "commit", "timestamp": datetime(2024, 1, 2)},
+            {"id": "a2", "user": "user2", "type": "task_completed", "timestamp": datetime(2024, 1, 1)},
         ]
         
         mock_session = MockAsyncSession()
@@ -94,6 +342,150 @@ class TestActivityTracker:
             
             assert isinstance(result, list)
 
+    @pytest.mark.asyncio
+    async def test_team_activities_cursor_is_keyset_predicate(self):
+        """Test that a cursor becomes a (timestamp, id) row comparison, not an offset."""
+        from datetime import datetime
+        from sqlalchemy.dialects import postgresql
+        from tests.fixtures.mock_db import MockAsyncSession, MockResult
+        
+        statements = []
+        mock_session = MockAsyncSession()
+        
+        async def mock_execute(statement, *args, **kwargs):
+            statements.append(statement)
+            return MockResult([])
+        
+        mock_session.execute = mock_execute
+        
+        with patch('src.services.analytics.activity.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            from src.services.analytics.activity import ActivityTracker
+            tracker = ActivityTracker()
+            
+            await tracker.get_team_activities(
+                "team1", limit=20, cursor=(datetime(2024, 1, 1), "a1")
+            )
+        
+        sql = str(statements[0].compile(dialect=postgresql.dialect()))
+        assert "(user_activities.timestamp, user_activities.id) < (" in sql
+        assert "OFFSET" not in sql
+        assert "ORDER BY user_activities.timestamp DESC, user_activities.id DESC" in sql
+
+    @pytest.mark.asyncio
+    async def test_activity_summary_single_query(self):
+        """Test that counts and totals come from one grouped query."""
+        from types import SimpleNamespace
+        from tests.fixtures.mock_db import MockAsyncSession, MockResult
+        
+        rows = [
+            SimpleNamespace(activity_type="commit", count=3, added=120, removed=30, files=7),
+            SimpleNamespace(activity_type="pr_review", count=2, added=None, removed=None, files=None),
+        ]
+        executed = []
+        mock_session = MockAsyncSession()
+        
+        async def mock_execute(statement, *args, **kwargs):
+            executed.append(statement)
+            return MockResult(rows)
+        
+        mock_session.execute = mock_execute
+        
+        with patch('src.services.analytics.activity.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            from src.services.analytics.activity import ActivityTracker
+            tracker = ActivityTracker()
+            
+            summary = await tracker.get_activity_summary("user123", "team1", days=7)
+        
+        assert len(executed) == 1
+        assert summary["activity_counts"] == {"commit": 3, "pr_review": 2}
+        assert summary["total_lines_added"] == 120
+        assert summary["total_lines_removed"] == 30
+        assert summary["total_files_changed"] == 7
+        assert summary["total_activities"] == 5
+
+    @pytest.mark.asyncio
+    async def test_activity_summary_is_cached_until_tracked(self):
+        """Test that repeated summaries hit the cache until a tracked row is written."""
+        import asyncio
+        
+        from src.services.analytics.activity import ActivityTracker
+        
+        tracker = ActivityTracker()
+        query = AsyncMock(return_value={"total_activities": 1})
+        tracker._query_activity_summary = query
+        
+        results = await asyncio.gather(*[tracker.get_activity_summary("u1", "t1") for _ in range(3)])
+        await tracker.get_activity_summary("u1", "t1")
+        assert results == [{"total_activities": 1}] * 3
+        assert query.await_count == 1
+        
+        with patch('src.services.analytics.activity.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=AsyncMock())
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            with patch.object(tracker, '_run', new=AsyncMock()):
+                await tracker.track(activity_type="commit", user_identifier="u1", team_id="t1", title="x")
+            # Queued but not yet written: the cached summary still stands
+            await tracker.get_activity_summary("u1", "t1")
+            assert query.await_count == 1
+            
+            await tracker._write_batch([tracker._queue.get_nowait()])
+        await tracker.get_activity_summary("u1", "t1")
+        assert query.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_completed_task_check_filters_in_sql(self):
+        """Test that keyword and task-type matching is an EXISTS query."""
+        from sqlalchemy.dialects import postgresql
+        from tests.fixtures.mock_db import MockAsyncSession
+        
+        statements = []
+        mock_session = MockAsyncSession()
+        
+        async def mock_scalar(statement, *args, **kwargs):
+            statements.append(statement)
+            return True
+        
+        mock_session.scalar = mock_scalar
+        
+        with patch('src.services.analytics.activity.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            from src.services.analytics.activity import ActivityTracker
+            tracker = ActivityTracker()
+            
+            found = await tracker.check_user_completed_task_type(
+                "user123", "team1", task_type="deploy", task_keywords=["50%"]
+            )
+        
+        sql = str(statements[0].compile(dialect=postgresql.dialect()))
+        assert found is True
+        assert "EXISTS" in sql
+        assert "ILIKE" in sql
+        assert "->>" in sql
+
+    def test_activity_ids_are_time_ordered_uuid7(self):
+        """Test that activity ids are version-7 UUIDs that sort by creation time."""
+        import time
+        import uuid
+        from src.database.models import uuid7
+        
+        first = uuid7()
+        time.sleep(0.002)
+        second = uuid7()
+        
+        assert uuid.UUID(first).version == 7
+        assert uuid.UUID(first).variant == uuid.RFC_4122
+        assert str(uuid.UUID(first)) == first
+        assert first < second
+
 
 class TestProductivityAnalytics:
     """Tests for the ProductivityAnalytics service."""
@@ -113,6 +505,457 @@ class TestProductivityAnalytics:
         assert hasattr(analytics, 'get_user_productivity')
         assert hasattr(analytics, 'get_team_productivity')
 
+    @pytest.mark.asyncio
+    async def test_user_productivity_runs_queries_concurrently(self):
+        """Test that the per-user sub-queries overlap instead of running one by one."""
+        import asyncio
+        from datetime import date
+        from tests.fixtures.mock_db import MockAsyncSession
+        from src.services.analytics.productivity import ProductivityAnalytics
+        
+        analytics = ProductivityAnalytics()
+        running = 0
+        peak = 0
+        
+        def query(value):
+            async def run(session, *args):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                return value
+            return run
+        
+        analytics._rollup_activity = query((
+            {"commit": 2, "pr_review": 2},
+            {"lines_added": 100, "lines_removed": 100, "files_changed": 3},
+            {date(2024, 4, 29): 1, date(2024, 4, 30): 3}
+        ))
+        analytics._count_knowledge_entries = query(1)
+        analytics._count_decisions = query(0)
+        analytics._calculate_trend = query("stable")
+        
+        with patch('src.services.analytics.productivity.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=MockAsyncSession())
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            summary = await analytics.get_user_productivity("alice", "team1")
+        
+        assert peak == 4
+        assert summary.commits == 2
+        assert summary.prs_reviewed == 2
+        assert summary.files_changed == 3
+        assert summary.productivity_score == 7.0
+        assert summary.most_active_day == "Tuesday"
+
+    @pytest.mark.asyncio
+    async def test_activity_counts_and_code_metrics_share_a_query(self):
+        """Test that per-type counts and code totals come from one grouped query."""
+        from datetime import datetime
+        from tests.fixtures.mock_db import MockAsyncSession, MockResult
+        from src.services.analytics.productivity import ProductivityAnalytics
+        
+        mock_session = MockAsyncSession()
+        mock_session.execute = AsyncMock(return_value=MockResult([
+            ("commit", 2, 40, 10, 3),
+            ("pr_review", 1, None, None, None),
+        ]))
+        
+        counts, code = await ProductivityAnalytics()._fetch_activity_and_code(
+            mock_session, "alice", "team1", datetime(2024, 5, 1), datetime(2024, 5, 8)
+        )
+        
+        mock_session.execute.assert_awaited_once()
+        assert counts == {"commit": 2, "pr_review": 1}
+        assert code == {"lines_added": 40, "lines_removed": 10, "files_changed": 3}
+
+    @pytest.mark.asyncio
+    async def test_trend_counts_both_periods_in_one_query(self):
+        """Test that the trend compares periods using FILTERed counts of a single query."""
+        from sqlalchemy.dialects import postgresql
+        from src.services.analytics.productivity import ProductivityAnalytics
+        
+        result = MagicMock()
+        result.one.return_value = (12, 10)
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=result)
+        
+        analytics = ProductivityAnalytics()
+        assert await analytics._calculate_trend(session, "alice", "team1", 7) == "increasing"
+        
+        session.execute.assert_awaited_once()
+        sql = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.count("FILTER (WHERE") == 2
+        assert "user_activities.timestamp <= %(timestamp_" in sql
+
+    @pytest.mark.asyncio
+    async def test_rollup_reads_snapshots_and_only_aggregates_uncovered_days(self):
+        """Test that past days come from snapshots and raw activity starts at the first gap."""
+        from datetime import date, datetime
+        from tests.fixtures.mock_db import MockResult
+        from src.services.analytics.productivity import ProductivityAnalytics
+        
+        taken = datetime(2024, 5, 10)
+        snapshots = MockResult([
+            (date(2024, 5, 1), {"activity_counts": {"commit": 1}}, 10, 0, 1, taken),
+            (date(2024, 5, 2), {"activity_counts": {"commit": 4, "pr_review": 1}}, 50, 5, 3, taken),
+        ])
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=snapshots)
+        
+        analytics = ProductivityAnalytics()
+        analytics._daily_breakdown_raw = AsyncMock(return_value=[
+            (date(2024, 5, 3), "commit", 2, 20, 0, 2),
+        ])
+        
+        counts, code, per_day = await analytics._rollup_activity(
+            session, "alice", "team1", date(2024, 5, 1), date(2024, 5, 3)
+        )
+        
+        assert analytics._daily_breakdown_raw.await_args.args[3:] == (date(2024, 5, 3), date(2024, 5, 3))
+        assert counts == {"commit": 7, "pr_review": 1}
+        assert code == {"lines_added": 80, "lines_removed": 5, "files_changed": 6}
+        assert per_day == {date(2024, 5, 1): 1, date(2024, 5, 2): 5, date(2024, 5, 3): 2}
+
+    @pytest.mark.asyncio
+    async def test_rollup_ignores_snapshots_taken_before_the_day_settled(self):
+        """Test that a snapshot that may have missed late activity is re-aggregated from raw rows."""
+        from datetime import date, datetime
+        from tests.fixtures.mock_db import MockResult
+        from src.services.analytics.productivity import ProductivityAnalytics, SNAPSHOT_SETTLE_DAYS
+        
+        settled = datetime(2024, 5, 2 + SNAPSHOT_SETTLE_DAYS)
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=MockResult([
+            (date(2024, 5, 1), {"activity_counts": {"commit": 1}}, 10, 0, 1, settled),
+            (date(2024, 5, 2), {"activity_counts": {"commit": 1}}, 10, 0, 1, datetime(2024, 5, 3, 0, 5)),
+        ]))
+        
+        analytics = ProductivityAnalytics()
+        analytics._daily_breakdown_raw = AsyncMock(return_value=[
+            (date(2024, 5, 2), "commit", 3, 30, 0, 3),
+        ])
+        
+        counts, _, per_day = await analytics._rollup_activity(
+            session, "alice", "team1", date(2024, 5, 1), date(2024, 5, 3)
+        )
+        
+        assert analytics._daily_breakdown_raw.await_args.args[3] == date(2024, 5, 2)
+        assert counts == {"commit": 4}
+        assert per_day == {date(2024, 5, 1): 1, date(2024, 5, 2): 3}
+
+    @pytest.mark.asyncio
+    async def test_daily_breakdown_bounds_raw_timestamp_for_partition_pruning(self):
+        """Test that the date-grouped query also constrains the partition key itself."""
+        from datetime import date
+        from sqlalchemy.dialects import postgresql
+        from tests.fixtures.mock_db import MockResult
+        from src.services.analytics.productivity import ProductivityAnalytics
+        
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=MockResult([]))
+        
+        await ProductivityAnalytics()._daily_breakdown_raw(
+            session, "alice", "team1", date(2024, 5, 1), date(2024, 5, 7)
+        )
+        
+        sql = str(session.execute.await_args.args[0].compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        ))
+        assert "user_activities.timestamp >= '2024-05-01 00:00:00'" in sql
+        assert "user_activities.timestamp < '2024-05-08 00:00:00'" in sql
+
+    @pytest.mark.asyncio
+    async def test_team_snapshots_use_one_query_and_one_insert(self):
+        """Test that team snapshots are built from one grouped query and a multi-row insert."""
+        from datetime import date
+        from tests.fixtures.mock_db import MockAsyncSession, MockResult
+        
+        executed = []
+        mock_session = MockAsyncSession()
+        
+        async def mock_execute(statement, params=None, *args, **kwargs):
+            executed.append(params)
+            if params is None:
+                return MockResult([
+                    ("alice", "commit", 2, 100, 0, 3),
+                    ("bob", "task_completed", 1, None, None, None),
+                ])
+            return MockResult([])
+        
+        mock_session.execute = mock_execute
+        
+        with patch('src.services.analytics.productivity.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            from src.services.analytics.productivity import ProductivityAnalytics
+            count = await ProductivityAnalytics().generate_daily_snapshots_for_team(
+                "team1", date(2024, 5, 1)
+            )
+        
+        assert count == 2
+        assert len(executed) == 2
+        rows = {row["user_identifier"]: row for row in executed[1]}
+        assert rows["alice"]["commits_count"] == 2
+        assert "productivity_score" not in rows["alice"]
+        assert rows["bob"]["tasks_completed"] == 1
+        assert rows["bob"]["snapshot_date"] == date(2024, 5, 1)
+
+    def test_generated_score_matches_calculate_score(self):
+        """Test that the database-generated snapshot score equals _calculate_score."""
+        from datetime import date
+        from sqlalchemy import create_engine, insert, select
+        from src.database.models import ProductivitySnapshot
+        from src.services.analytics.productivity import ProductivityAnalytics
+        
+        analytics = ProductivityAnalytics()
+        counts = {"commit": 3, "pr_merged": 1, "task_created": 2, "decision": 1, "query": 4}
+        code = {"lines_added": 230, "lines_removed": 40, "files_changed": 5}
+        
+        engine = create_engine("sqlite://")
+        ProductivitySnapshot.__table__.create(engine)
+        with engine.begin() as conn:
+            conn.execute(
+                insert(ProductivitySnapshot),
+                [analytics._snapshot_row("s1", "alice", "team1", date(2024, 5, 1), counts, code)]
+            )
+            score = conn.execute(select(ProductivitySnapshot.productivity_score)).scalar_one()
+        
+        assert score == analytics._calculate_score(counts, code) == 18.35
+
+    def test_score_migration_matches_model_weights(self):
+        """Test that the migration's frozen score SQL is what the model builds from the weights."""
+        import ast
+        from pathlib import Path
+        from src.database.models import ProductivitySnapshot, productivity_score_sql
+        
+        migration = (
+            Path(__file__).resolve().parents[1]
+            / "src/db/migrations/versions/a3d8f5b1c7e2_generate_snapshot_productivity_score.py"
+        )
+        frozen = next(
+            ast.literal_eval(node.value)
+            for node in ast.parse(migration.read_text()).body
+            if isinstance(node, ast.Assign) and node.targets[0].id == "SCORE_EXPRESSION"
+        )
+        
+        assert frozen == productivity_score_sql()
+        assert ProductivitySnapshot.__table__.c.productivity_score.computed.sqltext.text == frozen
+
+    @pytest.mark.asyncio
+    async def test_daily_snapshot_is_a_core_insert(self):
+        """Test that a user snapshot is inserted without building an ORM object."""
+        from datetime import date
+        from sqlalchemy.sql.dml import Insert
+        from tests.fixtures.mock_db import MockAsyncSession, MockResult
+        
+        executed = []
+        mock_session = MockAsyncSession()
+        
+        async def mock_execute(statement, *args, **kwargs):
+            executed.append(statement)
+            if isinstance(statement, Insert):
+                return MockResult([2.5])
+            return MockResult([("commit", 2, 100, 0, 3)])
+        
+        mock_session.execute = mock_execute
+        
+        with patch('src.services.analytics.productivity.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            from src.services.analytics.productivity import ProductivityAnalytics
+            snapshot_id = await ProductivityAnalytics().generate_daily_snapshot(
+                "alice", "team1", date(2024, 5, 1)
+            )
+        
+        insert_stmt = executed[-1]
+        params = insert_stmt.compile().params
+        assert isinstance(insert_stmt, Insert)
+        assert params["id"] == snapshot_id
+        assert params["commits_count"] == 2
+        assert "productivity_score" not in params
+        assert mock_session._pending_adds == []
+
+    @pytest.mark.asyncio
+    async def test_daily_breakdown_streams_snapshot_columns(self):
+        """Test that the breakdown is built from streamed column tuples."""
+        from datetime import date
+        from tests.fixtures.mock_db import MockAsyncSession, MockResult
+        
+        streamed = []
+        mock_session = MockAsyncSession()
+        
+        async def mock_stream(statement, *args, **kwargs):
+            streamed.append(statement)
+            return MockResult([(date(2024, 5, 1), 3, 1, 0, 2, 120, 9.5)])
+        
+        mock_session.stream = mock_stream
+        
+        with patch('src.services.analytics.productivity.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            from src.services.analytics.productivity import ProductivityAnalytics
+            breakdown = await ProductivityAnalytics().get_daily_breakdown("alice", "team1")
+        
+        assert streamed[0].get_execution_options()["yield_per"] == 100
+        assert breakdown == [{
+            "date": "2024-05-01",
+            "commits": 3,
+            "prs_opened": 1,
+            "prs_merged": 0,
+            "tasks_completed": 2,
+            "lines_added": 120,
+            "productivity_score": 9.5
+        }]
+
+    @pytest.mark.asyncio
+    async def test_productivity_is_cached_until_team_activity_is_written(self):
+        """Test that repeated polls reuse the result until the team's activity is stored."""
+        from src.services.analytics.productivity import ProductivityAnalytics
+        from src.services.analytics.activity import ActivityTracker
+        import src.services.analytics.activity as activity_module
+        
+        analytics = ProductivityAnalytics()
+        analytics._compute_team_productivity = AsyncMock(return_value={"team_id": "team1"})
+        
+        with patch.object(activity_module, 'productivity_analytics', analytics), \
+             patch('src.services.analytics.activity.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=AsyncMock())
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            await analytics.get_team_productivity("team1", days=7)
+            await analytics.get_team_productivity("team1", days=7)
+            assert analytics._compute_team_productivity.await_count == 1
+            
+            tracker = ActivityTracker()
+            await tracker.track(
+                activity_type="commit", user_identifier="alice", team_id="team1", title="Fix"
+            )
+            await tracker.drain()
+            await analytics.get_team_productivity("team1", days=7)
+        
+        assert analytics._compute_team_productivity.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_productivity_cache_follows_other_processes_writes(self):
+        """Test that a revision bumped elsewhere (e.g. by the writer worker) forces a recompute."""
+        from src.services.analytics.productivity import ProductivityAnalytics
+        
+        analytics = ProductivityAnalytics()
+        analytics._compute_team_productivity = AsyncMock(return_value={"team_id": "team1"})
+        revisions = {"productivity:rev:team1": 4}
+        
+        with patch('src.services.analytics.productivity.cache') as mock_cache:
+            mock_cache.get = AsyncMock(side_effect=lambda key: revisions.get(key))
+            
+            await analytics.get_team_productivity("team1", days=7)
+            await analytics.get_team_productivity("team1", days=7)
+            assert analytics._compute_team_productivity.await_count == 1
+            
+            revisions["productivity:rev:team1"] = 5
+            await analytics.get_team_productivity("team1", days=7)
+        
+        assert analytics._compute_team_productivity.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_productivity_cache_keys_per_team_are_bounded(self):
+        """Test that one team's (user, days, day) keys can't grow without limit."""
+        import src.services.analytics.productivity as productivity_module
+        from src.services.analytics.productivity import ProductivityAnalytics
+        
+        analytics = ProductivityAnalytics()
+        analytics._compute_team_productivity = AsyncMock(return_value={})
+        
+        with patch.object(productivity_module, 'PRODUCTIVITY_CACHE_MAX_KEYS_PER_TEAM', 3):
+            for days in range(1, 6):
+                await analytics.get_team_productivity("team1", days=days)
+        
+        assert [key[1] for key in analytics._cache["team1"]] == [3, 4, 5]
+
+    @pytest.mark.asyncio
+    async def test_productivity_json_is_encoded_once_per_cache_entry(self):
+        """Test that cached summaries are served as the same pre-encoded body."""
+        from datetime import date
+        from src.api.routes.analytics import UserProductivity
+        from src.services.analytics.productivity import (
+            ProductivityAnalytics, UserProductivitySummary
+        )
+        import src.services.analytics.productivity as productivity_module
+        
+        summary = UserProductivitySummary(
+            user_identifier="alice", period_start=date(2024, 5, 1), period_end=date(2024, 5, 8),
+            commits=3, prs_opened=1, prs_merged=1, prs_reviewed=0, tasks_completed=2,
+            tasks_created=0, lines_added=120, lines_removed=4, files_changed=6,
+            knowledge_entries=1, decisions_made=0, productivity_score=17.62,
+            activity_trend="stable", most_active_day="Monday"
+        )
+        analytics = ProductivityAnalytics()
+        analytics._compute_user_productivity = AsyncMock(return_value=summary)
+        
+        with patch.object(productivity_module.orjson, 'dumps', wraps=productivity_module.orjson.dumps) as dumps:
+            first = await analytics.get_user_productivity_json("alice", "team1")
+            second = await analytics.get_user_productivity_json("alice", "team1")
+        
+        assert first is second
+        assert dumps.call_count == 1
+        assert analytics._compute_user_productivity.await_count == 1
+        assert UserProductivity.model_validate_json(first).period_start == "2024-05-01"
+
+    @pytest.mark.asyncio
+    async def test_team_productivity_ranks_and_totals_in_sql(self):
+        """Test that the leaderboard, its order and the totals come from one CTE query."""
+        from decimal import Decimal
+        from sqlalchemy.dialects import postgresql
+        from tests.fixtures.mock_db import MockAsyncSession, MockResult
+        
+        statements = []
+        totals = (3, Decimal(5), Decimal(1), Decimal(0), Decimal(40), Decimal("3.4"))
+        results = [
+            MockResult([
+                ("alice", Decimal("8.20"), 3, 1, 0, 30) + totals,
+                ("bob", Decimal("1.02"), 1, 0, 0, 5) + totals,
+            ]),
+            MockResult([("alice", 4, 2), ("bob", 1, 1)]),
+        ]
+        mock_session = MockAsyncSession()
+        
+        async def mock_execute(statement, *args, **kwargs):
+            statements.append(statement)
+            return results[len(statements) - 1]
+        
+        mock_session.execute = mock_execute
+        
+        with patch('src.services.analytics.productivity.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            from src.services.analytics.productivity import ProductivityAnalytics
+            team = await ProductivityAnalytics().get_team_productivity("team1", days=7)
+        
+        sql = str(statements[0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("WITH agg AS")
+        assert "ORDER BY agg.score DESC" in sql and "LIMIT" in sql
+        assert len(statements) == 2
+        assert team["active_users"] == 3
+        alice, bob = team["user_rankings"]
+        assert alice["user"] == "alice" and alice["trend"] == "increasing"
+        assert alice["commits"] == 3 and alice["prs_merged"] == 1
+        assert alice["lines_added"] == 30
+        assert alice["productivity_score"] == 8.2
+        assert bob["productivity_score"] == 1.02
+        assert team["totals"] == {
+            "total_commits": 5,
+            "total_prs_merged": 1,
+            "total_tasks_completed": 0,
+            "total_lines_added": 40,
+            "average_productivity": 3.4
+        }
+        assert bob["trend"] == "stable"
+
 
 class TestChallengeService:
     """Tests for the ChallengeService (Debate)."""
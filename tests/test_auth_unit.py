@@ -0,0 +1,425 @@
+"""
+Unit Tests for the Auth Service
+
+Tests password hashing, tokens and user/organization operations with
+mocked sessions.
+"""
+
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+
+
+class TestPasswordHashing:
+    """Tests for AuthService password utilities."""
+
+    @pytest.mark.asyncio
+    async def test_hashing_runs_off_the_event_loop(self):
+        """Test that hash and verify run on the password pool, not the loop thread."""
+        import threading
+        from src.services.auth import service as auth_module
+
+        threads = []
+
+        def record(name):
+            def call(*args):
+                threads.append(threading.current_thread().name)
+                return name
+            return call
+
+        with patch.object(auth_module, '_hash_password', record("hashed")), \
+             patch.object(auth_module, '_verify_password', record(True)):
+            service = auth_module.AuthService()
+            assert await service.hash_password("secret") == "hashed"
+            assert await service.verify_password("secret", "hashed") is True
+
+        assert len(threads) == 2
+        assert all(name.startswith("password-hash") for name in threads)
+
+    @pytest.mark.asyncio
+    async def test_bcrypt_sha256_round_trip(self):
+        """Test that hashes verify, and wrong or malformed hashes do not."""
+        from src.services.auth import service as auth_module
+
+        with patch.object(auth_module, 'BCRYPT_ROUNDS', 4):
+            service = auth_module.AuthService()
+            hashed = await service.hash_password("correct horse")
+
+        assert hashed.startswith("$bcrypt-sha256$v=2,t=2b,r=4$")
+        assert await service.verify_password("correct horse", hashed) is True
+        assert await service.verify_password("wrong horse", hashed) is False
+        assert await service.verify_password("correct horse", "not-a-hash") is False
+        assert await service.verify_password("correct horse", "$bcrypt-sha256$junk") is False
+
+    @pytest.mark.asyncio
+    async def test_long_passwords_are_not_truncated(self):
+        """Test that bytes past bcrypt's 72-byte limit still count."""
+        from src.services.auth import service as auth_module
+
+        with patch.object(auth_module, 'BCRYPT_ROUNDS', 4):
+            service = auth_module.AuthService()
+            hashed = await service.hash_password("x" * 72 + "tail")
+
+        assert await service.verify_password("x" * 72 + "tail", hashed) is True
+        assert await service.verify_password("x" * 72 + "other", hashed) is False
+
+    @pytest.mark.asyncio
+    async def test_legacy_bcrypt_hashes_still_verify(self):
+        """Test that plain bcrypt hashes from before the pre-hash verify, truncated like passlib."""
+        import bcrypt
+        from src.services.auth.service import AuthService
+
+        legacy = bcrypt.hashpw(b"x" * 72, bcrypt.gensalt(rounds=4)).decode()
+        service = AuthService()
+
+        assert await service.verify_password("x" * 72 + "tail", legacy) is True
+        assert await service.verify_password("y" * 72, legacy) is False
+
+
+class TestTokens:
+    """Tests for AuthService JWT utilities."""
+
+    def test_tokens_round_trip_with_cached_key(self):
+        """Test that tokens signed with the prebuilt key decode with the raw secret too."""
+        from jose import jwt
+        from src.services.auth.service import AuthService, JWT_SECRET, JWT_ALGORITHM
+
+        service = AuthService()
+        token, expires_in = service.create_access_token("user-1", "org-1")
+
+        payload = service.decode_token(token)
+        assert payload["sub"] == "user-1"
+        assert payload["org_id"] == "org-1"
+        assert payload["type"] == "access"
+        assert expires_in == 24 * 60 * 60
+        assert jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM]) == payload
+
+    def test_token_expiry_is_integer_epoch_seconds(self):
+        """Test that exp is an int offset from the current epoch time."""
+        from src.services.auth import service as auth_module
+
+        service = auth_module.AuthService()
+        with patch.object(auth_module.time, 'time', return_value=1_700_000_000.75):
+            access, _ = service.create_access_token("user-1")
+            refresh = service.create_refresh_token("user-1")
+
+        claims = auth_module.jwt.get_unverified_claims(access)
+        assert claims["exp"] == 1_700_000_000 + 24 * 60 * 60
+        assert auth_module.jwt.get_unverified_claims(refresh)["exp"] == 1_700_000_000 + 30 * 24 * 60 * 60
+
+    def test_tampered_token_is_rejected(self):
+        """Test that a token with a modified signature does not decode."""
+        from src.services.auth.service import AuthService
+
+        service = AuthService()
+        token = service.create_refresh_token("user-1")
+        tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+
+        assert service.decode_token(tampered) is None
+
+    def test_decoded_tokens_are_cached(self):
+        """Test that a repeated token is served from the cache without re-verifying."""
+        from src.services.auth import service as auth_module
+
+        service = auth_module.AuthService()
+        token, _ = service.create_access_token("user-1", "org-1")
+        payload = service.decode_token(token)
+
+        with patch.object(auth_module.jwt, 'decode', side_effect=AssertionError("decoded twice")):
+            assert service.decode_token(token) is payload
+
+    def test_cached_tokens_expire(self):
+        """Test that a cache entry past its expiry is decoded again."""
+        from src.services.auth import service as auth_module
+
+        service = auth_module.AuthService()
+        token, _ = service.create_access_token("user-1", "org-1")
+        service._token_cache[token] = (0.0, {"sub": "stale"})
+
+        assert service.decode_token(token)["sub"] == "user-1"
+        assert service._token_cache[token][0] > 0.0
+
+    def test_token_cache_evicts_oldest_when_full(self):
+        """Test that the cache stays bounded."""
+        from src.services.auth import service as auth_module
+
+        service = auth_module.AuthService()
+        with patch.object(auth_module, 'TOKEN_CACHE_MAX_ENTRIES', 2):
+            tokens = [service.create_refresh_token(f"user-{i}") for i in range(3)]
+            for token in tokens:
+                service.decode_token(token)
+
+        assert list(service._token_cache) == tokens[1:]
+
+
+class TestOrganizations:
+    """Tests for AuthService organization operations."""
+
+    @pytest.mark.asyncio
+    async def test_create_organization_flushes_once(self):
+        """Test that the org is upserted on its slug, then the rest go out in one flush."""
+        from sqlalchemy.dialects import postgresql
+        from sqlalchemy.sql.dml import Update
+        from src.database.models import Organization, OrganizationMember, Team, TeamMember
+        from src.services.auth.service import AuthService
+
+        org = Organization(id="org-1", name="Acme", slug="acme")
+        session = MagicMock()
+        session.scalar = AsyncMock(return_value=org)
+        session.execute = AsyncMock()
+        session.flush = AsyncMock()
+
+        assert await AuthService().create_organization(session, "Acme", "acme", "user-1") is org
+
+        insert_sql = str(session.scalar.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (slug) DO NOTHING RETURNING" in insert_sql
+        session.flush.assert_awaited_once()
+        (added,), _ = session.add_all.call_args
+        assert [type(obj) for obj in added] == [OrganizationMember, Team, TeamMember]
+        team = added[1]
+        assert added[0].organization_id == team.organization_id == "org-1"
+        assert added[2].team_id == team.id
+
+        update_stmt = session.execute.await_args.args[0]
+        assert isinstance(update_stmt, Update)
+        params = update_stmt.compile().params
+        assert params["id_1"] == "user-1"
+        assert params["current_org_id"] == "org-1"
+        assert params["current_team_id"] == team.id
+
+    @pytest.mark.asyncio
+    async def test_taken_slug_is_rejected_without_further_writes(self):
+        """Test that a slug conflict raises before memberships are added."""
+        from src.services.auth.service import AuthService
+
+        session = MagicMock()
+        session.scalar = AsyncMock(return_value=None)
+        session.flush = AsyncMock()
+
+        with pytest.raises(ValueError, match="slug already exists"):
+            await AuthService().create_organization(session, "Acme", "acme", "user-1")
+
+        session.add_all.assert_not_called()
+        session.flush.assert_not_awaited()
+
+
+class TestInvites:
+    """Tests for AuthService invite operations."""
+
+    @pytest.mark.asyncio
+    async def test_pending_invite_conflict_targets_partial_index(self):
+        """Test that a second pending invite is refused via ON CONFLICT on the partial index."""
+        from sqlalchemy.dialects import postgresql
+        from src.services.auth.service import AuthService
+
+        session = MagicMock()
+        session.scalar = AsyncMock(return_value=None)
+
+        with pytest.raises(ValueError, match="already pending"):
+            await AuthService().create_invite(session, "new@acme.io", "org-1", "user-1")
+
+        sql = str(session.scalar.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (organization_id, email) WHERE status = 'pending' DO NOTHING" in sql
+
+    @pytest.mark.asyncio
+    async def test_existing_member_check_selects_only_an_id(self):
+        """Test that membership is checked by email in one id-only query."""
+        from sqlalchemy.dialects import postgresql
+        from src.services.auth.service import AuthService
+
+        session = MagicMock()
+        session.scalar = AsyncMock(return_value="member-1")
+
+        with pytest.raises(ValueError, match="already a member"):
+            await AuthService().create_invite(session, "old@acme.io", "org-1", "user-1")
+
+        session.scalar.assert_awaited_once()
+        sql = str(session.scalar.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("SELECT organization_members.id \nFROM organization_members JOIN users")
+
+    @staticmethod
+    def _pending_invite():
+        from datetime import datetime, timedelta
+        from src.database.models import Invite, Organization
+
+        invite = Invite(
+            id="invite-1", email="new@acme.io", organization_id="org-1", team_id="team-1",
+            role="member", token="tok", invited_by="user-0", status="pending",
+            expires_at=datetime.utcnow() + timedelta(days=1),
+        )
+        invite.organization = Organization(id="org-1", name="Acme", slug="acme")
+        return invite
+
+    @pytest.mark.asyncio
+    async def test_accept_invite_claims_it_and_reuses_the_loaded_org(self):
+        """Test that the org comes with the invite and the invite is claimed by UPDATE."""
+        from sqlalchemy.dialects import postgresql
+        from sqlalchemy.sql.dml import Update
+        from src.database.models import User
+        from src.services.auth.service import AuthService
+
+        invite = self._pending_invite()
+        user = User(id="user-1", email="new@acme.io", name="New", password_hash="hash")
+        session = MagicMock()
+        session.execute = AsyncMock(side_effect=[
+            MagicMock(scalar_one_or_none=MagicMock(return_value=invite)),
+            MagicMock(rowcount=1),
+            MagicMock(scalar_one_or_none=MagicMock(return_value=user)),
+        ])
+        session.scalar = AsyncMock()
+        session.flush = AsyncMock()
+
+        assert await AuthService().accept_invite(session, "tok", "New", "pw") == (user, invite.organization)
+
+        select_stmt, claim_stmt, _ = (call.args[0] for call in session.execute.await_args_list)
+        assert "LEFT OUTER JOIN organizations" in str(select_stmt.compile(dialect=postgresql.dialect()))
+        assert isinstance(claim_stmt, Update)
+        assert "invites.status = %(status_1)s" in str(claim_stmt.compile(dialect=postgresql.dialect()))
+        assert user.current_org_id == "org-1"
+        session.flush.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_invite_accepted_concurrently_is_rejected(self):
+        """Test that losing the race to claim an invite creates nothing."""
+        from src.services.auth.service import AuthService
+
+        session = MagicMock()
+        session.execute = AsyncMock(side_effect=[
+            MagicMock(scalar_one_or_none=MagicMock(return_value=self._pending_invite())),
+            MagicMock(rowcount=0),
+        ])
+        session.scalar = AsyncMock()
+
+        with pytest.raises(ValueError, match="Invalid or expired invitation"):
+            await AuthService().accept_invite(session, "tok", "New", "pw")
+
+        assert session.execute.await_count == 2
+        session.scalar.assert_not_awaited()
+        session.add.assert_not_called()
+
+
+class TestMembers:
+    """Tests for AuthService member management."""
+
+    @pytest.mark.asyncio
+    async def test_remove_member_deletes_team_and_org_memberships(self):
+        """Test that removal is two DELETEs, the first covering every team of the org."""
+        from sqlalchemy.dialects import postgresql
+        from sqlalchemy.sql.dml import Delete
+        from src.services.auth.service import AuthService
+
+        session = MagicMock()
+        session.execute = AsyncMock(side_effect=[MagicMock(rowcount=2), MagicMock(rowcount=1)])
+
+        assert await AuthService().remove_member(session, "org-1", "user-1") is True
+
+        teams_stmt, org_stmt = (call.args[0] for call in session.execute.await_args_list)
+        assert isinstance(teams_stmt, Delete) and isinstance(org_stmt, Delete)
+        teams_sql = str(teams_stmt.compile(dialect=postgresql.dialect()))
+        assert teams_sql.startswith("DELETE FROM team_members")
+        assert "IN (SELECT teams.id" in teams_sql
+        assert str(org_stmt.compile()).startswith("DELETE FROM organization_members")
+
+    @pytest.mark.asyncio
+    async def test_remove_unknown_member_returns_false(self):
+        """Test that removing a non-member reports False."""
+        from src.services.auth.service import AuthService
+
+        session = MagicMock()
+        session.execute = AsyncMock(side_effect=[MagicMock(rowcount=0), MagicMock(rowcount=0)])
+
+        assert await AuthService().remove_member(session, "org-1", "user-1") is False
+
+
+class TestAuthentication:
+    """Tests for AuthService.authenticate_user."""
+
+    @pytest.mark.asyncio
+    async def test_login_reads_hash_then_updates_with_returning(self):
+        """Test that login selects two columns and returns the user from the UPDATE."""
+        from sqlalchemy.dialects import postgresql
+        from src.database.models import User
+        from src.services.auth import service as auth_module
+
+        user = User(id="user-1", email="a@acme.io", name="A")
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=MagicMock(
+            first=MagicMock(return_value=MagicMock(id="user-1", password_hash="hash"))
+        ))
+        session.scalar = AsyncMock(return_value=user)
+
+        with patch.object(auth_module, '_verify_password', return_value=True):
+            assert await auth_module.AuthService().authenticate_user(session, "a@acme.io", "pw") is user
+
+        select_sql = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert select_sql.startswith("SELECT users.id, users.password_hash \nFROM users")
+        update_sql = str(session.scalar.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert update_sql.startswith("UPDATE users SET last_login_at=")
+        assert "RETURNING users.id" in update_sql
+
+    @pytest.mark.asyncio
+    async def test_wrong_password_writes_nothing(self):
+        """Test that a failed login does not touch last_login_at."""
+        from src.services.auth import service as auth_module
+
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=MagicMock(
+            first=MagicMock(return_value=MagicMock(id="user-1", password_hash="hash"))
+        ))
+        session.scalar = AsyncMock()
+
+        with patch.object(auth_module, '_verify_password', return_value=False):
+            assert await auth_module.AuthService().authenticate_user(session, "a@acme.io", "pw") is None
+
+        session.scalar.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_member_listing_projects_response_columns(self):
+        """Test that members come back as column rows the response schema accepts."""
+        from datetime import datetime
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+        from src.database.models import User, OrganizationMember
+        from src.services.auth.schemas import UserWithRole
+        from src.services.auth.service import AuthService
+
+        engine = create_engine("sqlite://")
+        User.__table__.create(engine)
+        OrganizationMember.__table__.create(engine)
+        with Session(engine) as sync_session:
+            sync_session.add_all([
+                User(id="user-1", email="a@acme.io", name="A", is_active=True, created_at=datetime(2026, 1, 1)),
+                OrganizationMember(id="m-1", organization_id="org-1", user_id="user-1", role="admin",
+                                   joined_at=datetime(2026, 1, 2)),
+            ])
+            sync_session.commit()
+
+            session = MagicMock()
+            session.execute = AsyncMock(side_effect=lambda stmt: sync_session.execute(stmt))
+            rows = await AuthService().get_organization_members(session, "org-1")
+
+        member = UserWithRole.model_validate(rows[0])
+        assert (member.id, member.email, member.role) == ("user-1", "a@acme.io", "admin")
+        assert member.joined_at == datetime(2026, 1, 2)
+        assert "password_hash" not in rows[0]._fields
+
+
+class TestLookups:
+    """Tests for AuthService lookups."""
+
+    @pytest.mark.asyncio
+    async def test_lookups_reuse_prebuilt_statements(self):
+        """Test that hot lookups bind parameters into module-level statements."""
+        from src.services.auth import service as auth_module
+
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=MagicMock(scalar_one_or_none=MagicMock(return_value="owner")))
+        service = auth_module.AuthService()
+
+        await service.get_user_by_id(session, "user-1")
+        await service.get_user_by_id(session, "user-2")
+        assert await service.get_user_role_in_org(session, "user-1", "org-1") == "owner"
+
+        calls = session.execute.await_args_list
+        assert calls[0].args == (auth_module._SELECT_USER_BY_ID, {"user_id": "user-1"})
+        assert calls[1].args[0] is calls[0].args[0]
+        assert calls[2].args == (auth_module._SELECT_MEMBER_ROLE, {"user_id": "user-1", "org_id": "org-1"})
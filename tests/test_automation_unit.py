@@ -86,6 +86,304 @@ class TestAutomationRuleManager:
             
             assert isinstance(result, list)
 
+    @pytest.mark.asyncio
+    async def test_active_rules_are_cached_until_invalidated(self):
+        """Test that active rules are queried once per key until the team is invalidated."""
+        from src.services.automation.rules import AutomationRuleManager
+
+        manager = AutomationRuleManager()
+        rules = [{"id": "r1", "trigger_conditions": {}}]
+        manager._query_active_rules = AsyncMock(return_value=rules)
+
+        assert await manager.get_active_rules("team1", "task_completed") is rules
+        assert await manager.get_active_rules("team1", "task_completed") is rules
+        await manager.get_active_rules("team1", "pr_merged")
+        assert manager._query_active_rules.await_count == 2
+
+        manager.invalidate("team1")
+        await manager.get_active_rules("team1", "task_completed")
+        assert manager._query_active_rules.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_query(self):
+        """Test that simultaneous lookups of a cold key run a single query."""
+        import asyncio
+        from src.services.automation.rules import AutomationRuleManager
+
+        manager = AutomationRuleManager()
+        release = asyncio.Event()
+
+        async def query(team_id, trigger_type):
+            await release.wait()
+            return [{"id": "r1", "trigger_conditions": {}}]
+
+        manager._query_active_rules = AsyncMock(side_effect=query)
+        lookups = [asyncio.create_task(manager.get_active_rules("team1", "task_completed")) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+
+        results = await asyncio.gather(*lookups)
+        assert manager._query_active_rules.await_count == 1
+        assert results[0] is results[1] is results[2]
+
+    @pytest.mark.asyncio
+    async def test_expired_active_rules_are_requeried(self):
+        """Test that entries past the TTL are loaded again."""
+        from src.services.automation.rules import AutomationRuleManager
+
+        manager = AutomationRuleManager()
+        manager._query_active_rules = AsyncMock(return_value=[])
+        manager._active_rules_cache["team1"] = {"task_completed": (0.0, [{"id": "stale"}])}
+
+        assert await manager.get_active_rules("team1", "task_completed") == []
+        manager._query_active_rules.assert_awaited_once()
+
+    @pytest.mark.parametrize("conditions,data,expected", [
+        ({}, {"user": "alice"}, True),
+        ({"user": "Alice"}, {"user": "ALICE-dev"}, True),
+        ({"user": "bob"}, {"user": "alice"}, False),
+        ({"user": "bob"}, {"task_title": "x"}, True),
+        ({"task_type": ["css", "ui"]}, {"task_type": "ui"}, True),
+        ({"task_type": ["css", "ui"]}, {"task_type": "api"}, False),
+        ({"files": ["a.py", "b.py"]}, {"files": ["c.py", "b.py"]}, True),
+        ({"files": ["a.py"]}, {"files": ["c.py"]}, False),
+        ({"labels": [{"name": "bug"}]}, {"labels": [{"name": "bug"}]}, True),
+        ({"files": ["a.py"]}, {"files": [["a.py"]]}, False),
+        ({"task_title": "STRASSE"}, {"task_title": "Fix straße layout"}, True),
+        ({"pr_number": 7}, {"pr_number": 7}, True),
+        ({"pr_number": 7}, {"pr_number": 8}, False),
+        ({"user": "alice", "pr_number": 7}, {"user": "alice", "pr_number": 8}, False),
+    ])
+    def test_compiled_matchers(self, conditions, data, expected):
+        """Test that compiled matchers apply list, substring and exact conditions."""
+        from src.services.automation.rules import _compile_matcher
+
+        assert _compile_matcher(conditions)(data) is expected
+
+    @pytest.mark.asyncio
+    async def test_rules_for_trigger_use_cached_matchers(self):
+        """Test that matchers are compiled once per load, not per event."""
+        from src.services.automation import rules as rules_module
+
+        manager = rules_module.AutomationRuleManager()
+        manager._query_active_rules = AsyncMock(return_value=[
+            {"id": "r1", "trigger_conditions": {"user": "alice"}},
+            {"id": "r2", "trigger_conditions": {"user": "bob"}},
+        ])
+
+        with patch.object(rules_module, '_compile_matcher', wraps=rules_module._compile_matcher) as compile_matcher:
+            first = await manager.get_rules_for_trigger("team1", "task_completed", {"user": "alice"})
+            second = await manager.get_rules_for_trigger("team1", "task_completed", {"user": "Bob"})
+
+        assert [rule["id"] for rule in first] == ["r1"]
+        assert [rule["id"] for rule in second] == ["r2"]
+        assert compile_matcher.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_trigger_values_are_casefolded_once_per_event(self):
+        """Test that string conditions across rules share one casefolded copy of each value."""
+        from src.services.automation import rules as rules_module
+
+        manager = rules_module.AutomationRuleManager()
+        manager._query_active_rules = AsyncMock(return_value=[
+            {"id": f"r{i}", "trigger_conditions": {"task_title": word}}
+            for i, word in enumerate(["css", "header", "api"])
+        ])
+        folded = []
+
+        class CountingFolded(rules_module._Folded):
+            def __missing__(self, key):
+                folded.append(key)
+                return super().__missing__(key)
+
+        with patch.object(rules_module, '_Folded', CountingFolded):
+            matching = await manager.get_rules_for_trigger(
+                "team1", "task_completed", {"task_title": "Fix CSS Header"}
+            )
+
+        assert [rule["id"] for rule in matching] == ["r0", "r1"]
+        assert folded == ["task_title"]
+
+    @pytest.mark.asyncio
+    async def test_status_change_invalidates_team(self):
+        """Test that pausing a rule drops its team's cached rules after the commit."""
+        from tests.fixtures.mock_db import MockAsyncSession, MockResult
+
+        rule = MagicMock(team_id="team1")
+        mock_session = MockAsyncSession()
+
+        async def mock_execute(*args, **kwargs):
+            return MockResult(rule)
+
+        mock_session.execute = mock_execute
+
+        with patch('src.services.automation.rules.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+            from src.services.automation.rules import AutomationRuleManager
+            manager = AutomationRuleManager()
+            manager._active_rules_cache["team1"] = {None: (float("inf"), [])}
+
+            assert await manager.update_rule_status("r1", "paused") is True
+
+        assert "team1" not in manager._active_rules_cache
+
+    @pytest.mark.asyncio
+    async def test_record_executions_updates_rules_in_place(self):
+        """Test that executions bump rules with UPDATE ... RETURNING and insert their rows."""
+        from sqlalchemy import create_engine, select
+        from sqlalchemy.orm import Session
+        from src.database.models import AutomationRule, AutomationExecution
+        from src.services.automation.rules import AutomationRuleManager
+
+        engine = create_engine("sqlite://")
+        AutomationRule.__table__.create(engine)
+        AutomationExecution.__table__.create(engine)
+        with Session(engine) as sync_session:
+            for rule_id, one_time in (("once", True), ("always", False)):
+                sync_session.add(AutomationRule(
+                    id=rule_id, team_id="team1", created_by="alice", original_instruction="x",
+                    trigger_type="task_completed", trigger_conditions={}, action_type="notify_user",
+                    action_params={}, status="active", is_one_time=one_time, execution_count=2,
+                ))
+            sync_session.commit()
+
+            session = MagicMock()
+            session.execute = AsyncMock(side_effect=lambda stmt, params=None: sync_session.execute(stmt, params))
+
+            with patch('src.services.automation.rules.get_session') as mock_get_session:
+                mock_get_session.return_value.__aenter__ = AsyncMock(return_value=session)
+                mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+                manager = AutomationRuleManager()
+                manager._active_rules_cache["team1"] = {None: (float("inf"), [], [])}
+                assert await manager.claim_rules("team1", ["once", "always"]) == {"once", "always"}
+                ids = await manager.record_executions([
+                    dict(rule_id=rule_id, triggered_by={"user": "alice"}, status="success",
+                         result={"success": True}, actions_performed=[])
+                    for rule_id in ("once", "always")
+                ])
+
+            assert session.execute.await_count == 4
+            rules = {r.id: r for r in sync_session.scalars(select(AutomationRule))}
+            assert (rules["once"].status, rules["once"].execution_count) == ("completed", 3)
+            assert (rules["always"].status, rules["always"].execution_count) == ("active", 3)
+            assert rules["always"].last_execution_result == {"status": "success", "execution_id": ids[1]}
+            executions = sync_session.scalars(select(AutomationExecution.id)).all()
+            assert sorted(executions) == sorted(ids)
+
+        assert "team1" not in manager._active_rules_cache
+
+    @pytest.mark.asyncio
+    async def test_record_executions_skips_deleted_rules(self):
+        """Test that an execution of a deleted rule doesn't fail the rest of the batch."""
+        from sqlalchemy import create_engine, event, select
+        from sqlalchemy.orm import Session
+        from src.database.models import AutomationRule, AutomationExecution
+        from src.services.automation.rules import AutomationRuleManager
+
+        engine = create_engine("sqlite://")
+        event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+        AutomationRule.__table__.create(engine)
+        AutomationExecution.__table__.create(engine)
+        with Session(engine) as sync_session:
+            sync_session.add(AutomationRule(
+                id="kept", team_id="team1", created_by="alice", original_instruction="x",
+                trigger_type="task_completed", trigger_conditions={}, action_type="notify_user",
+                action_params={}, status="active", is_one_time=False, execution_count=0,
+            ))
+            sync_session.commit()
+
+            session = MagicMock()
+            session.execute = AsyncMock(side_effect=lambda stmt, params=None: sync_session.execute(stmt, params))
+
+            with patch('src.services.automation.rules.get_session') as mock_get_session:
+                mock_get_session.return_value.__aenter__ = AsyncMock(return_value=session)
+                mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+                ids = await AutomationRuleManager().record_executions([
+                    dict(rule_id=rule_id, triggered_by={}, status="success",
+                         result={"success": True}, actions_performed=[])
+                    for rule_id in ("kept", "deleted")
+                ])
+
+            assert ids[0] is not None and ids[1] is None
+            rule = sync_session.get(AutomationRule, "kept")
+            assert (rule.status, rule.execution_count) == ("active", 1)
+            assert sync_session.scalars(select(AutomationExecution.rule_id)).all() == ["kept"]
+
+    @staticmethod
+    def _sqlite_rules(*rules):
+        """An in-memory automation_rules table holding (id, status, is_one_time) rules."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+        from src.database.models import AutomationRule, AutomationExecution
+
+        engine = create_engine("sqlite://")
+        AutomationRule.__table__.create(engine)
+        AutomationExecution.__table__.create(engine)
+        sync_session = Session(engine)
+        for rule_id, status, one_time in rules:
+            sync_session.add(AutomationRule(
+                id=rule_id, team_id="team1", created_by="alice", original_instruction="x",
+                trigger_type="task_completed", trigger_conditions={}, action_type="notify_user",
+                action_params={}, status=status, is_one_time=one_time, execution_count=0,
+            ))
+        sync_session.commit()
+        return sync_session
+
+    @pytest.mark.asyncio
+    async def test_claim_skips_stale_rules_and_runs_one_time_rules_once(self):
+        """Test that paused, deleted and already-claimed rules are not claimed."""
+        from src.database.models import AutomationRule
+        from src.services.automation.rules import AutomationRuleManager
+
+        sync_session = self._sqlite_rules(
+            ("always", "active", False), ("paused", "paused", False), ("once", "active", True)
+        )
+        session = MagicMock()
+        session.execute = AsyncMock(side_effect=lambda stmt, params=None: sync_session.execute(stmt, params))
+
+        with patch('src.services.automation.rules.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+            manager = AutomationRuleManager()
+            manager._active_rules_cache["team1"] = {None: (float("inf"), [], [])}
+            rule_ids = ["always", "paused", "once", "deleted"]
+
+            assert await manager.claim_rules("team1", rule_ids) == {"always", "once"}
+            assert "team1" not in manager._active_rules_cache
+            assert await manager.claim_rules("team1", rule_ids) == {"always"}
+
+        assert sync_session.get(AutomationRule, "once").status == "completed"
+        sync_session.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_execution_reopens_one_time_rule(self):
+        """Test that only a successful run keeps a claimed one-time rule completed."""
+        from src.database.models import AutomationRule
+        from src.services.automation.rules import AutomationRuleManager
+
+        sync_session = self._sqlite_rules(("once", "active", True))
+        session = MagicMock()
+        session.execute = AsyncMock(side_effect=lambda stmt, params=None: sync_session.execute(stmt, params))
+
+        with patch('src.services.automation.rules.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+            manager = AutomationRuleManager()
+            assert await manager.claim_rules("team1", ["once"]) == {"once"}
+            manager._active_rules_cache["team1"] = {None: (float("inf"), [], [])}
+            await manager.record_execution("once", {"user": "alice"}, "failed", {}, [], error="boom")
+
+        rule = sync_session.get(AutomationRule, "once")
+        assert (rule.status, rule.execution_count) == ("active", 1)
+        assert "team1" not in manager._active_rules_cache
+        sync_session.close()
+
 
 class TestConditionMonitor:
     """Tests for the ConditionMonitor service."""
@@ -123,3 +421,187 @@ class TestActionExecutor:
         executor = ActionExecutor()
         assert hasattr(executor, 'execute')
         assert callable(executor.execute)
+
+    @pytest.mark.asyncio
+    async def test_send_message_uses_shared_slack_client(self):
+        """Test that every executor posts through the module-level Slack client."""
+        from src.services.automation import executor as executor_module
+
+        client = MagicMock()
+        client.chat_postMessage = AsyncMock(return_value={"ok": True, "ts": "1.2"})
+
+        with patch.object(executor_module.ActionExecutor, '_slack_client', client):
+            first = await executor_module.ActionExecutor().execute(
+                "send_message", {"channel": "#ops", "message": "hi"}, "team-1"
+            )
+            second = await executor_module.ActionExecutor().execute(
+                "send_message", {"channel": "#ops", "message": "again"}, "team-1"
+            )
+
+        assert first["success"] and second["success"]
+        assert client.chat_postMessage.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_send_message_without_slack_token(self):
+        """Test that a missing Slack configuration is reported, not raised."""
+        from src.services.automation import executor as executor_module
+
+        with patch.object(executor_module.ActionExecutor, '_slack_client', None):
+            result = await executor_module.ActionExecutor().execute(
+                "send_message", {"channel": "#ops", "message": "hi"}, "team-1"
+            )
+
+        assert result == {"success": False, "error": "Slack not configured"}
+
+    @pytest.mark.asyncio
+    async def test_every_registered_action_has_a_handler(self):
+        """Test that the action registry only names existing handlers."""
+        from src.services.automation.executor import ActionExecutor
+
+        for method_name in ActionExecutor._EXECUTORS.values():
+            assert callable(getattr(ActionExecutor, method_name))
+
+    @pytest.mark.asyncio
+    async def test_unknown_action_type(self):
+        """Test that an unregistered action type fails without raising."""
+        from src.services.automation.executor import ActionExecutor
+
+        result = await ActionExecutor().execute("launch_rocket", {}, "team-1")
+
+        assert result == {"success": False, "error": "Unknown action type: launch_rocket"}
+
+    @pytest.mark.asyncio
+    async def test_create_task_queues_the_assignee_notification(self):
+        """Test that the assignee notification is queued, not created inline."""
+        from tests.fixtures.mock_db import MockAsyncSession
+        from src.services.automation import executor as executor_module
+
+        mock_session = MockAsyncSession()
+        service = executor_module.notification_service
+
+        with patch.object(executor_module, 'get_session') as mock_get_session, \
+             patch.object(service, 'create_notification', AsyncMock()) as create_notification, \
+             patch.object(service, 'enqueue', AsyncMock(return_value="notification-1")) as enqueue:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+            result = await executor_module.ActionExecutor().execute(
+                "create_task", {"title": "Ship it", "assignee": "them"}, "team-1",
+                {"trigger_user": "alice"}
+            )
+
+        assert result["success"] is True
+        assert result["result"]["assignee"] == "alice"
+        assert mock_session._pending_adds[0].assigned_to == "alice"
+        (payload,), _ = enqueue.await_args
+        assert payload.user_identifier == "alice"
+        create_notification.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_notify_user_resolves_pronouns(self):
+        """Test that pronouns resolve to the trigger user, case-insensitively."""
+        from src.services.automation import executor as executor_module
+
+        with patch.object(
+            executor_module.notification_service, 'enqueue',
+            AsyncMock(return_value="notification-1")
+        ) as enqueue:
+            pronoun = await executor_module.ActionExecutor().execute(
+                "notify_user", {"user": "Her"}, "team-1", {"trigger_user": "alice"}
+            )
+            named = await executor_module.ActionExecutor().execute(
+                "notify_user", {"user": "bob"}, "team-1", {"trigger_user": "alice"}
+            )
+
+        assert pronoun["result"]["user"] == "alice"
+        assert named["result"]["user"] == "bob"
+        assert enqueue.await_count == 2
+
+
+class TestRuleExecution:
+    """Tests for running matched rules from the ConditionMonitor."""
+
+    @pytest.mark.asyncio
+    async def test_matched_rules_run_concurrently_and_record_once(self):
+        """Test that actions overlap and all executions are recorded in one call."""
+        import asyncio
+        from src.services.automation import monitor as monitor_module
+
+        rules = [
+            {"id": f"r{i}", "action_type": "notify_user", "action_params": {"user": "them"}}
+            for i in range(3)
+        ]
+        started = []
+        all_started = asyncio.Event()
+
+        async def execute(action_type, action_params, team_id, context):
+            started.append(context["rule_id"])
+            if len(started) == len(rules):
+                all_started.set()
+            # Only completes if every action is in flight at once
+            await all_started.wait()
+            if context["rule_id"] == "r1":
+                raise RuntimeError("slack down")
+            return {"success": True}
+
+        with patch.object(monitor_module.rule_manager, 'get_rules_for_trigger', AsyncMock(return_value=rules)), \
+             patch.object(monitor_module.rule_manager, 'claim_rules', AsyncMock(side_effect=lambda team_id, ids: set(ids))), \
+             patch.object(monitor_module.rule_manager, 'record_executions', AsyncMock()) as record_executions, \
+             patch.object(monitor_module.action_executor, 'execute', side_effect=execute):
+            executed = await asyncio.wait_for(
+                monitor_module.ConditionMonitor().check_task_completed("team1", "alice", "Fix CSS"),
+                timeout=1,
+            )
+
+        assert executed == ["r0", "r2"]
+        record_executions.assert_awaited_once()
+        (executions,), _ = record_executions.await_args
+        assert [(e["rule_id"], e["status"]) for e in executions] == [
+            ("r0", "success"), ("r1", "failed"), ("r2", "success")
+        ]
+        assert executions[1]["error"] == "slack down"
+
+    @pytest.mark.asyncio
+    async def test_action_concurrency_is_bounded(self):
+        """Test that no more than MAX_CONCURRENT_ACTIONS actions run at once."""
+        import asyncio
+        from src.services.automation import monitor as monitor_module
+
+        rules = [{"id": f"r{i}", "action_type": "notify_user", "action_params": {}} for i in range(20)]
+        running = 0
+        peak = 0
+
+        async def execute(**kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return {"success": True}
+
+        with patch.object(monitor_module.rule_manager, 'get_rules_for_trigger', AsyncMock(return_value=rules)), \
+             patch.object(monitor_module.rule_manager, 'claim_rules', AsyncMock(side_effect=lambda team_id, ids: set(ids))), \
+             patch.object(monitor_module.rule_manager, 'record_executions', AsyncMock()), \
+             patch.object(monitor_module.action_executor, 'execute', side_effect=execute):
+            executed = await monitor_module.ConditionMonitor().check_pr_merged("team1", "repo", 1, "alice", "t")
+
+        assert len(executed) == 20
+        assert peak == monitor_module.MAX_CONCURRENT_ACTIONS
+
+    @pytest.mark.asyncio
+    async def test_unclaimed_rules_are_not_run(self):
+        """Test that rules paused or completed since they were cached are skipped."""
+        from src.services.automation import monitor as monitor_module
+
+        rules = [{"id": f"r{i}", "action_type": "notify_user", "action_params": {}} for i in range(3)]
+
+        with patch.object(monitor_module.rule_manager, 'get_rules_for_trigger', AsyncMock(return_value=rules)), \
+             patch.object(monitor_module.rule_manager, 'claim_rules', AsyncMock(return_value={"r1"})), \
+             patch.object(monitor_module.rule_manager, 'record_executions', AsyncMock()) as record_executions, \
+             patch.object(monitor_module.action_executor, 'execute', AsyncMock(return_value={"success": True})) as execute:
+            executed = await monitor_module.ConditionMonitor().check_pr_merged("team1", "repo", 1, "alice", "t")
+
+        assert executed == ["r1"]
+        execute.assert_awaited_once()
+        (executions,), _ = record_executions.await_args
+        assert [e["rule_id"] for e in executions] == ["r1"]
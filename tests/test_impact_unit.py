@@ -143,3 +143,89 @@ class TestNotificationService:
             result = await service.mark_as_read("n1")
             
             assert result is not None or mock_notification.is_read is True
+
+    @pytest.mark.asyncio
+    async def test_enqueued_notifications_are_inserted_in_one_batch(self):
+        """Test that queued notifications share one INSERT and are all delivered."""
+        from tests.fixtures.mock_db import MockAsyncSession
+        from src.services.impact.notifications import NotificationService, NotificationPayload
+
+        mock_session = MockAsyncSession()
+        mock_session.execute = AsyncMock()
+
+        with patch('src.services.impact.notifications.get_session') as mock_get_session:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+            service = NotificationService(max_wait=0.01)
+            service._deliver_slack = AsyncMock(return_value=True)
+            ids = [
+                await service.enqueue(NotificationPayload(
+                    user_identifier=f"user{i}", team_id="team1",
+                    notification_type="automation_triggered", title="Hi", content="Hello",
+                    delivery_channels=["slack"] if i else ["web"],
+                ))
+                for i in range(3)
+            ]
+            await service.drain()
+
+        mock_session.execute.assert_awaited_once()
+        _, rows = mock_session.execute.await_args.args
+        assert [row["id"] for row in rows] == ids
+        assert [row["user_identifier"] for row in rows] == ["user0", "user1", "user2"]
+        delivered = [call.args[0] for call in service._deliver_slack.await_args_list]
+        assert delivered == ids[1:]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_does_not_block_drain(self):
+        """Test that an insert error is logged and the queue still drains."""
+        from src.services.impact.notifications import NotificationService, NotificationPayload
+
+        with patch('src.services.impact.notifications.get_session', side_effect=RuntimeError("db down")), \
+             patch('src.services.impact.notifications.asyncio.sleep', AsyncMock()):
+            service = NotificationService(max_wait=0.01)
+            await service.enqueue(NotificationPayload(
+                user_identifier="user1", team_id="team1",
+                notification_type="automation_triggered", title="Hi", content="Hello",
+            ))
+            await service.drain()
+
+        assert service._queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried_row_by_row(self):
+        """Test that a batch that keeps failing still writes and delivers its good rows."""
+        from src.services.impact.notifications import (
+            NOTIFICATION_BATCH_ATTEMPTS, NotificationService, NotificationPayload
+        )
+
+        calls = []
+
+        async def mock_execute(statement, rows):
+            calls.append([row["user_identifier"] for row in rows])
+            if len(rows) > 1 or rows[0]["user_identifier"] == "bad":
+                raise RuntimeError("constraint violation")
+
+        mock_session = AsyncMock()
+        mock_session.execute = mock_execute
+
+        with patch('src.services.impact.notifications.get_session') as mock_get_session, \
+             patch('src.services.impact.notifications.asyncio.sleep', AsyncMock()):
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+            service = NotificationService(max_wait=0.01)
+            service._deliver_slack = AsyncMock(return_value=True)
+            ids = [
+                await service.enqueue(NotificationPayload(
+                    user_identifier=user, team_id="team1",
+                    notification_type="automation_triggered", title="Hi", content="Hello",
+                ))
+                for user in ("good1", "bad", "good2")
+            ]
+            await service.drain()
+
+        assert calls[:NOTIFICATION_BATCH_ATTEMPTS] == [["good1", "bad", "good2"]] * NOTIFICATION_BATCH_ATTEMPTS
+        assert calls[NOTIFICATION_BATCH_ATTEMPTS:] == [["good1"], ["bad"], ["good2"]]
+        delivered = [call.args[0] for call in service._deliver_slack.await_args_list]
+        assert delivered == [ids[0], ids[2]]
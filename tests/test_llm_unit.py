@@ -0,0 +1,450 @@
+"""
+Unit Tests for LLM Clients
+
+Tests provider fallback of LLMClient and caching of EnhancedLLMClient
+with mocked provider clients.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from openai import APIConnectionError
+from unittest.mock import patch, AsyncMock, MagicMock
+
+
+def _connection_error():
+    return APIConnectionError(request=httpx.Request("POST", "https://api.example.com"))
+
+
+def _mock_provider(content=None, delay=0.0, error=None):
+    """Build a fake AsyncOpenAI client whose completion sleeps then answers or fails."""
+    async def create(**kwargs):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        response = MagicMock()
+        response.choices[0].message.content = content
+        return response
+
+    client = MagicMock()
+    client.chat.completions.create = create
+    return client
+
+
+class TestLLMClient:
+    """Tests for the LLMClient provider chain."""
+
+    @pytest.mark.asyncio
+    async def test_urgent_returns_fastest_provider(self):
+        """Test that urgent completions race OpenAI and Groq."""
+        from src.llm.client import LLMClient
+
+        client = LLMClient()
+        client.openai_client = _mock_provider("openai", delay=1.0)
+        client.groq_client = _mock_provider("groq", delay=0.01)
+
+        result = await client.complete([{"role": "user", "content": "hi"}], urgent=True)
+
+        assert result == "groq"
+
+    @pytest.mark.asyncio
+    async def test_urgent_waits_for_second_provider_after_failure(self):
+        """Test that a fast failure doesn't end the race."""
+        from src.llm.client import LLMClient
+
+        client = LLMClient()
+        client.openai_client = _mock_provider(error=_connection_error())
+        client.groq_client = _mock_provider("groq", delay=0.02)
+
+        result = await client.complete([{"role": "user", "content": "hi"}], urgent=True)
+
+        assert result == "groq"
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_ollama(self):
+        """Test that Ollama is used when both cloud providers fail."""
+        from src.llm.client import LLMClient
+
+        client = LLMClient()
+        client.openai_client = _mock_provider(error=_connection_error())
+        client.groq_client = _mock_provider(error=_connection_error())
+        client.ollama_client = _mock_provider("ollama")
+
+        assert await client.complete([{"role": "user", "content": "hi"}], urgent=True) == "ollama"
+        assert await client.complete([{"role": "user", "content": "hi"}]) == "ollama"
+
+    @pytest.mark.asyncio
+    async def test_programming_errors_do_not_fall_back(self):
+        """Test that non-provider exceptions propagate instead of trying the next provider."""
+        from src.llm.client import LLMClient
+
+        client = LLMClient()
+        client.openai_client = _mock_provider(error=KeyError("choices"))
+        client.groq_client = None
+        client.ollama_client = _mock_provider(error=AssertionError("fallback used"))
+
+        with pytest.raises(KeyError):
+            await client.complete([{"role": "user", "content": "hi"}])
+
+
+class TestEnhancedLLMClient:
+    """Tests for EnhancedLLMClient caching."""
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_hit_skips_providers(self):
+        """Test that a paraphrase hit is returned without calling any provider."""
+        import time
+        from src.llm.enhanced_client import EnhancedLLMClient
+
+        client = EnhancedLLMClient()
+        client.openai_client = None
+        client.groq_client = None
+        client.ollama_client = _mock_provider(error=AssertionError("provider called"))
+        client.semantic_cache = MagicMock()
+        client.semantic_cache.initialize = AsyncMock()
+        client.semantic_cache.search = AsyncMock(return_value=[
+            {"id": "1", "score": 0.95, "payload": {"response": "Paris", "created_at": time.time()}}
+        ])
+
+        messages = [
+            {"role": "system", "content": "Be brief."},
+            {"role": "user", "content": "France's capital?"},
+        ]
+        with patch('src.llm.enhanced_client.cache') as mock_cache, \
+             patch('src.llm.enhanced_client.embedding_service') as mock_embedding:
+            mock_cache.get = AsyncMock(return_value=None)
+            mock_embedding.embed = AsyncMock(return_value=[[0.1, 0.2]])
+
+            result = await client.complete(messages, semantic=True)
+
+        assert result == "Paris"
+        filters = client.semantic_cache.search.await_args.kwargs["filters"]
+        assert filters["context_key"] == client._get_cache_key(messages[:1], "llama3.2", 0.7)
+        assert time.time() - 3600 - 5 < filters["created_at"].gte <= time.time() - 3600
+
+    @pytest.mark.asyncio
+    async def test_semantic_store_replaces_the_entry_for_the_same_prompt(self):
+        """Test that misses store in the background under an id derived from the exact prompt."""
+        from src.llm.enhanced_client import EnhancedLLMClient
+        from src.llm.router import ModelPool
+
+        client = EnhancedLLMClient()
+        client.pool = ModelPool()
+        client.pool.add("ollama", _mock_provider(content="Paris"))
+        client.semantic_cache = MagicMock()
+        client.semantic_cache.initialize = AsyncMock()
+        client.semantic_cache.search = AsyncMock(return_value=[])
+        client.semantic_cache.insert = AsyncMock()
+
+        messages = [{"role": "user", "content": "France's capital?"}]
+        with patch('src.llm.enhanced_client.cache') as mock_cache, \
+             patch('src.llm.enhanced_client.embedding_service') as mock_embedding:
+            mock_cache.get = AsyncMock(return_value=None)
+            mock_cache.set = AsyncMock()
+            mock_embedding.embed = AsyncMock(return_value=[[0.1, 0.2]])
+
+            for _ in range(2):
+                assert await client.complete(messages, semantic=True) == "Paris"
+                await client.drain()
+
+        first, second = client.semantic_cache.insert.await_args_list
+        assert first.kwargs["ids"] == second.kwargs["ids"]
+        assert first.kwargs["payloads"][0]["context_key"] == client._get_cache_key([], "llama3.2", 0.7)
+
+    @pytest.mark.asyncio
+    async def test_vector_search_filters_ranges_off_the_event_loop(self):
+        """Test that Range filter values become range conditions and the query runs in a thread."""
+        from qdrant_client.models import Range
+        from src.vectors.qdrant_client import VectorStore
+
+        store = VectorStore(collection_name="llm_semcache")
+        store.client = MagicMock()
+        store.client.query_points.return_value.points = []
+
+        with patch('src.vectors.qdrant_client.asyncio.to_thread', wraps=asyncio.to_thread) as to_thread:
+            await store.search([0.1], limit=1, filters={"context_key": "k", "created_at": Range(gte=5.0)})
+
+        to_thread.assert_called_once()
+        conditions = store.client.query_points.call_args.kwargs["query_filter"].must
+        assert conditions[0].match.value == "k"
+        assert conditions[1].range == Range(gte=5.0)
+
+    def test_tool_messages_are_not_semantically_cached(self):
+        """Test that prompts carrying tool output bypass the semantic cache."""
+        from src.llm.enhanced_client import EnhancedLLMClient
+
+        client = EnhancedLLMClient()
+
+        assert client._is_semantic_cacheable([{"role": "user", "content": "hi"}])
+        assert not client._is_semantic_cacheable([
+            {"role": "tool", "content": "{}"},
+            {"role": "user", "content": "hi"},
+        ])
+
+
+class TestModelPool:
+    """Tests for ModelPool routing and circuit breakers."""
+
+    def test_circuit_opens_after_threshold(self):
+        """Test that repeated failures take a provider out of rotation."""
+        from src.llm.router import ModelPool, CircuitState
+
+        pool = ModelPool(failure_threshold=2, cooldown=60)
+        pool.add("openai", MagicMock())
+        deployment = pool.deployments[0]
+
+        pool.record_failure(deployment)
+        assert pool.try_acquire(deployment)
+        pool.record_failure(deployment)
+
+        assert deployment.state == CircuitState.OPEN
+        assert not pool.try_acquire(deployment)
+
+    def test_half_open_allows_single_probe(self):
+        """Test that only one probe passes once the cooldown has elapsed."""
+        from src.llm.router import ModelPool, CircuitState
+
+        pool = ModelPool(failure_threshold=1, cooldown=0)
+        pool.add("groq", MagicMock())
+        deployment = pool.deployments[0]
+        pool.record_failure(deployment)
+
+        assert pool.try_acquire(deployment)
+        assert deployment.state == CircuitState.HALF_OPEN
+        assert not pool.try_acquire(deployment)
+
+        pool.record_success(deployment, latency=0.1)
+        assert deployment.state == CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_releases_half_open_slot(self):
+        """Test that cancelling a half-open probe lets the next request probe again."""
+        from src.llm.enhanced_client import EnhancedLLMClient
+        from src.llm.router import ModelPool, CircuitState
+
+        client = EnhancedLLMClient()
+        client.pool = ModelPool(failure_threshold=1, cooldown=0)
+        client.pool.add("ollama", _mock_provider(content="late", delay=10))
+        deployment = client.pool.deployments[0]
+        client.pool.record_failure(deployment)
+
+        messages = [{"role": "user", "content": "probe"}]
+        with patch('src.llm.enhanced_client.cache') as mock_cache:
+            mock_cache.get = AsyncMock(return_value=None)
+
+            probe = asyncio.create_task(client.complete(messages, use_cache=False))
+            await asyncio.sleep(0.01)
+            assert deployment.probe_in_flight
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+
+        assert deployment.state == CircuitState.HALF_OPEN
+        assert not deployment.probe_in_flight
+        assert client.pool.try_acquire(deployment)
+
+    @pytest.mark.asyncio
+    async def test_caller_timeout_leaves_the_circuit_closed(self):
+        """Test that running out of the caller's budget is not scored as a provider failure."""
+        from src.llm.enhanced_client import EnhancedLLMClient
+        from src.llm.router import ModelPool, CircuitState
+
+        client = EnhancedLLMClient()
+        client.pool = ModelPool(failure_threshold=1, cooldown=60)
+        client.pool.add("ollama", _mock_provider(content="late", delay=1))
+        deployment = client.pool.deployments[0]
+
+        messages = [{"role": "user", "content": "slow"}]
+        with patch('src.llm.enhanced_client.cache') as mock_cache:
+            mock_cache.get = AsyncMock(return_value=None)
+
+            with pytest.raises(asyncio.TimeoutError):
+                await client.complete(messages, use_cache=False, timeout=0.01)
+
+        assert deployment.state == CircuitState.CLOSED
+        assert deployment.consecutive_failures == 0
+        assert not deployment.probe_in_flight
+
+    def test_unconfigured_clients_are_skipped(self):
+        """Test that None clients are not registered."""
+        from src.llm.router import ModelPool
+
+        pool = ModelPool(strategy="round_robin")
+        pool.add("openai", None)
+        pool.add("groq", MagicMock())
+        pool.add("ollama", MagicMock())
+
+        assert [d.name for d in pool.candidates()] == ["groq", "ollama"]
+        assert [d.name for d in pool.candidates()] == ["ollama", "groq"]
+
+
+class TestRetryWithBackoff:
+    """Tests for EnhancedLLMClient._retry_with_backoff."""
+
+    @pytest.mark.asyncio
+    async def test_retry_sleeps_are_jittered_and_honor_retry_after(self):
+        """Test that backoff is randomized but never shorter than Retry-After."""
+        import httpx
+        from openai import RateLimitError
+        from src.llm.enhanced_client import EnhancedLLMClient
+
+        request = httpx.Request("POST", "https://api.example.com")
+        response = httpx.Response(429, headers={"retry-after": "2"}, request=request)
+        error = RateLimitError("slow down", response=response, body=None)
+        func = AsyncMock(side_effect=[error, "ok"])
+
+        client = EnhancedLLMClient()
+        with patch('src.llm.enhanced_client.asyncio.sleep', new=AsyncMock()) as mock_sleep, \
+             patch('src.llm.enhanced_client.random.uniform', return_value=0.3) as mock_uniform:
+            result = await client._retry_with_backoff(func, base_delay=1.0)
+
+        assert result == "ok"
+        mock_uniform.assert_called_once_with(0, 1.0)
+        mock_sleep.assert_awaited_once_with(2.0)
+
+    @pytest.mark.asyncio
+    async def test_retry_gives_up_when_backoff_would_overrun_timeout(self):
+        """Test that a Retry-After beyond the caller's budget fails fast."""
+        import httpx
+        from openai import RateLimitError
+        from src.llm.enhanced_client import EnhancedLLMClient
+
+        request = httpx.Request("POST", "https://api.example.com")
+        response = httpx.Response(429, headers={"retry-after": "30"}, request=request)
+        error = RateLimitError("slow down", response=response, body=None)
+        func = AsyncMock(side_effect=[error, "ok"])
+
+        client = EnhancedLLMClient()
+        with patch('src.llm.enhanced_client.asyncio.sleep', new=AsyncMock()) as mock_sleep:
+            with pytest.raises(RateLimitError):
+                await client._retry_with_backoff(func, timeout=5.0)
+
+        mock_sleep.assert_not_awaited()
+        assert func.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_attempt_is_cut_off_at_timeout(self):
+        """Test that a hanging provider call is abandoned at the deadline."""
+        from src.llm.enhanced_client import EnhancedLLMClient
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        client = EnhancedLLMClient()
+        with pytest.raises(asyncio.TimeoutError):
+            await client._retry_with_backoff(hang, timeout=0.01)
+
+
+class TestRequestCoalescing:
+    """Tests for coalescing identical concurrent completions."""
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_requests_share_one_call(self):
+        """Test that concurrent identical prompts hit the provider once."""
+        from src.llm.enhanced_client import EnhancedLLMClient
+        from src.llm.router import ModelPool
+
+        calls = []
+
+        async def create(**kwargs):
+            calls.append(kwargs)
+            await asyncio.sleep(0.01)
+            response = MagicMock()
+            response.choices[0].message.content = "answer"
+            return response
+
+        provider = MagicMock()
+        provider.chat.completions.create = create
+
+        client = EnhancedLLMClient()
+        client.pool = ModelPool()
+        client.pool.add("ollama", provider)
+
+        messages = [{"role": "user", "content": "same question"}]
+        with patch('src.llm.enhanced_client.cache') as mock_cache:
+            mock_cache.get = AsyncMock(return_value=None)
+            mock_cache.set = AsyncMock()
+
+            results = await asyncio.gather(*[client.complete(messages) for _ in range(5)])
+            await client.drain()
+
+        assert results == ["answer"] * 5
+        assert len(calls) == 1
+        assert client._inflight == {}
+        mock_cache.set.assert_awaited_once()
+        assert client._bg_tasks == set()
+
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_joiners(self):
+        """Test that joiners still get the shared result when the first caller is cancelled."""
+        from src.llm.enhanced_client import EnhancedLLMClient
+        from src.llm.router import ModelPool
+
+        client = EnhancedLLMClient()
+        client.pool = ModelPool()
+        client.pool.add("ollama", _mock_provider(content="answer", delay=0.05))
+
+        messages = [{"role": "user", "content": "shared question"}]
+        with patch('src.llm.enhanced_client.cache') as mock_cache:
+            mock_cache.get = AsyncMock(return_value=None)
+            mock_cache.set = AsyncMock()
+
+            leader = asyncio.create_task(client.complete(messages))
+            await asyncio.sleep(0)
+            joiner = asyncio.create_task(client.complete(messages))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+
+            assert await joiner == "answer"
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            await client.drain()
+
+        assert client._inflight == {}
+
+class TestStreaming:
+    """Tests for EnhancedLLMClient streaming."""
+
+    @pytest.mark.asyncio
+    async def test_stream_sse_frames_deltas(self):
+        """Test that each streamed delta becomes one SSE data frame."""
+        from src.llm.enhanced_client import EnhancedLLMClient
+
+        def chunk(content):
+            c = MagicMock()
+            c.choices[0].delta.content = content
+            return c
+
+        async def stream():
+            for content in ["Hel", None, "lo \"x\""]:
+                yield chunk(content)
+
+        client = EnhancedLLMClient()
+        client._primary_type = "ollama"
+        client._primary_client = MagicMock()
+        client._primary_client.chat.completions.create = AsyncMock(return_value=stream())
+
+        frames = [f async for f in client.stream_sse([{"role": "user", "content": "hi"}])]
+
+        assert frames == [b'data: {"delta":"Hel"}\n\n', b'data: {"delta":"lo \\"x\\""}\n\n']
+
+
+class TestCacheAdmission:
+    """Tests for the response cache admission policy."""
+
+    def test_large_and_tool_prompts_are_not_admitted(self):
+        """Test that only small, tool-free prompts are cached."""
+        from src.llm.enhanced_client import EnhancedLLMClient
+
+        client = EnhancedLLMClient()
+
+        with patch('src.llm.enhanced_client.settings') as mock_settings:
+            mock_settings.llm_cache_max_bytes = 100
+            assert client._admit_to_cache([{"role": "user", "content": "hi"}])
+            assert not client._admit_to_cache([{"role": "user", "content": "x" * 200}])
+            assert not client._admit_to_cache([
+                {"role": "assistant", "content": "", "tool_calls": []},
+                {"role": "tool", "content": "{}"},
+            ])
@@ -0,0 +1,137 @@
+"""
+Unit Tests for Monitoring Metrics
+
+Tests the metric-tracking decorators against a private Prometheus registry.
+"""
+
+import pytest
+
+
+def _metrics():
+    """Fresh counter and histogram registered on their own registry."""
+    from prometheus_client import CollectorRegistry, Counter, Histogram
+
+    registry = CollectorRegistry()
+    counter = Counter('calls_total', 'Calls', ['name', 'status'], registry=registry)
+    histogram = Histogram('call_seconds', 'Call duration', ['name'], registry=registry)
+    return registry, counter, histogram
+
+
+class TestTracked:
+    """Tests for the _tracked decorator factory."""
+
+    @pytest.mark.asyncio
+    async def test_counts_success_and_error(self):
+        """Test that outcomes are counted under their status label."""
+        from src.monitoring.metrics import _tracked
+
+        registry, counter, histogram = _metrics()
+
+        @_tracked(counter, histogram, {'name': 'op'})
+        async def op(fail=False):
+            if fail:
+                raise RuntimeError("boom")
+            return "ok"
+
+        assert await op() == "ok"
+        assert await op() == "ok"
+        with pytest.raises(RuntimeError):
+            await op(fail=True)
+
+        assert registry.get_sample_value('calls_total', {'name': 'op', 'status': 'success'}) == 2
+        assert registry.get_sample_value('calls_total', {'name': 'op', 'status': 'error'}) == 1
+        assert registry.get_sample_value('call_seconds_count', {'name': 'op'}) == 3
+
+    @pytest.mark.asyncio
+    async def test_http_status_classes_and_method_label(self):
+        """Test that HTTP statuses are bucketed and the method comes from kwargs."""
+        from src.monitoring.metrics import _tracked, _http_status
+        from prometheus_client import CollectorRegistry, Counter, Histogram, Gauge
+
+        registry = CollectorRegistry()
+        counter = Counter('req_total', 'Requests', ['endpoint', 'method', 'status'], registry=registry)
+        histogram = Histogram('req_seconds', 'Duration', ['endpoint', 'method'], registry=registry)
+        gauge = Gauge('req_in_progress', 'In progress', ['endpoint', 'method'], registry=registry)
+
+        class NotFound(Exception):
+            status_code = 404
+
+        @_tracked(
+            counter, histogram, {'endpoint': '/items/{id}'},
+            status_fn=_http_status, gauge=gauge, dynamic_label=('method', 'GET')
+        )
+        async def handler(method='GET', missing=False):
+            if missing:
+                raise NotFound()
+            return {}
+
+        await handler()
+        await handler(method='POST')
+        with pytest.raises(NotFound):
+            await handler(missing=True)
+
+        labels = {'endpoint': '/items/{id}', 'method': 'GET'}
+        assert registry.get_sample_value('req_total', {**labels, 'status': '2xx'}) == 1
+        assert registry.get_sample_value('req_total', {**labels, 'status': '4xx'}) == 1
+        assert registry.get_sample_value(
+            'req_total', {'endpoint': '/items/{id}', 'method': 'POST', 'status': '2xx'}
+        ) == 1
+        assert registry.get_sample_value('req_in_progress', labels) == 0
+
+    def test_rejects_raw_paths(self):
+        """Test that endpoint labels must be route templates."""
+        from src.monitoring.metrics import track_http_request
+
+        with pytest.raises(ValueError):
+            track_http_request("api/v1/knowledge")
+
+
+class TestFastHistogram:
+    """Tests for FastHistogram."""
+
+    def test_exposition_matches_prometheus_histogram(self):
+        """Test that scraped samples equal those of a regular Histogram."""
+        from prometheus_client import CollectorRegistry, Histogram
+        from src.monitoring.metrics import FastHistogram
+
+        fast_registry = CollectorRegistry()
+        slow_registry = CollectorRegistry()
+        fast = FastHistogram('op_seconds', 'Duration', ['name'], registry=fast_registry)
+        slow = Histogram('op_seconds', 'Duration', ['name'], registry=slow_registry)
+
+        for value in [0.0001, 0.005, 0.02, 0.3, 4.0, 99.0]:
+            fast.labels(name='a').observe(value)
+            slow.labels(name='a').observe(value)
+
+        def samples(registry):
+            return sorted(
+                (s.name, tuple(sorted(s.labels.items())), s.value)
+                for metric in registry.collect() for s in metric.samples
+                if not s.name.endswith('_created')
+            )
+
+        assert samples(fast_registry) == samples(slow_registry)
+
+
+class TestMetricsSnapshot:
+    """Tests for MetricsSnapshot."""
+
+    @pytest.mark.asyncio
+    async def test_render_is_reused_until_stale(self):
+        """Test that scrapes within max_age get the cached exposition."""
+        from prometheus_client import CollectorRegistry, Counter
+        from src.monitoring.metrics import MetricsSnapshot
+
+        registry = CollectorRegistry()
+        counter = Counter('jobs_total', 'Jobs', registry=registry)
+        snapshot = MetricsSnapshot(registry, max_age=60)
+
+        counter.inc()
+        first = await snapshot.render()
+        counter.inc()
+
+        assert await snapshot.render() == first
+        assert b"jobs_total 1.0" in first
+
+        snapshot.max_age = 0
+        assert b"jobs_total 2.0" in await snapshot.render()
@@ -0,0 +1,88 @@
+"""
+Unit Tests for Vector Services
+
+Tests InsertBatcher with mocked embedding service and vector store.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch, AsyncMock
+
+
+class TestInsertBatcher:
+    """Tests for the InsertBatcher pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_batches_concurrent_submissions(self):
+        """Test that concurrent entries are embedded in one request."""
+        from src.vectors.batcher import InsertBatcher
+
+        embed = AsyncMock(side_effect=lambda texts: [[0.1] * 3 for _ in texts])
+        insert = AsyncMock(return_value=True)
+
+        with patch('src.vectors.batcher.embedding_service') as mock_embedding, \
+             patch('src.vectors.batcher.vector_store') as mock_store:
+            mock_embedding.embed = embed
+            mock_store.insert = insert
+
+            batcher = InsertBatcher(max_batch_size=8, max_wait=0.05)
+            await asyncio.gather(*[
+                batcher.submit({"content": f"fact {i}", "team_id": "team1"})
+                for i in range(3)
+            ])
+
+        embed.assert_awaited_once_with(["fact 0", "fact 1", "fact 2"])
+        insert.assert_awaited_once()
+        assert len(insert.await_args.kwargs["payloads"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_insert_failure_propagates_to_submitter(self):
+        """Test that a failed insert raises in every waiting submit()."""
+        from src.vectors.batcher import InsertBatcher
+
+        with patch('src.vectors.batcher.embedding_service') as mock_embedding, \
+             patch('src.vectors.batcher.vector_store') as mock_store:
+            mock_embedding.embed = AsyncMock(return_value=[[0.1, 0.2]])
+            mock_store.insert = AsyncMock(side_effect=RuntimeError("qdrant down"))
+
+            batcher = InsertBatcher(max_batch_size=1, max_wait=0)
+            with pytest.raises(RuntimeError):
+                await batcher.submit({"content": "fact", "team_id": "team1"})
+
+    @pytest.mark.asyncio
+    async def test_embeds_next_batch_while_inserting(self):
+        """Test that embedding of batch N+1 overlaps the insert of batch N."""
+        from src.vectors.batcher import InsertBatcher
+
+        events = []
+        insert_started = asyncio.Event()
+        release_insert = asyncio.Event()
+
+        async def embed(texts):
+            events.append(("embed", texts[0]))
+            return [[0.1] for _ in texts]
+
+        async def insert(vectors, payloads):
+            events.append(("insert", payloads[0]["content"]))
+            insert_started.set()
+            await release_insert.wait()
+            return True
+
+        with patch('src.vectors.batcher.embedding_service') as mock_embedding, \
+             patch('src.vectors.batcher.vector_store') as mock_store:
+            mock_embedding.embed = embed
+            mock_store.insert = insert
+
+            batcher = InsertBatcher(max_batch_size=1, max_wait=0)
+            first = asyncio.create_task(batcher.submit({"content": "a"}))
+            await insert_started.wait()
+            second = asyncio.create_task(batcher.submit({"content": "b"}))
+            for _ in range(5):
+                await asyncio.sleep(0)
+
+            assert ("embed", "b") in events
+            release_insert.set()
+            await asyncio.gather(first, second)
+
+        assert events.index(("embed", "b")) < events.index(("insert", "b"))
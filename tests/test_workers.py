@@ -4,6 +4,8 @@ Tests for Background Workers
 Tests worker instantiation and message processing logic.
 """
 
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
 
 
 class TestChangeProcessorWorker:
@@ -94,6 +96,58 @@ class TestTaskMonitorWorker:
         assert worker.group_name == GROUP_TASK_MONITOR
 
 
+class TestActivityWriterWorker:
+    """Tests for ActivityWriterWorker."""
+    
+    def test_worker_properties(self):
+        """Test worker has required properties."""
+        from src.workers.activity_writer import ActivityWriterWorker
+        from src.cache.redis_client import STREAM_ACTIVITY_EVENTS, GROUP_ACTIVITY_WRITER
+        
+        worker = ActivityWriterWorker()
+        assert worker.stream_name == STREAM_ACTIVITY_EVENTS
+        assert worker.group_name == GROUP_ACTIVITY_WRITER
+        assert worker.batch_size == 500
+    
+    @pytest.mark.asyncio
+    async def test_batch_is_one_insert_and_one_ack(self):
+        """Test that a read is written with one statement and acked together."""
+        from src.workers.activity_writer import ActivityWriterWorker
+        from src.cache.redis_client import StreamMessage
+        
+        session = MagicMock()
+        session.execute = AsyncMock()
+        messages = [
+            StreamMessage(
+                message_id=f"{i}-0",
+                stream="s",
+                data={"payload": {
+                    "id": str(i), "user_identifier": "alice", "team_id": "team1",
+                    "timestamp": "2024-05-01T12:00:00"
+                }}
+            )
+            for i in range(3)
+        ]
+        
+        with patch('src.workers.activity_writer.get_session') as mock_get_session, \
+             patch('src.workers.activity_writer.cache') as mock_cache, \
+             patch('src.services.analytics.productivity.cache') as productivity_cache:
+            mock_get_session.return_value.__aenter__ = AsyncMock(return_value=session)
+            mock_get_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            mock_cache.stream_ack_many = AsyncMock(return_value=3)
+            productivity_cache.increment = AsyncMock()
+            
+            worker = ActivityWriterWorker()
+            await worker.handle_batch(messages)
+        
+        session.execute.assert_awaited_once()
+        productivity_cache.increment.assert_awaited_once_with("productivity:rev:team1")
+        rows = session.execute.await_args.args[1]
+        assert [row["id"] for row in rows] == ["0", "1", "2"]
+        assert mock_cache.stream_ack_many.await_args.kwargs["message_ids"] == ["0-0", "1-0", "2-0"]
+        assert worker.health_check()["messages_processed"] == 3
+
+
 class TestRedisStreams:
     """Tests for Redis Streams functionality."""
     
@@ -170,3 +224,22 @@ class TestBaseWorker:
         assert health["messages_processed"] == 0
         assert health["errors"] == 0
 
+    
+    @pytest.mark.asyncio
+    async def test_shutdown_drains_buffered_writes_before_disconnecting(self):
+        """Test that the run loop flushes queued notifications and activity before closing Redis."""
+        from src.workers.change_processor import ChangeProcessorWorker
+        
+        calls = []
+        
+        with patch('src.workers.base.cache') as mock_cache, \
+             patch('src.services.analytics.activity.activity_tracker') as mock_tracker, \
+             patch('src.services.impact.notifications.notification_service') as mock_notifications:
+            mock_cache.disconnect = AsyncMock(side_effect=lambda: calls.append("disconnect"))
+            mock_tracker.drain = AsyncMock(side_effect=lambda: calls.append("activity"))
+            mock_notifications.drain = AsyncMock(side_effect=lambda: calls.append("notifications"))
+            
+            worker = ChangeProcessorWorker()
+            await worker._run_loop()
+        
+        assert calls == ["notifications", "activity", "disconnect"]